@@ -0,0 +1 @@
+"""Бенчмарки симулятора. Запуск: python -m benchmarks.<имя_модуля>"""
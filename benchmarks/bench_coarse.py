@@ -0,0 +1,73 @@
+"""Крупный шаг симуляции: скорость и точность столкновений при frames_per_step > 1.
+
+Метеоритный дождь с непрерывным огнем прогоняется на одинаковое игровое
+время с шагом в 1, 2, 4 и 8 кадров, со сплошной проверкой пути за шаг
+(swept) и только по конечным положениям. Для каждого прогона - время на
+кадр игрового времени, доля ракет, попавших в метеорит, и урон кораблю.
+Без swept при крупном шаге быстрые ракеты проскакивают метеориты насквозь.
+
+Запуск: python -m benchmarks.bench_coarse
+"""
+import time
+
+from benchmarks.bench_scenarios import keep_alive
+from game import Game, FIRE, LEFT, RIGHT
+
+FRAMES = 6000
+SEEDS = [1, 2, 3]
+STEPS = [1, 2, 4, 8]
+
+
+def controls(frame):
+    # Период огня кратен всем шагам из STEPS, чтобы ракет было поровну
+    return (FIRE if frame % 16 < 8 else 0) | (LEFT if frame // 120 % 2 else RIGHT)
+
+
+def measure(frames_per_step, swept, seed):
+    """Время на кадр, число выпущенных ракет, попаданий и урон кораблю."""
+    game = Game(headless=True, seed=seed, frames_per_step=frames_per_step)
+    game.swept = swept
+    game.meteor_spawn_interval = (1, 3)
+    rockets = game.rockets
+    counts = {'fired': 0, 'hits': 0}
+    shoot_rocket = game.shoot_rocket
+    check_collisions = game.check_collisions
+
+    def counting_shoot():
+        counts['fired'] += 1
+        shoot_rocket()
+
+    def counting_check(rows=None):
+        # Ракеты за экраном отсекаются после проверки, так что убыль - только попадания
+        before = len(rockets)
+        check_collisions(rows)
+        counts['hits'] += before - len(rockets)
+
+    game.shoot_rocket = counting_shoot
+    game.check_collisions = counting_check
+    damage = 0.0
+    elapsed = 0.0
+    for step in range(FRAMES // frames_per_step):
+        keep_alive(game)
+        start = time.perf_counter()
+        game.step(controls(step * frames_per_step))
+        elapsed += time.perf_counter() - start
+        damage += game.ship.max_hull - game.ship.hull_integrity
+    return elapsed / FRAMES, counts['fired'], counts['hits'], damage
+
+
+def main():
+    print(f"{'кадров за шаг':>13} {'проверка':>9} {'мкс/кадр':>9} {'ракет':>6} {'попаданий':>10} {'урон':>6}")
+    for frames_per_step in STEPS:
+        for swept in (True, False):
+            total = [0.0, 0, 0, 0]
+            for seed in SEEDS:
+                for index, value in enumerate(measure(frames_per_step, swept, seed)):
+                    total[index] += value
+            per_frame, fired, hits, damage = total
+            print(f"{frames_per_step:>13} {'путь' if swept else 'конец':>9} {per_frame / len(SEEDS) * 1e6:>9.1f}"
+                  f" {fired:>6} {hits / fired:>10.1%} {damage:>6.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Сравнение полного перебора и сетки в Game.check_collisions.
+
+Запуск: python -m benchmarks.bench_collisions
+"""
+import random
+import time
+
+import pygame
+
+from benchmarks import legacy
+from entities import EntityStore
+from game import Game, Meteor, Rocket, Powerup, WIDTH, HEIGHT
+
+COUNTS = [100, 500, 1000, 2000, 5000]
+REPEATS = 5
+
+
+def naive_check_collisions(game):
+    """Исходный алгоритм: вложенный цикл ракеты x метеориты на обычных списках."""
+    for rocket in game.rockets[:]:
+        rocket_rect = pygame.Rect(rocket.x, rocket.y, rocket.width, rocket.height)
+        for meteor in game.meteors[:]:
+            meteor_rect = pygame.Rect(meteor.x, meteor.y, meteor.size, meteor.size)
+            if rocket_rect.colliderect(meteor_rect):
+                if rocket in game.rockets:
+                    game.rockets.remove(rocket)
+                if meteor.take_damage(1):
+                    if meteor in game.meteors:
+                        game.explosions.append(legacy.Explosion(
+                            meteor.x + meteor.size // 2,
+                            meteor.y + meteor.size // 2,
+                            meteor.size
+                        ))
+                        game.meteors.remove(meteor)
+                        game.score += meteor.size
+                break
+
+
+def populate(game, count, seed, classes):
+    """Заполнить поле count метеоритами и count ракетами.
+
+    Метеориты занимают верхнюю половину поля, ракеты только что выпущены
+    из нижней, как во время стрельбы по метеоритному дождю: большинство
+    ракет в кадре еще ни во что не попадает.
+    """
+    meteor_class, rocket_class = classes
+    rng = random.Random(seed)
+    random.seed(seed)
+    meteors = []
+    for _ in range(count):
+        meteor = meteor_class()
+        meteor.y = rng.randint(-meteor.size, HEIGHT // 2)
+        meteors.append(meteor)
+    rockets = [rocket_class(rng.randint(0, WIDTH), rng.randint(HEIGHT // 3, HEIGHT)) for _ in range(count)]
+    if meteor_class is Meteor:
+        game.meteors = EntityStore(Meteor)
+        game.rockets = EntityStore(Rocket)
+        for meteor in meteors:
+            game.meteors.append(meteor)
+        for rocket in rockets:
+            game.rockets.append(rocket)
+    else:
+        game.meteors = meteors
+        game.rockets = rockets
+    game.explosions = []
+    game.particles.clear()
+    game.powerups = EntityStore(Powerup)
+    # Корабль уводим за поле, чтобы мерить только ракеты и метеориты
+    game.ship.position = [-1000, -1000]
+
+
+def measure(game, count, check, classes):
+    best = float("inf")
+    for attempt in range(REPEATS):
+        populate(game, count, attempt, classes)
+        start = time.perf_counter()
+        check(game)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    game = Game(headless=True)
+    print(f"{'N':>6} {'перебор, мс':>12} {'сетка, мс':>10} {'ускорение':>10}")
+    for count in COUNTS:
+        naive = measure(game, count, naive_check_collisions, (legacy.Meteor, legacy.Rocket))
+        grid = measure(game, count, Game.check_collisions, (Meteor, Rocket))
+        print(f"{count:>6} {naive * 1000:>12.2f} {grid * 1000:>10.2f} {naive / grid:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
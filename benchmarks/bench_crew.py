@@ -0,0 +1,118 @@
+"""Экипаж: цикл по объектам CrewMember против Fleet.tick_crew и кэша строк статуса.
+
+SHIPS кораблей с одинаковыми экипажами; на половине кораблей идет солнечная
+вспышка. Тик - та же модель, что в Fleet.tick_crew (усталость и отдых,
+травмы от событий, лечение медиками своего корабля), один раз циклом по
+объектам, другой - столбцами флота. Строки статуса всего экипажа
+запрашиваются каждый тик: get_status каждого члена экипажа против
+Fleet.crew_status, который форматирует только изменившиеся.
+
+Запуск: python -m benchmarks.bench_crew
+"""
+import time
+
+import numpy as np
+
+import fleet as fleet_module
+from fleet import Fleet
+from spaceship import CrewMember, MissionEvent, Role
+
+SHIPS = 10
+CREW = [100, 1000, 5000]
+TICKS = 20
+ROLES = list(Role)
+
+
+def make_crew(per_ship):
+    """Члены экипажа одного корабля: роли по кругу, у медиков навык medicine."""
+    roster = []
+    for j in range(per_ship):
+        role = ROLES[j % len(ROLES)]
+        roster.append((f"Crew-{j}", role, {'medicine': 60 + j % 40} if role is Role.MEDIC else {}))
+    return roster
+
+
+def plain_tick(ships, flares):
+    """Тик модели Fleet.tick_crew циклом по объектам; ships - списки членов экипажа."""
+    for crew, flare in zip(ships, flares):
+        injury = fleet_module.CREW_INJURY[MissionEvent.SOLAR_FLARE] if flare else 0
+        care = 0.0
+        patients = 0
+        for member in crew:
+            alive = member.health > 0
+            on_duty = alive and not member.resting
+            if on_duty:
+                member.fatigue = min(fleet_module.MAX_FATIGUE, member.fatigue + fleet_module.FATIGUE_RATE)
+            elif alive:
+                member.fatigue = max(0, member.fatigue - fleet_module.REST_RATE)
+            if member.resting:
+                member.resting = alive and member.fatigue > fleet_module.RESTED
+            else:
+                member.resting = alive and member.fatigue >= fleet_module.MAX_FATIGUE
+            if on_duty and member.role is Role.MEDIC:
+                care += (fleet_module.MEDIC_RATE / 100 * member.skills.get('medicine', 0)
+                         * (1 - member.fatigue / (2 * fleet_module.MAX_FATIGUE)))
+            member.alive = alive
+            if alive and member.health < member.max_health:
+                patients += 1
+        heal = care / max(patients, 1)
+        for member in crew:
+            if not member.alive:
+                continue
+            amount = -injury
+            if member.health < member.max_health:
+                amount += heal
+            member.health = min(member.max_health, max(0, member.health + amount))
+
+
+def main():
+    print(f"{'на корабль':>10} {'CrewMember, мс':>15} {'Fleet, мс':>10} {'ускорение':>10}"
+          f" {'статус, мс':>11} {'кэш, мс':>8}")
+    flares = [ship % 2 == 0 for ship in range(SHIPS)]
+    for per_ship in CREW:
+        roster = make_crew(per_ship)
+        plain = []
+        fleet = Fleet(SHIPS)
+        for ship in range(SHIPS):
+            crew = []
+            for name, role, skills in roster:
+                member = CrewMember(name, role, skills=dict(skills))
+                member.fatigue = 0.0
+                member.resting = False
+                crew.append(member)
+            plain.append(crew)
+            fleet_ship = fleet.add_ship(f"Ship-{ship}")
+            for name, role, skills in roster:
+                fleet.add_crew(fleet_ship, name, role, skills=dict(skills))
+        fleet.set_events([MissionEvent.SOLAR_FLARE], where=np.array(flares))
+
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            plain_tick(plain, flares)
+        plain_time = (time.perf_counter() - start) / TICKS
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            fleet.tick_crew()
+        fleet_time = (time.perf_counter() - start) / TICKS
+        assert np.allclose(fleet.crew.array('health'), [m.health for crew in plain for m in crew])
+
+        # Без кэша каждая строка форматируется заново
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            [CrewMember.get_status(member) for member in fleet.crew]
+        status_time = (time.perf_counter() - start) / TICKS
+        fleet.crew_status()
+        fleet.set_events([])
+        fleet.heal_crew(100)
+        fleet.crew_status()
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            fleet.damage_crew(1, where=np.arange(per_ship))  # Ранен один корабль
+            fleet.crew_status()
+        cached_time = (time.perf_counter() - start) / TICKS
+        print(f"{per_ship:>10} {plain_time * 1000:>15.2f} {fleet_time * 1000:>10.3f} {plain_time / fleet_time:>9.1f}x"
+              f" {status_time * 1000:>11.2f} {cached_time * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Обновление объектов: списки обычных объектов против столбцов EntityStore.
+
+Меряется движение и отсечение метеоритов, ракет и бонусов, как в начале
+Game.update. Объекты поровну делятся между тремя типами. Звезды игра
+рисует слоями starfield.Starfield (см. bench_starfield), а не объектами.
+
+Запуск: python -m benchmarks.bench_entities
+"""
+import random
+import time
+
+from benchmarks import legacy
+from entities import EntityStore
+from game import Meteor, Rocket, Powerup, WIDTH, HEIGHT
+
+COUNTS = [1000, 10000, 100000]
+FRAMES = 60
+
+
+def make_objects(classes, count, seed):
+    """Создать по count // 3 объектов каждого типа, разбросанных по полю."""
+    meteor_class, rocket_class, powerup_class = classes
+    random.seed(seed)
+    rng = random.Random(seed)
+    per_kind = count // 3
+    groups = [
+        [meteor_class() for _ in range(per_kind)],
+        [rocket_class(rng.randint(0, WIDTH), 0) for _ in range(per_kind)],
+        [powerup_class(rng.choice(['fuel', 'health', 'oxygen'])) for _ in range(per_kind)],
+    ]
+    for group in groups:
+        for obj in group:
+            obj.y = rng.randint(0, HEIGHT)
+    return groups
+
+
+def legacy_frame(groups):
+    """Исходный цикл Game.update: update() и list.remove для каждого объекта."""
+    for objects in groups:
+        for obj in objects[:]:
+            obj.update()
+            if obj.is_off_screen():
+                objects.remove(obj)
+
+
+def store_frame(stores):
+    for store in stores:
+        store.update()
+
+
+def run(frame, state):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        frame(state)
+    return (time.perf_counter() - start) / FRAMES
+
+
+def main():
+    print(f"{'N':>7} {'до, кадр/с':>12} {'после, кадр/с':>14} {'ускорение':>10}")
+    for count in COUNTS:
+        groups = make_objects((legacy.Meteor, legacy.Rocket, legacy.Powerup), count, seed=1)
+        before = run(legacy_frame, groups)
+
+        stores = []
+        for view_class, group in zip((Meteor, Rocket, Powerup),
+                                     make_objects((Meteor, Rocket, Powerup), count, seed=1)):
+            store = EntityStore(view_class)
+            for obj in group:
+                store.append(obj)
+            stores.append(store)
+        after = run(store_frame, stores)
+        print(f"{count:>7} {1 / before:>12.0f} {1 / after:>14.0f} {before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Флот: цикл по объектам SpaceShip против пакетных операций Fleet.
+
+За тик каждый корабль расходует топливо и кислород, получает случайный
+урон, половина флота ремонтируется, а все корабли ускоряются.
+
+Запуск: python -m benchmarks.bench_fleet
+"""
+import time
+
+import numpy as np
+
+from fleet import Fleet
+from spaceship import SpaceShip
+
+COUNTS = [100, 1000, 10000, 100000]
+TICKS = 20
+
+
+def plain_tick(ships, damage, repaired):
+    for ship, hit, fix in zip(ships, damage, repaired):
+        ship.consume_fuel(0.5)
+        ship.consume_oxygen(1)
+        ship.take_damage(hit)
+        if fix:
+            ship.repair(5)
+        ship.accelerate(2)
+
+
+def fleet_tick(fleet, damage, repaired):
+    fleet.consume_fuel(0.5)
+    fleet.consume_oxygen(1)
+    fleet.take_damage(damage)
+    fleet.repair(5, repaired)
+    fleet.accelerate(2)
+
+
+def main():
+    rng = np.random.default_rng(1)
+    print(f"{'N':>7} {'SpaceShip, мс':>14} {'Fleet, мс':>10} {'ускорение':>10}")
+    for count in COUNTS:
+        damage = rng.integers(0, 3, count)
+        repaired = rng.random(count) < 0.5
+        ships = [SpaceShip(f"Ship-{i}") for i in range(count)]
+        fleet = Fleet(count)
+        for i in range(count):
+            fleet.add_ship(f"Ship-{i}")
+
+        damage_list = damage.tolist()
+        repaired_list = repaired.tolist()
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            plain_tick(ships, damage_list, repaired_list)
+        plain = (time.perf_counter() - start) / TICKS
+
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            fleet_tick(fleet, damage, repaired)
+        batched = (time.perf_counter() - start) / TICKS
+
+        assert np.allclose(fleet.array('hull_integrity'), [ship.hull_integrity for ship in ships])
+        print(f"{count:>7} {plain * 1000:>14.3f} {batched * 1000:>10.3f} {plain / batched:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
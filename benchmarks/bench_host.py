@@ -0,0 +1,72 @@
+"""Нагрузочный генератор хоста сессий: сколько сессий выдерживает ядро.
+
+Для каждого бэкенда SessionHost тикает в реальном времени (60 тиков в
+секунду), а генератор каждые STEP_SECONDS добавляет STEP сессий, пока хост
+не начнет сбрасывать нагрузку (stride > 1, новые сессии отклоняются), и
+заменяет закончившиеся игры новыми. Емкость - число сессий в момент первого
+сброса; на ядро - емкость, деленная на число занятых ядер (шардов для
+process, одно ядро для inline и thread из-за GIL). После этого хост еще
+SETTLE_SECONDS работает под перегрузкой, чтобы показать задержки тиков сессий.
+
+Запуск: python -m benchmarks.bench_host
+"""
+import asyncio
+import os
+
+from host import SessionHost
+
+STEP = 25
+STEP_SECONDS = 0.5
+SETTLE_SECONDS = 3
+MAX_SESSIONS = 5000
+
+
+async def generate(host, stop):
+    """Добавлять сессии, пока хост их принимает; вернуть емкость."""
+    seed = 1
+    finished = 0
+    while not stop.is_set():
+        for _ in range(STEP):
+            if host.add_session(seed=seed, policy='random') is None or len(host.sessions) >= MAX_SESSIONS:
+                return len(host.sessions)
+            seed += 1
+        # Закончившиеся игры заменяются, чтобы нагрузка только росла
+        for _ in range(len(host.finished) - finished):
+            host.add_session(seed=seed, policy='random')
+            seed += 1
+        finished = len(host.finished)
+        await asyncio.sleep(STEP_SECONDS)
+    return len(host.sessions)
+
+
+async def load(backend, workers):
+    host = SessionHost(backend, workers)
+    stop = asyncio.Event()
+    runner = asyncio.create_task(host.run())
+    try:
+        capacity = await generate(host, stop)
+        await asyncio.sleep(SETTLE_SECONDS)
+        return capacity, host.stats()
+    finally:
+        runner.cancel()
+        try:
+            await runner
+        except asyncio.CancelledError:
+            pass
+        host.close()
+
+
+def main():
+    cores = os.cpu_count()
+    print(f"Ядер: {cores}")
+    print(f"{'бэкенд':>8} {'шардов':>7} {'емкость':>8} {'на ядро':>8} {'тик p50, мс':>12} {'тик p99, мс':>12}"
+          f" {'задержка p99, мс':>17} {'stride':>7}")
+    for backend, workers in (('inline', 1), ('thread', cores), ('process', cores)):
+        capacity, stats = asyncio.run(load(backend, workers))
+        used = workers if backend == 'process' else 1
+        print(f"{backend:>8} {workers:>7} {capacity:>8} {capacity / used:>8.0f} {stats['tick_p50_ms']:>12.2f}"
+              f" {stats['tick_p99_ms']:>12.2f} {stats['latency_p99_ms']:>17.2f} {stats['stride']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""HUD: font.render каждый кадр против кэша текста по значению.
+
+Ресурсы корабля меняются раз в секунду, как при обычном расходе топлива
+и кислорода; меряется среднее время отрисовки HUD за кадр.
+
+Запуск: python -m benchmarks.bench_hud
+"""
+import time
+
+import pygame
+
+from benchmarks import legacy
+from game import Game, FPS, WIDTH, HEIGHT, load_font
+from hud import Hud
+
+FRAMES = 600
+
+
+def run(game, draw):
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        if frame % FPS == 0:
+            game.ship.consume_fuel(0.5)
+            game.ship.consume_oxygen(1)
+        draw(game)
+    return (time.perf_counter() - start) / FRAMES
+
+
+def main():
+    game = Game(headless=True)
+    game.screen = pygame.Surface((WIDTH, HEIGHT))
+    game.font = load_font(24)
+    game.small_font = load_font(20)
+    game.hud = Hud(game.small_font)
+
+    before = run(game, legacy.draw_hud)
+    game.reset_game()
+    game.hud = Hud(game.small_font)
+    after = run(game, Game.draw_hud)
+    print(f"font.render каждый кадр: {before * 1000:.3f} мс/кадр")
+    print(f"кэш текста:              {after * 1000:.3f} мс/кадр ({before / after:.1f}x), "
+          f"font.render за {FRAMES} кадров: {game.hud.renders}")
+
+
+if __name__ == "__main__":
+    main()
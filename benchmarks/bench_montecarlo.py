@@ -0,0 +1,68 @@
+"""Масштабирование montecarlo.run_batch по числу процессов.
+
+Одни и те же SESSIONS сессий (политика random, не дольше MAX_SECONDS секунд
+игры) прогоняются с 1, 2, 4, ... процессами вплоть до числа ядер (или --max-workers), каждый раз
+в новый файл результатов. Печатается скорость в сессиях в секунду, ускорение
+относительно одного процесса и эффективность (ускорение на процесс); при
+близком к линейному масштабировании эффективность держится около 100%.
+Итоги прогонов с разным числом процессов сверяются: распределение по
+процессам не должно менять результаты сессий.
+
+Запуск: python -m benchmarks.bench_montecarlo [--sessions N] [--max-seconds S] [--max-workers N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from montecarlo import run_batch
+
+SESSIONS = 64
+MAX_SECONDS = 20
+
+
+def worker_counts(limit):
+    """1, 2, 4, ... и само limit."""
+    counts = []
+    workers = 1
+    while workers < limit:
+        counts.append(workers)
+        workers *= 2
+    counts.append(limit)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Масштабирование Monte Carlo по процессам")
+    parser.add_argument("--sessions", type=int, default=SESSIONS)
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS)
+    parser.add_argument("--max-workers", type=int, help="до скольких процессов (по умолчанию - по числу ядер)")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    rows = []
+    reference = None
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in worker_counts(args.max_workers or cores):
+            path = os.path.join(directory, f"workers{workers}.jsonl")
+            start = time.perf_counter()
+            results = run_batch(path, args.sessions, workers=workers, max_seconds=args.max_seconds,
+                                chunk=max(1, args.sessions // (4 * workers)))
+            elapsed = time.perf_counter() - start
+            results = sorted(results, key=lambda result: result['seed'])
+            if reference is None:
+                reference = results
+            elif results != reference:
+                raise SystemExit(f"Итоги с {workers} процессами отличаются от прогона в один процесс")
+            rows.append((workers, args.sessions / elapsed))
+
+    print(f"Ядер: {cores}, сессий: {args.sessions} по {args.max_seconds:g} с игры")
+    print(f"{'процессов':>10}{'сессий/с':>10}{'ускорение':>11}{'эффективность':>15}")
+    base = rows[0][1]
+    for workers, rate in rows:
+        speedup = rate / base
+        print(f"{workers:>10}{rate:>10.1f}{speedup:>10.2f}x{speedup / workers:>15.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Всплеск взрывов: Explosion со списками словарей против общего ParticleSystem.
+
+Одновременно взрываются N метеоритов, затем меряется среднее время кадра
+(обновление и отрисовка на невидимую поверхность) за все время жизни частиц.
+
+Запуск: python -m benchmarks.bench_particles
+"""
+import random
+import time
+
+import pygame
+
+from benchmarks import legacy
+from game import WIDTH, HEIGHT
+from particles import ParticleSystem, PARTICLE_LIFETIME
+
+COUNTS = [100, 500, 1000, 2000]
+CAPACITY = 32768
+
+
+def explosion_sites(count, seed):
+    rng = random.Random(seed)
+    return [(rng.randint(0, WIDTH), rng.randint(0, HEIGHT), rng.choice([20, 30, 40, 50])) for _ in range(count)]
+
+
+def legacy_run(screen, sites):
+    start = time.perf_counter()
+    explosions = [legacy.Explosion(x, y, size) for x, y, size in sites]
+    for _ in range(PARTICLE_LIFETIME):
+        for explosion in explosions[:]:
+            explosion.update()
+            if explosion.is_finished():
+                explosions.remove(explosion)
+        for explosion in explosions:
+            explosion.draw(screen)
+    return (time.perf_counter() - start) / PARTICLE_LIFETIME
+
+
+def pooled_run(screen, sites, particles):
+    start = time.perf_counter()
+    for x, y, size in sites:
+        particles.explode(x, y, size)
+    for _ in range(PARTICLE_LIFETIME):
+        particles.update()
+        particles.draw(screen)
+    return (time.perf_counter() - start) / PARTICLE_LIFETIME
+
+
+def main():
+    screen = pygame.Surface((WIDTH, HEIGHT))
+    particles = ParticleSystem(CAPACITY)
+    print(f"{'взрывов':>8} {'до, мс/кадр':>12} {'после, мс/кадр':>15} {'ускорение':>10}")
+    for count in COUNTS:
+        sites = explosion_sites(count, seed=count)
+        before = legacy_run(screen, sites)
+        after = pooled_run(screen, sites, particles)
+        print(f"{count:>8} {before * 1000:>12.2f} {after * 1000:>15.2f} {before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
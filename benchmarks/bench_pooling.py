@@ -0,0 +1,85 @@
+"""Пул объектов EntityStore: новый объект на каждый выстрел и появление против пула.
+
+Игра идет без окна в режиме непрерывного огня под метеоритным дождем.
+После разгона считается, сколько объектов-представлений создано за кадр,
+сколько раз сработал сборщик мусора и сколько длились его паузы, а также
+прирост числа выделенных блоков памяти (sys.getallocatedblocks).
+Без пула (MAX_POOL = 0) удаленные объекты не переиспользуются.
+
+Запуск: python -m benchmarks.bench_pooling
+"""
+import gc
+import sys
+import time
+
+import entities
+from benchmarks.bench_scenarios import keep_alive, sweep_fire
+from game import Game
+
+WARMUP = 600
+FRAMES = 6000
+
+
+class GcWatch:
+    """Число и длительность срабатываний сборщика мусора по поколениям."""
+
+    def __init__(self):
+        self.collections = [0, 0, 0]
+        self.pauses = []
+        self._start = 0.0
+
+    def __call__(self, phase, info):
+        if phase == "start":
+            self._start = time.perf_counter()
+        else:
+            self.collections[info["generation"]] += 1
+            self.pauses.append(time.perf_counter() - self._start)
+
+
+def run(max_pool):
+    entities.MAX_POOL = max_pool
+    game = Game(headless=True, seed=1)
+    game.meteor_spawn_interval = (0, 2)
+    stores = (game.meteors, game.rockets, game.powerups)
+    for frame in range(WARMUP):
+        keep_alive(game)
+        game.step(sweep_fire(frame))
+
+    allocated = sum(store.allocated for store in stores)
+    reused = sum(store.reused for store in stores)
+    watch = GcWatch()
+    gc.callbacks.append(watch)
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    for frame in range(WARMUP, WARMUP + FRAMES):
+        keep_alive(game)
+        game.step(sweep_fire(frame))
+    elapsed = time.perf_counter() - start
+    blocks = sys.getallocatedblocks() - blocks
+    gc.callbacks.remove(watch)
+    return {
+        'allocated': sum(store.allocated for store in stores) - allocated,
+        'reused': sum(store.reused for store in stores) - reused,
+        'gc': watch.collections,
+        'pause_ms': 1000 * sum(watch.pauses),
+        'max_pause_ms': 1000 * max(watch.pauses, default=0),
+        'blocks': blocks,
+        'step_ms': 1000 * elapsed / FRAMES,
+    }
+
+
+def main():
+    default_pool = entities.MAX_POOL
+    print(f"{'':<9}{'новых/кадр':>11}{'из пула':>9}{'сборок gc 0/1/2':>17}"
+          f"{'паузы gc, мс':>14}{'макс, мс':>10}{'блоков':>8}{'шаг, мс':>9}")
+    for label, max_pool in (("без пула", 0), ("пул", default_pool)):
+        result = run(max_pool)
+        collections = "/".join(str(count) for count in result['gc'])
+        print(f"{label:<9}{result['allocated'] / FRAMES:>11.3f}{result['reused']:>9}{collections:>17}"
+              f"{result['pause_ms']:>14.2f}{result['max_pause_ms']:>10.3f}{result['blocks']:>8}"
+              f"{result['step_ms']:>9.3f}")
+    entities.MAX_POOL = default_pool
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Способы отрисовки: звезды и частицы спрайтами (blits) против записи в пиксели.
+
+Игра рисует в окно драйвера dummy (SDL, только CPU) с заданным числом
+звезд, а взрывы у случайных точек экрана каждый шаг поддерживают примерно
+заданное число частиц. Меряется среднее время render() за FRAMES кадров с
+renderer='sprites' и renderer='pixels'. Обновлением экрана по измененным
+областям управляет DIRTY_RECTS.
+
+Запуск: python -m benchmarks.bench_renderer
+"""
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from benchmarks.bench_scenarios import keep_alive
+from game import Game, RENDERERS, WIDTH, HEIGHT
+from particles import PARTICLE_LIFETIME
+from starfield import Starfield
+
+STARS = [100, 1000, 5000]
+PARTICLES = [0, 1000, 4000]
+FRAMES = 200
+DIRTY_RECTS = False
+
+
+def run(renderer, stars, particles):
+    game = Game(seed=1, renderer=renderer, dirty_rects=DIRTY_RECTS)
+    game.starfield = Starfield(WIDTH, HEIGHT, stars, rng=random.Random(stars))
+    rng = random.Random(particles)
+    # Метеорит размера 50 дает 10 частиц, каждая живет PARTICLE_LIFETIME кадров
+    explosions = particles // 10 / PARTICLE_LIFETIME
+    budget = 0.0
+    elapsed = 0.0
+    for _ in range(FRAMES):
+        keep_alive(game)
+        budget += explosions
+        while budget >= 1:
+            game.particles.explode(rng.randint(0, WIDTH), rng.randint(0, HEIGHT), 50)
+            budget -= 1
+        game.step(0)
+        start = time.perf_counter()
+        game.render()
+        elapsed += time.perf_counter() - start
+    return elapsed / FRAMES, game.particles.count
+
+
+def main():
+    print(f"{'звезд':>6} {'частиц':>7}" + "".join(f" {name + ', мс':>12}" for name in RENDERERS) + f" {'ускорение':>10}")
+    for stars in STARS:
+        for particles in PARTICLES:
+            times = []
+            for renderer in RENDERERS:
+                render_time, count = run(renderer, stars, particles)
+                times.append(render_time)
+            print(f"{stars:>6} {count:>7}" + "".join(f" {value * 1000:>12.3f}" for value in times)
+                  + f" {times[0] / times[1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
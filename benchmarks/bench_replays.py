@@ -0,0 +1,92 @@
+"""Корпус записанных сеансов: точный повтор и скорость безголовой симуляции.
+
+Каждая запись из benchmarks/replays/*.rec проигрывается replay_session с
+максимальной скоростью, итоговое состояние сверяется с контрольной суммой из
+записи, и меряется время шага. Расхождение хотя бы одной записи - ошибка
+(код 1): изменилась симуляция или пропала детерминированность.
+
+Сеансы SESSIONS записываются флагом --record: политики управления из
+montecarlo.py играют до конца игры или до MAX_STEPS шагов. После
+намеренного изменения симуляции флаг --update перезаписывает контрольные
+суммы всех записей корпуса, повторив их управление (в корпус можно класть и
+сыгранные вручную записи: python game.py --record benchmarks/replays/имя.rec).
+
+Запуск: python -m benchmarks.bench_replays [--record] [--update]
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+from controls import ScriptedInput
+from game import Game, replay_session
+from montecarlo import POLICIES
+from replay import InputRecorder, Recording
+
+CORPUS = os.path.join(os.path.dirname(__file__), "replays")
+MAX_STEPS = 6000  # Не длиннее 100 секунд игрового времени при шаге в кадр
+
+# имя -> (seed, политика, кадров за шаг, волны, баланс)
+SESSIONS = {
+    'sweep_timers': (1, 'sweep', 1, None, {}),
+    'random_timers': (2, 'random', 1, None, {}),
+    'random_authored': (3, 'random', 1, 'authored', {}),
+    'sweep_procedural_coarse': (4, 'sweep', 4, 'procedural', {}),
+    'random_dense': (5, 'random', 1, None, {'meteor_spawn_interval': (5, 15), 'powerup_spawn_interval': (60, 120)}),
+}
+
+
+def record(name):
+    """Сыграть сеанс SESSIONS[name] и вернуть его запись."""
+    seed, policy, frames_per_step, waves, balance = SESSIONS[name]
+    controls = POLICIES[policy](random.Random(seed ^ 0x5EED))
+    script = ScriptedInput(lambda step: controls(step * frames_per_step))
+    recording = Recording(seed, frames_per_step=frames_per_step, waves=waves, balance=balance)
+    game = Game(headless=True, seed=seed, input_source=InputRecorder(script, recording),
+                frames_per_step=frames_per_step, waves=waves, balance=balance)
+    for _ in range(MAX_STEPS):
+        if not game.step(game.input.poll()):
+            break
+    recording.digest = game.state_digest()
+    return recording
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Повтор корпуса записанных сеансов")
+    parser.add_argument("--record", action="store_true", help="записать сеансы SESSIONS в корпус заново")
+    parser.add_argument("--update", action="store_true", help="перезаписать контрольные суммы записей корпуса")
+    args = parser.parse_args()
+
+    if args.record:
+        os.makedirs(CORPUS, exist_ok=True)
+        for name in SESSIONS:
+            record(name).save(os.path.join(CORPUS, name + ".rec"))
+
+    paths = sorted(glob.glob(os.path.join(CORPUS, "*.rec")))
+    if not paths:
+        print(f"В {CORPUS} нет записей; создайте их флагом --record")
+        return 1
+
+    print(f"{'запись':<26}{'шагов':>7}{'время, с':>10}{'шаг, мкс':>10}{'счет':>7}  итог")
+    failed = False
+    for path in paths:
+        recording = Recording.load(path)
+        start = time.perf_counter()
+        game = replay_session(recording)
+        elapsed = time.perf_counter() - start
+        digest = game.state_digest()
+        if args.update:
+            recording.digest = digest
+            recording.save(path)
+        matches = digest == recording.digest
+        failed = failed or not matches
+        name = os.path.splitext(os.path.basename(path))[0]
+        print(f"{name:<26}{len(recording):>7}{elapsed:>10.2f}{elapsed / max(1, len(recording)) * 1e6:>10.1f}"
+              f"{game.score:>7}  {'совпадает' if matches else 'РАСХОЖДЕНИЕ'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Снимок состояния: savestate против pickle того же состояния.
+
+Игра прогоняется до заданного числа шагов, затем меряются время записи
+и чтения и размер снимка. Для pickle собирается словарь с теми же
+данными: корабль, экипаж, миссия, столбцы хранилищ, частицы, состояние
+генераторов случайных чисел и таймеры. Загрузка pickle только
+распаковывает словарь, без переноса в игру, так что сравнение в его пользу.
+
+Запуск: python -m benchmarks.bench_savestate
+"""
+import pickle
+import time
+
+import savestate
+from game import Game, FIRE, LEFT, RIGHT
+
+STEPS = [100, 1000, 3000]
+REPEATS = 200
+
+
+def controls(step):
+    return (FIRE if step % 6 < 3 else 0) | (LEFT if step // 40 % 2 else RIGHT)
+
+
+def pickle_state(game):
+    particles = game.particles
+    n = particles.count
+    return {
+        'ship': game.ship,
+        'crew': game.crew,
+        'mission': {name: value for name, value in vars(game.mission).items() if name not in ('scheduler', 'rng')},
+        'rng': game.rng.getstate(),
+        # Обработчики - связанные методы Game: pickle утащил бы всю игру, поэтому по имени, как в savestate
+        'timers': [(due, timer, handler.__name__, argument) for due, timer, handler, argument
+                   in game.scheduler.pending()],
+        'stores': {name: {column: values.copy() for column, values in
+                          ((column, getattr(game, name).array(column)) for column in getattr(game, name).columns)}
+                   for name in savestate.STORES},
+        'particles': [array[:n].copy() for array in
+                      (particles.x, particles.y, particles.vx, particles.vy, particles.life, particles.size)],
+        'pending': list(particles.pending),
+        'numpy_rng': particles.rng.bit_generator.state,
+        'counters': (game.score, game.scheduler.time, game.scheduler.sequence, game.rocket_launcher_index),
+        'starfield': list(game.starfield.offsets),
+    }
+
+
+def measure(function):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = function()
+    return (time.perf_counter() - start) / REPEATS, result
+
+
+def main():
+    print(f"{'шагов':>6} {'объектов':>9} {'формат':>10} {'запись, мкс':>12} {'чтение, мкс':>12} {'байт':>7}")
+    for steps in STEPS:
+        game = Game(headless=True, seed=1)
+        for step in range(steps):
+            game.step(controls(step))
+        objects = len(game.meteors) + len(game.rockets) + len(game.powerups) + len(game.particles)
+        target = Game(headless=True, seed=2)
+
+        dump_time, data = measure(lambda: savestate.dumps(game))
+        load_time, _ = measure(lambda: savestate.loads(target, data))
+        assert target.state_digest() == game.state_digest()
+        print(f"{steps:>6} {objects:>9} {'savestate':>10} {dump_time * 1e6:>12.1f} {load_time * 1e6:>12.1f} {len(data):>7}")
+
+        dump_time, data = measure(lambda: pickle.dumps(pickle_state(game), pickle.HIGHEST_PROTOCOL))
+        load_time, _ = measure(lambda: pickle.loads(data))
+        print(f"{'':>6} {'':>9} {'pickle':>10} {dump_time * 1e6:>12.1f} {load_time * 1e6:>12.1f} {len(data):>7}")
+
+
+if __name__ == "__main__":
+    main()
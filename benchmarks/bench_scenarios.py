@@ -0,0 +1,188 @@
+"""Нагрузочные сценарии игрового цикла с базовыми значениями для регрессий.
+
+Каждый сценарий задает свои интервалы появления метеоритов и бонусов и
+сценарий управления, после чего Game прогоняется FRAMES шагов с отрисовкой
+в окно драйвера dummy (SDL), так что монитор не нужен. Меряются среднее и
+p95 времени шага симуляции и отрисовки - медиана по REPEATS прогонам, чтобы
+один прогон, попавший на чужую нагрузку, не решал исход, - а также пик
+памяти (tracemalloc, отдельным прогоном, чтобы трассировка не искажала время).
+
+Результат сравнивается с benchmarks/baselines.json: если среднее время хуже
+базового больше чем на TIME_TOLERANCE, p95 - больше чем на P95_TOLERANCE (но
+в обоих случаях не меньше чем на TIME_FLOOR_MS: доли миллисекунды - шум
+таймера и планировщика), или пик памяти больше чем на MEMORY_TOLERANCE,
+скрипт завершается с кодом 1. Базовые значения зависят от машины; после
+намеренного изменения производительности их обновляют флагом --update.
+
+Запуск: python -m benchmarks.bench_scenarios [--update] [--frames N] [--repeats N] [имена сценариев]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+
+from game import Game, WIDTH, HEIGHT, FIRE, LEFT, RIGHT
+
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines.json")
+FRAMES = 1800  # 30 секунд игрового времени
+SEED = 1
+REPEATS = 5
+TIME_TOLERANCE = 0.25
+P95_TOLERANCE = 0.5      # Хвост распределения шумнее среднего
+TIME_FLOOR_MS = 0.05     # Меньшие прибавки времени не считаются регрессией
+MEMORY_TOLERANCE = 0.10
+
+
+def sweep_fire(frame):
+    """Стрельба каждый второй шаг с проходом корабля влево-вправо."""
+    controls = FIRE if frame % 2 == 0 else 0
+    return controls | (LEFT if frame % 240 < 120 else RIGHT)
+
+
+def sweep(frame):
+    """Проход корабля влево-вправо без стрельбы."""
+    return LEFT if frame % 240 < 120 else RIGHT
+
+
+def explosion_storm(game, frame):
+    """Каждый шаг несколько взрывов крупных метеоритов в случайных точках."""
+    rng = game.rng
+    for _ in range(4):
+        game.particles.explode(rng.randint(0, WIDTH), rng.randint(0, HEIGHT), 50)
+
+
+# имя -> (интервал метеоритов, интервал бонусов, управление, действие на шаге)
+SCENARIOS = {
+    'meteor_shower': ((0, 2), (180, 300), sweep, None),
+    'continuous_fire': ((10, 20), (180, 300), sweep_fire, None),
+    'explosion_storm': ((0, 2), (180, 300), sweep_fire, explosion_storm),
+    'powerup_rain': ((30, 60), (0, 1), sweep, None),
+}
+
+
+def keep_alive(game):
+    """Не давать игре закончиться, чтобы сценарий шел все FRAMES шагов."""
+    ship = game.ship
+    ship.hull_integrity = ship.max_hull
+    ship.fuel = ship.max_fuel
+    ship.oxygen = ship.max_oxygen
+
+
+def make_game(name):
+    meteor_interval, powerup_interval, controls, _ = SCENARIOS[name]
+    game = Game(seed=SEED)
+    game.meteor_spawn_interval = meteor_interval
+    game.powerup_spawn_interval = powerup_interval
+    return game, controls
+
+
+def play(name, frames):
+    """Прогнать сценарий; вернуть массивы времени шага и отрисовки, мс."""
+    game, controls = make_game(name)
+    action = SCENARIOS[name][3]
+    step_times = np.zeros(frames)
+    render_times = np.zeros(frames)
+    clock = time.perf_counter
+    for frame in range(frames):
+        keep_alive(game)
+        if action:
+            action(game, frame)
+        start = clock()
+        game.step(controls(frame))
+        middle = clock()
+        game.render()
+        end = clock()
+        step_times[frame] = (middle - start) * 1000
+        render_times[frame] = (end - middle) * 1000
+    return step_times, render_times, game
+
+
+def measure(name, frames, repeats=REPEATS):
+    runs = []
+    for _ in range(repeats):
+        step_times, render_times, game = play(name, frames)
+        runs.append((step_times.mean(), np.percentile(step_times, 95),
+                     render_times.mean(), np.percentile(render_times, 95)))
+    step_ms, step_p95_ms, render_ms, render_p95_ms = np.median(runs, axis=0).tolist()
+    tracemalloc.start()
+    play(name, frames)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'step_ms': step_ms,
+        'step_p95_ms': step_p95_ms,
+        'render_ms': render_ms,
+        'render_p95_ms': render_p95_ms,
+        'peak_kb': peak / 1024,
+        'meteors': len(game.meteors),
+        'particles': game.particles.count,
+        'powerups': len(game.powerups),
+    }
+
+
+def compare(result, baseline):
+    """Список сообщений о метриках, вышедших за допуск базового значения."""
+    failures = []
+    for metric, tolerance, floor in (('step_ms', TIME_TOLERANCE, TIME_FLOOR_MS),
+                                     ('step_p95_ms', P95_TOLERANCE, TIME_FLOOR_MS),
+                                     ('render_ms', TIME_TOLERANCE, TIME_FLOOR_MS),
+                                     ('render_p95_ms', P95_TOLERANCE, TIME_FLOOR_MS),
+                                     ('peak_kb', MEMORY_TOLERANCE, 0)):
+        if metric not in baseline:
+            continue
+        limit = max(baseline[metric] * (1 + tolerance), baseline[metric] + floor)
+        if result[metric] > limit:
+            failures.append(f"{metric}: {result[metric]:.3f} > {limit:.3f} (базовое {baseline[metric]:.3f})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочные сценарии игрового цикла")
+    parser.add_argument("scenarios", nargs="*", help="имена сценариев (по умолчанию все)")
+    parser.add_argument("--frames", type=int, default=FRAMES)
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="прогонов для медианы времени")
+    parser.add_argument("--update", action="store_true", help="записать результат как базовый")
+    args = parser.parse_args()
+
+    names = args.scenarios or list(SCENARIOS)
+    for name in names:
+        if name not in SCENARIOS:
+            parser.error(f"неизвестный сценарий {name}; есть: {', '.join(SCENARIOS)}")
+
+    baselines = {}
+    if os.path.exists(BASELINES):
+        with open(BASELINES, encoding="utf-8") as f:
+            baselines = json.load(f)
+
+    print(f"{'сценарий':<17}{'шаг, мс':>9}{'p95':>8}{'рендер, мс':>12}{'p95':>8}{'пик, КБ':>10}  объекты")
+    failed = False
+    for name in names:
+        result = measure(name, args.frames, args.repeats)
+        print(f"{name:<17}{result['step_ms']:9.3f}{result['step_p95_ms']:8.3f}"
+              f"{result['render_ms']:12.3f}{result['render_p95_ms']:8.3f}{result['peak_kb']:10.0f}  "
+              f"метеоритов {result['meteors']}, частиц {result['particles']}, бонусов {result['powerups']}")
+        if args.update:
+            baselines[name] = {key: round(value, 4) for key, value in result.items()
+                               if key.endswith('_ms') or key == 'peak_kb'}
+        elif name in baselines:
+            for failure in compare(result, baselines[name]):
+                print(f"  РЕГРЕССИЯ {failure}")
+                failed = True
+
+    if args.update:
+        with open(BASELINES, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Базовые значения записаны в {BASELINES}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Нагрузочный тест сервера: сколько сессий выдерживает одно ядро.
+
+Сервер и N клиентов работают в одном процессе через loopback. Каждый
+клиент играет случайной политикой и подтверждает каждый снимок. Меряется
+время обработки тика сервером (шаги всех игр, снимки, отправка) без учета
+клиентов, из него - стоимость одной сессии и оценка числа сессий на ядро
+при 60 тиках в секунду. Дополнительно - средний размер разностного снимка
+против полного.
+
+Перед замером check_stale_base проверяет медленного клиента: сервер
+пропустил больше HISTORY тиков и шлет две разности от одной старой базы.
+
+Запуск: python -m benchmarks.bench_server
+"""
+import asyncio
+import random
+
+import netcode
+from game import Game, FIRE, LEFT, RIGHT, UP, DOWN, SIM_DT
+from server import GameClient, GameServer, HISTORY
+
+COUNTS = [1, 10, 25, 50, 100]
+TICKS = 240
+
+
+def random_policy(seed):
+    rng = random.Random(seed)
+    moves = (0, LEFT, RIGHT, UP, DOWN)
+    return lambda tick: rng.choice(moves) | (FIRE if tick % 4 < 2 else 0)
+
+
+class SentFrames:
+    """Поток записи клиента, который только запоминает отправленное."""
+
+    def __init__(self):
+        self.frames = []
+
+    def write(self, data):
+        self.frames.append(data)
+
+
+async def check_stale_base():
+    """Разности от базы старше HISTORY тиков, как после пропуска снимков сервером.
+
+    Клиент получает полный снимок тика 1, затем после HISTORY + 36 пропущенных
+    тиков - две разности от базы 1 (подтверждение нового тика еще не дошло
+    до сервера). Вторая разность должна декодироваться, а не падать с KeyError.
+    """
+    game = Game(headless=True, seed=1)
+    states = {}
+    payloads = []
+    base_tick = None
+    for tick in range(1, HISTORY + 40):
+        game.step(FIRE if tick % 4 < 2 else 0)
+        states[tick] = netcode.capture(game)
+        if tick == 1:
+            base_tick = tick
+            payloads.append(netcode.encode_snapshot(tick, states[tick]))
+        elif tick > HISTORY + 36:
+            payloads.append(netcode.encode_snapshot(tick, states[tick], base_tick, states[base_tick]))
+    reader = asyncio.StreamReader()
+    for payload in payloads:
+        reader.feed_data(netcode.frame(netcode.SNAPSHOT, payload))
+    client = GameClient()
+    client.reader = reader
+    client.writer = SentFrames()
+    await client.play(len(payloads))
+    assert client.state == states[client.tick], "состояние клиента расходится с сервером"
+    return client.tick
+
+
+async def load(count):
+    server = GameServer()
+    port = await server.start(port=0)
+    clients = [GameClient(random_policy(i)) for i in range(count)]
+    for i, client in enumerate(clients):
+        await client.connect(port=port, seed=i + 1)
+    runner = asyncio.create_task(server.run(TICKS))
+    await asyncio.gather(*(client.play(TICKS) for client in clients))
+    await runner
+
+    # Полный снимок того же состояния для сравнения размеров
+    full = sum(len(netcode.encode_snapshot(server.tick_count, session.history[server.tick_count]))
+               for session in server.sessions.values()) / count
+    delta = server.bytes_sent / server.snapshots_sent
+    tick = sum(server.tick_times) / len(server.tick_times)
+
+    for client in clients:
+        client.close()
+    await asyncio.sleep(0.05)
+    server.close()
+    await server.server.wait_closed()
+    return tick, delta, full
+
+
+def main():
+    tick = asyncio.run(check_stale_base())
+    print(f"Разности от базы старше {HISTORY} тиков: декодированы до тика {tick}")
+    print(f"{'сессий':>7} {'тик, мс':>9} {'на сессию, мс':>14} {'сессий/ядро':>12} "
+          f"{'снимок, байт':>13} {'полный, байт':>13}")
+    for count in COUNTS:
+        tick, delta, full = asyncio.run(load(count))
+        per_session = tick / count
+        print(f"{count:>7} {tick * 1000:>9.2f} {per_session * 1000:>14.3f} {SIM_DT / per_session:>12.0f} "
+              f"{delta:>13.0f} {full:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
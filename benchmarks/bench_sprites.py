@@ -0,0 +1,70 @@
+"""Отрисовка объектов: примитивы pygame.draw против кэша спрайтов и Surface.blits.
+
+Запуск: python -m benchmarks.bench_sprites
+"""
+import random
+import time
+
+import pygame
+
+from benchmarks import legacy
+from entities import EntityStore
+from game import Meteor, Rocket, Powerup, WIDTH, HEIGHT, POWERUP_TYPES
+
+COUNTS = [100, 1000, 10000]
+FRAMES = 20
+
+
+def make_objects(classes, count, seed):
+    """Создать count объектов: половина метеоритов, по четверти ракет и бонусов."""
+    meteor_class, rocket_class, powerup_class = classes
+    random.seed(seed)
+    rng = random.Random(seed)
+    meteors = [meteor_class() for _ in range(count // 2)]
+    rockets = [rocket_class(rng.randint(0, WIDTH), rng.randint(0, HEIGHT)) for _ in range(count // 4)]
+    powerups = [powerup_class(rng.choice(POWERUP_TYPES)) for _ in range(count // 4)]
+    for obj in meteors + powerups:
+        obj.y = rng.randint(0, HEIGHT)
+    for i, meteor in enumerate(meteors):
+        meteor.hit_flash = i % 3
+    return meteors, rockets, powerups
+
+
+def legacy_frame(screen, groups):
+    for objects in groups:
+        for obj in objects:
+            obj.draw(screen)
+
+
+def sprite_frame(screen, stores):
+    meteors, rockets, powerups = stores
+    screen.blits(meteors.blits() + powerups.blits() + rockets.blits(), False)
+
+
+def run(frame, screen, state):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        frame(screen, state)
+    return (time.perf_counter() - start) / FRAMES
+
+
+def main():
+    screen = pygame.Surface((WIDTH, HEIGHT))
+    print(f"{'N':>6} {'примитивы, мс':>14} {'спрайты, мс':>12} {'ускорение':>10}")
+    for count in COUNTS:
+        groups = make_objects((legacy.Meteor, legacy.Rocket, legacy.Powerup), count, seed=count)
+        before = run(legacy_frame, screen, groups)
+
+        stores = []
+        for view_class, objects in zip((Meteor, Rocket, Powerup),
+                                       make_objects((Meteor, Rocket, Powerup), count, seed=count)):
+            store = EntityStore(view_class)
+            for obj in objects:
+                store.append(obj)
+            stores.append(store)
+        after = run(sprite_frame, screen, stores)
+        print(f"{count:>6} {before * 1000:>14.2f} {after * 1000:>12.2f} {before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
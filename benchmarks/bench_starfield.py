@@ -0,0 +1,51 @@
+"""Звездный фон: отдельные круги Star против заранее отрисованных слоев Starfield.
+
+Запуск: python -m benchmarks.bench_starfield
+"""
+import random
+import time
+
+import pygame
+
+from benchmarks import legacy
+from game import WIDTH, HEIGHT
+from starfield import Starfield
+
+COUNTS = [100, 1000, 10000]
+FRAMES = 60
+
+
+def legacy_frame(screen, stars):
+    screen.fill((0, 0, 0))
+    for star in stars:
+        star.update()
+        star.draw(screen)
+
+
+def starfield_frame(screen, starfield):
+    starfield.update()
+    starfield.draw(screen)
+
+
+def run(frame, screen, state):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        frame(screen, state)
+    return (time.perf_counter() - start) / FRAMES
+
+
+def main():
+    screen = pygame.Surface((WIDTH, HEIGHT))
+    print(f"{'звезд':>6} {'круги, мс':>10} {'слои, мс':>9} {'ускорение':>10}")
+    for count in COUNTS:
+        random.seed(count)
+        stars = [legacy.Star() for _ in range(count)]
+        before = run(legacy_frame, screen, stars)
+        starfield = Starfield(WIDTH, HEIGHT, count)
+        starfield.draw(screen)  # Плитки слоев рисуются при первом выводе
+        after = run(starfield_frame, screen, starfield)
+        print(f"{count:>6} {before * 1000:>10.2f} {after * 1000:>9.2f} {before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Запуск: время импорта модулей, инициализации Pygame и перезапуска игры.
+
+Импорт и инициализация меряются в отдельных процессах (лучшее из REPEATS),
+чтобы модули не были уже загружены. Для импорта показано, загрузился ли
+pygame: безголовой симуляции он не нужен. Перезапуск (reset_game) меряется
+в окне с шрифтами из кэша и с загрузкой двух шрифтов заново, как было раньше.
+
+Запуск: python -m benchmarks.bench_startup
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+REPEATS = 5
+RESETS = 200
+
+# Отложенный модуль до первого обращения имеет другой тип, чем types.ModuleType
+IMPORT_CODE = """
+import json, sys, time, types
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, type(sys.modules.get('pygame')) is types.ModuleType]))
+"""
+
+IMPORTS = [
+    ('spaceship', 'import spaceship'),
+    ('fleet', 'import fleet'),
+    ('game', 'import game'),
+    ('game + Game(headless)', 'import game; game.Game(headless=True, seed=1)'),
+    ('pygame', 'import pygame'),
+]
+
+# Название, подготовка (не меряется), инициализация
+INITS = [
+    ('pygame.init()', 'import pygame', 'pygame.init()'),
+    ('init_pygame()', 'import pygame, game', 'game.init_pygame()'),
+]
+
+INIT_CODE = """
+import json, time
+{setup}
+start = time.perf_counter()
+{statement}
+print(json.dumps([time.perf_counter() - start, True]))
+"""
+
+
+def best_of(code):
+    """Лучшее время и флаг из REPEATS запусков кода в новом процессе."""
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1')
+    results = []
+    for _ in range(REPEATS):
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                env=env, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return min(elapsed for elapsed, _ in results), results[0][1]
+
+
+def main():
+    print(f"{'импорт':<24} {'мс':>8}  pygame загружен")
+    for name, statement in IMPORTS:
+        elapsed, loaded = best_of(IMPORT_CODE.format(statement=statement))
+        print(f"{name:<24} {elapsed * 1000:>8.1f}  {'да' if loaded else 'нет'}")
+
+    print(f"\n{'инициализация':<24} {'мс':>8}")
+    for name, setup, statement in INITS:
+        elapsed, _ = best_of(INIT_CODE.format(setup=setup, statement=statement))
+        print(f"{name:<24} {elapsed * 1000:>8.1f}")
+
+    import pygame
+    from game import Game
+    game = Game(seed=1)
+    start = time.perf_counter()
+    for _ in range(RESETS):
+        game.reset_game()
+    cached = (time.perf_counter() - start) / RESETS
+    start = time.perf_counter()
+    for _ in range(RESETS):
+        game.font = pygame.font.Font(None, 24)
+        game.small_font = pygame.font.Font(None, 20)
+        game.reset_game()
+    reloaded = (time.perf_counter() - start) / RESETS
+    print(f"\n{'перезапуск':<24} {'мс':>8}")
+    print(f"{'шрифты из кэша':<24} {cached * 1000:>8.3f}")
+    print(f"{'загрузка шрифтов':<24} {reloaded * 1000:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Телеметрия: цена записи строки за шаг против синхронной записи JSON.
+
+Безголовая игра прогоняется FRAMES шагов без телеметрии, с Telemetry
+(кольцевой буфер и фоновый поток) и с наивной записью: словарь
+SpaceShip.get_status() и счетчики объектов строкой JSON в файл на каждом
+шаге. Показано среднее время шага, p99 и худший шаг (задержки на диске
+попадают именно в него), размер файла и число отброшенных строк.
+
+Запуск: python -m benchmarks.bench_telemetry
+"""
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_scenarios import keep_alive, sweep_fire
+from game import Game
+from telemetry import Telemetry
+
+FRAMES = 20000
+
+
+class JsonLines:
+    """Синхронная запись строки JSON на каждый шаг, как сделали бы без буфера."""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.dropped = 0
+
+    def record(self, game, step_time):
+        row = game.ship.get_status()
+        row.update(score=game.score, meteors=len(game.meteors), rockets=len(game.rockets),
+                   powerups=len(game.powerups), particles=game.particles.count,
+                   events=[event.name for event in game.mission.active_events],
+                   step_ms=step_time * 1000)
+        self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def run(sink):
+    game = Game(headless=True, seed=1)
+    game.telemetry = sink
+    times = np.zeros(FRAMES)
+    for frame in range(FRAMES):
+        keep_alive(game)
+        start = time.perf_counter()
+        game.step(sweep_fire(frame))
+        times[frame] = time.perf_counter() - start
+    if sink is not None:
+        sink.close()
+    return times
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    sinks = [
+        ('без телеметрии', None, None),
+        ('Telemetry', Telemetry, os.path.join(directory, 'run.tlm')),
+        ('JSON на шаг', JsonLines, os.path.join(directory, 'run.jsonl')),
+    ]
+    print(f"{'запись':<16} {'шаг, мкс':>9} {'p99':>7} {'худший':>8} {'файл, КБ':>9} {'отброшено':>10}")
+    for name, factory, path in sinks:
+        sink = factory(path) if factory else None
+        times = run(sink) * 1e6
+        size = os.path.getsize(path) / 1024 if path else 0
+        dropped = sink.dropped if sink else 0
+        print(f"{name:<16} {times.mean():>9.1f} {np.percentile(times, 99):>7.1f} {times.max():>8.0f}"
+              f" {size:>9.0f} {dropped:>10}")
+        if path:
+            os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Стоимость появления объектов за шаг: случайные таймеры против расписания волн.
+
+Для каждой плотности (метеоритов за шаг) безголовая игра шагает STEPS раз,
+и меряется время появления объектов за шаг: таймеры - scheduler.advance
+с таймерами метеоритов и бонусов, волны - scheduler.advance и
+spawn_wave_entries по расписанию из одной сплошной волны такой же
+плотности. После каждого шага метеориты убираются, чтобы мерить только
+появление, а не их полет и столкновения. Таймер срабатывает не чаще раза
+за шаг, поэтому плотность больше 1 доступна только волнам (count > 1).
+
+Запуск: python -m benchmarks.bench_waves
+"""
+import time
+
+import numpy as np
+
+from benchmarks.bench_scenarios import keep_alive
+from game import Game
+from waves import SEGMENT_STEPS
+
+# метеоритов за шаг -> (интервал, метеоритов за раз)
+DENSITIES = {0.02: (50, 1), 0.1: (10, 1), 0.5: (2, 1), 1: (1, 1), 4: (1, 4)}
+STEPS = SEGMENT_STEPS * 3
+SEED = 1
+
+
+def run(game):
+    """Среднее время появления объектов за шаг, с, и число появившихся метеоритов."""
+    scheduler = game.scheduler
+    meteors = game.meteors
+    engine = game.wave_engine
+    spawned = 0
+    elapsed = 0.0
+    for _ in range(STEPS):
+        keep_alive(game)
+        start = time.perf_counter()
+        scheduler.advance(1)
+        if engine is not None:
+            game.spawn_wave_entries()
+        elapsed += time.perf_counter() - start
+        spawned += len(meteors)
+        meteors.keep(np.zeros(len(meteors), dtype=bool))
+    return elapsed / STEPS, spawned
+
+
+def timers(interval):
+    game = Game(headless=True, seed=SEED, balance={'meteor_spawn_interval': (interval, interval)})
+    return run(game)
+
+
+def waves(interval, count):
+    wave = {'start': 0, 'duration': SEGMENT_STEPS, 'interval': interval, 'count': count, 'pattern': 'random',
+            'sizes': (20, 30, 40, 50), 'speeds': (2, 5)}
+    game = Game(headless=True, seed=SEED, waves=[[wave]] * (STEPS // SEGMENT_STEPS + 1))
+    return run(game)
+
+
+def main():
+    print(f"{'за шаг':>7} {'таймеры, мкс':>13} {'волны, мкс':>11} {'метеоритов':>11}")
+    for density, (interval, count) in DENSITIES.items():
+        wave_time, spawned = waves(interval, count)
+        timer_column = f"{timers(interval)[0] * 1e6:>13.2f}" if count == 1 else f"{'-':>13}"
+        print(f"{density:>7} {timer_column} {wave_time * 1e6:>11.2f} {spawned:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Большой мир с камерой: активная зона и отрисовка по обзору против обновления всего.
+
+Мир WORLD заполняется заданным числом метеоритов, равномерно по площади,
+и игра идет FRAMES шагов с отрисовкой в окно драйвера dummy (SDL). С
+game.lod = True метеориты вне активной зоны двигаются реже и не проверяются
+на столкновения, а выводятся только объекты в обзоре камеры; с False все
+обновляется и рисуется каждый шаг. Меряется среднее время шага и отрисовки.
+
+Перед замером проверяется, что активная зона не меняет исход: при шаге
+EQUIVALENCE_STEPS кадров игры с lod и без него, с самыми быстрыми
+метеоритами и без стрельбы (ракеты выше активной зоны lod отбрасывает
+намеренно), должны совпасть по счету, корпусу и положению метеоритов на
+каждом шаге, а в обзоре камеры не должно быть отставших метеоритов.
+Расхождение - ошибка (код 1).
+
+Запуск: python -m benchmarks.bench_world
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+
+from benchmarks.bench_scenarios import keep_alive, sweep, sweep_fire
+from game import Game, Meteor, MAX_METEOR_SPEED
+
+WORLD = (8000, 6000)
+COUNTS = [1000, 5000, 20000]
+FRAMES = 300
+EQUIVALENCE_STEPS = (1, 8, 16, 24, 32)  # Кадров за шаг
+EQUIVALENCE_WORLD = (2400, 3000)
+EQUIVALENCE_METEORS = 400
+
+
+def populate(game, count):
+    """Добавить count метеоритов в случайных точках мира."""
+    for _ in range(count):
+        game.spawn_meteor()
+    rng = np.random.default_rng(count)
+    meteors = game.meteors
+    meteors.array('y')[:] = rng.uniform(0, game.world_height, len(meteors))
+
+
+def run(count, lod):
+    game = Game(seed=1, world_size=WORLD)
+    game.lod = lod
+    populate(game, count)
+    step_time = render_time = 0.0
+    for frame in range(FRAMES):
+        keep_alive(game)
+        start = time.perf_counter()
+        game.step(sweep_fire(frame))
+        middle = time.perf_counter()
+        game.render()
+        render_time += time.perf_counter() - middle
+        step_time += middle - start
+    return step_time / FRAMES, render_time / FRAMES, len(game.meteors)
+
+
+def stale_in_view(game):
+    """Сколько отставших метеоритов (lod) на самом деле уже в обзоре камеры."""
+    meteors = game.meteors
+    xs, ys, sizes, speeds, moved_at = (meteors.array(name) for name in ('x', 'y', 'size', 'speed', 'moved_at'))
+    ys = ys + speeds * (game.scheduler.time - moved_at)
+    left, top, width, height = game.camera.rect()
+    visible = (moved_at < game.scheduler.time) & (xs + sizes > left) & (xs < left + width) \
+        & (ys + sizes > top) & (ys < top + height)
+    return int(np.count_nonzero(visible))
+
+
+def meteor_state(game):
+    """Метеориты в мире на текущее время, в порядке строк."""
+    meteors = game.meteors
+    if game.lod:
+        Meteor.advance_rows(meteors.columns, slice(0, meteors.count), game.scheduler.time)
+    inside = meteors.array('y') <= game.world_height  # Отставшие еще не отсечены
+    return [meteors.array(name)[inside].tolist() for name in ('x', 'y', 'size', 'speed')]
+
+
+def check_equivalence(frames_per_step, steps=200):
+    """Сыграть одну игру с lod и без; вернуть номер первого расходящегося шага или None."""
+    games = []
+    for lod in (False, True):
+        game = Game(headless=True, seed=7, world_size=EQUIVALENCE_WORLD, frames_per_step=frames_per_step)
+        game.lod = lod
+        populate(game, EQUIVALENCE_METEORS)
+        game.meteors.array('speed')[:] = MAX_METEOR_SPEED
+        games.append(game)
+    for step in range(steps):
+        outcomes = []
+        for game in games:
+            keep_alive(game)
+            game.step(sweep(step * frames_per_step))
+            ship = game.ship
+            stale = stale_in_view(game) if game.lod else 0
+            outcomes.append((game.score, ship.hull_integrity, game.game_active, meteor_state(game), stale))
+        if outcomes[0] != outcomes[1]:
+            return step
+    return None
+
+
+def main():
+    for frames_per_step in EQUIVALENCE_STEPS:
+        step = check_equivalence(frames_per_step)
+        if step is not None:
+            print(f"Активная зона меняет исход при {frames_per_step} кадрах за шаг: расхождение на шаге {step}")
+            return 1
+    print(f"Исход с активной зоной и без совпадает при {', '.join(map(str, EQUIVALENCE_STEPS))} кадрах за шаг")
+    print(f"{'метеоритов':>10} {'режим':>8} {'шаг, мс':>8} {'рендер, мс':>11}")
+    for count in COUNTS:
+        for lod in (False, True):
+            step_time, render_time, _ = run(count, lod)
+            print(f"{count:>10} {'обзор' if lod else 'все':>8} {step_time * 1000:>8.2f} {render_time * 1000:>11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
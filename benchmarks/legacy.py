@@ -0,0 +1,182 @@
+"""Исходные классы объектов на обычных атрибутах - эталон "до" для бенчмарков."""
+import random
+
+import pygame
+
+from game import WIDTH, HEIGHT, RED, GREEN, BLUE, YELLOW, WHITE
+
+
+class Star:
+    def __init__(self):
+        self.x = random.randint(0, WIDTH)
+        self.y = random.randint(0, HEIGHT)
+        self.speed = random.randint(1, 4)
+        self.size = random.randint(1, 2)
+
+    def update(self):
+        self.y += self.speed
+        if self.y > HEIGHT:
+            self.y = 0
+            self.x = random.randint(0, WIDTH)
+
+    def draw(self, screen):
+        pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), self.size)
+
+
+class Meteor:
+    def __init__(self):
+        self.size = random.choice([20, 30, 40, 50])
+        self.x = random.randint(0, WIDTH - self.size)
+        self.y = -self.size
+        self.speed = random.randint(2, 5)
+        self.max_health = max(1, self.size // 20)
+        self.health = self.max_health
+        self.hit_flash = 0
+
+    def update(self):
+        self.y += self.speed
+        if self.hit_flash > 0:
+            self.hit_flash -= 1
+
+    def draw(self, screen):
+        if self.hit_flash > 0:
+            color = (200, 200, 200)
+        else:
+            health_ratio = self.health / self.max_health
+            gray_value = int(100 * health_ratio)
+            color = (gray_value, gray_value, gray_value)
+
+        pygame.draw.circle(screen, color, (int(self.x + self.size // 2), int(self.y + self.size // 2)), self.size // 2)
+        pygame.draw.circle(screen, (80, 80, 80), (int(self.x + self.size // 2), int(self.y + self.size // 2)), self.size // 2, 2)
+
+        if self.max_health > 1:
+            bar_width = self.size
+            bar_height = 4
+            health_width = int(bar_width * (self.health / self.max_health))
+            pygame.draw.rect(screen, RED, (int(self.x), int(self.y - 8), bar_width, bar_height))
+            pygame.draw.rect(screen, GREEN, (int(self.x), int(self.y - 8), health_width, bar_height))
+
+    def take_damage(self, damage=1):
+        self.health -= damage
+        self.hit_flash = 5
+        return self.health <= 0
+
+    def is_off_screen(self):
+        return self.y > HEIGHT
+
+
+class Rocket:
+    def __init__(self, x, y, offset=0):
+        self.x = x + offset
+        self.y = y
+        self.speed = 10
+        self.width = 4
+        self.height = 15
+
+    def update(self):
+        self.y -= self.speed
+
+    def draw(self, screen):
+        pygame.draw.rect(screen, YELLOW, (self.x, self.y, self.width, self.height))
+        pygame.draw.polygon(screen, RED, [(self.x, self.y), (self.x + self.width, self.y), (self.x + self.width // 2, self.y - 5)])
+
+    def is_off_screen(self):
+        return self.y < 0
+
+
+class Powerup:
+    def __init__(self, powerup_type):
+        self.type = powerup_type
+        self.x = random.randint(20, WIDTH - 20)
+        self.y = -20
+        self.speed = 3
+        self.size = 20
+        if powerup_type == 'fuel':
+            self.color = RED
+        elif powerup_type == 'health':
+            self.color = GREEN
+        else:
+            self.color = BLUE
+
+    def update(self):
+        self.y += self.speed
+
+    def draw(self, screen):
+        if self.type == 'fuel':
+            pygame.draw.rect(screen, self.color, (self.x - 10, self.y - 10, 20, 20))
+            pygame.draw.rect(screen, (150, 0, 0), (self.x - 10, self.y - 10, 20, 20), 2)
+        elif self.type == 'health':
+            pygame.draw.rect(screen, self.color, (self.x - 10, self.y - 10, 20, 20))
+            pygame.draw.rect(screen, WHITE, (self.x - 8, self.y - 2, 16, 4))
+            pygame.draw.rect(screen, WHITE, (self.x - 2, self.y - 8, 4, 16))
+        else:
+            pygame.draw.ellipse(screen, self.color, (self.x - 8, self.y - 12, 16, 24))
+            pygame.draw.ellipse(screen, (0, 50, 200), (self.x - 8, self.y - 12, 16, 24), 2)
+
+    def is_off_screen(self):
+        return self.y > HEIGHT
+
+
+class Explosion:
+    """Визуальный эффект взрыва при уничтожении метеорита."""
+    def __init__(self, x, y, size):
+        self.x = x
+        self.y = y
+        self.particles = []
+        # Создание частиц
+        for _ in range(int(size // 5)):
+            angle = random.uniform(0, 2 * 3.14159)
+            speed = random.uniform(1, 4)
+            self.particles.append({
+                'x': x,
+                'y': y,
+                'vx': speed * (random.random() - 0.5) * 2,
+                'vy': speed * (random.random() - 0.5) * 2,
+                'life': 20,
+                'size': random.randint(2, 4)
+            })
+
+    def update(self):
+        for particle in self.particles:
+            particle['x'] += particle['vx']
+            particle['y'] += particle['vy']
+            particle['life'] -= 1
+        self.particles = [p for p in self.particles if p['life'] > 0]
+
+    def draw(self, screen):
+        for particle in self.particles:
+            alpha = particle['life'] / 20
+            color_value = int(255 * alpha)
+            color = (color_value, color_value // 2, 0)  # Оранжевый/желтый
+            pygame.draw.circle(screen, color, (int(particle['x']), int(particle['y'])), particle['size'])
+
+    def is_finished(self):
+        return len(self.particles) == 0
+
+
+def draw_hud(game):
+    """Исходный Game.draw_hud: font.render для каждого текста в каждом кадре."""
+    health_text = game.small_font.render(f"Корпус: {int(game.ship.hull_integrity)}%", True, WHITE)
+    game.screen.blit(health_text, (10, 10))
+    pygame.draw.rect(game.screen, RED, (10, 30, 200, 20), 2)
+    pygame.draw.rect(game.screen, GREEN, (10, 30, int(200 * game.ship.hull_integrity / 100), 20))
+
+    fuel_text = game.small_font.render(f"Топливо: {int(game.ship.fuel)}%", True, WHITE)
+    game.screen.blit(fuel_text, (10, 55))
+    pygame.draw.rect(game.screen, RED, (10, 75, 200, 20), 2)
+    pygame.draw.rect(game.screen, YELLOW, (10, 75, int(200 * game.ship.fuel / 100), 20))
+
+    oxygen_text = game.small_font.render(f"Кислород: {int(game.ship.oxygen)}%", True, WHITE)
+    game.screen.blit(oxygen_text, (10, 100))
+    pygame.draw.rect(game.screen, RED, (10, 120, 200, 20), 2)
+    pygame.draw.rect(game.screen, BLUE, (10, 120, int(200 * game.ship.oxygen / 100), 20))
+
+    score_text = game.small_font.render(f"Счет: {game.score}", True, YELLOW)
+    game.screen.blit(score_text, (10, 145))
+
+    if game.mission.active_events:
+        event_text = game.small_font.render(f"Событие: {game.mission.active_events[-1].value}", True, RED)
+        game.screen.blit(event_text, (WIDTH - 250, 10))
+
+    mission_text = game.small_font.render(f"Миссия: {game.mission.name}", True, WHITE)
+    game.screen.blit(mission_text, (WIDTH - 300, HEIGHT - 30))
@@ -0,0 +1,27 @@
+"""Камера: окно обзора размером с экран над игровым миром большего размера."""
+
+
+class Camera:
+    """Прямоугольник обзора width x height в мировых координатах.
+
+    Камера держит заданную точку (обычно корабль) в центре, но не выходит
+    за края мира world_width x world_height. Отрисовка вычитает (x, y) из
+    мировых координат объектов.
+    """
+
+    def __init__(self, width, height, world_width, world_height):
+        self.width = width
+        self.height = height
+        self.world_width = world_width
+        self.world_height = world_height
+        self.x = 0
+        self.y = 0
+
+    def follow(self, x, y):
+        """Поставить камеру так, чтобы точка (x, y) была в центре, насколько позволяют края мира."""
+        self.x = max(0, min(int(x) - self.width // 2, self.world_width - self.width))
+        self.y = max(0, min(int(y) - self.height // 2, self.world_height - self.height))
+
+    def rect(self, margin=0):
+        """Прямоугольник обзора (x, y, w, h), расширенный на margin с каждой стороны."""
+        return (self.x - margin, self.y - margin, self.width + 2 * margin, self.height + 2 * margin)
@@ -0,0 +1,189 @@
+"""Проверка столкновений: пересечение и касание за шаг прямоугольников, широкая фаза на равномерной сетке.
+
+GridIndex - та же сетка над столбцами NumPy для выборки объектов в области (обзор камеры, активная зона).
+"""
+import numpy as np
+
+
+def rects_overlap(ax, ay, aw, ah, bx, by, bw, bh):
+    """Проверить пересечение двух прямоугольников (как pygame.Rect.colliderect)."""
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+def swept_overlap(ax, ay, aw, ah, dx, dy, bx, by, bw, bh):
+    """Момент первого касания прямоугольника A, сдвигающегося на (dx, dy), с неподвижным B.
+
+    A задан в начале шага. Возвращает долю шага t в [0, 1], с которой
+    прямоугольники пересекаются, или None, если за шаг они не пересекаются.
+    Пересечение строгое, как в rects_overlap; при нулевом сдвиге результат
+    совпадает с rects_overlap (0.0 или None). Если двигаются оба объекта,
+    сдвиг передается относительный: dx = dx_a - dx_b, dy = dy_a - dy_b.
+    """
+    t0 = 0.0
+    t1 = 1.0
+    # По каждой оси проекции пересекаются на открытом интервале t (enter, leave)
+    if dx == 0:
+        if not (ax < bx + bw and bx < ax + aw):
+            return None
+    else:
+        enter = (bx - aw - ax) / dx
+        leave = (bx + bw - ax) / dx
+        if dx < 0:
+            enter, leave = leave, enter
+        t0 = enter if enter > t0 else t0
+        t1 = leave if leave < t1 else t1
+    if dy == 0:
+        if not (ay < by + bh and by < ay + ah):
+            return None
+    else:
+        enter = (by - ah - ay) / dy
+        leave = (by + bh - ay) / dy
+        if dy < 0:
+            enter, leave = leave, enter
+        t0 = enter if enter > t0 else t0
+        t1 = leave if leave < t1 else t1
+    return t0 if t0 < t1 else None
+
+
+class SpatialHash:
+    """Равномерная сетка поверх игрового поля.
+
+    Объекты раскладываются по ячейкам размера cell_size, и запрос по
+    прямоугольнику возвращает только объекты из пересекаемых им ячеек.
+    Объекты за краем поля попадают в крайние ячейки, поэтому ничего не теряется.
+    Пока объектов меньше min_items, сетка не строится и запрос возвращает всех:
+    на малых количествах полный перебор дешевле раскладки по ячейкам.
+    """
+
+    def __init__(self, width, height, cell_size=64, min_items=32):
+        self.cell_size = cell_size
+        self.cols = width // cell_size + 1
+        self.rows = height // cell_size + 1
+        self.min_items = min_items
+        self.cells = {}
+        self.everything = None  # Все ключи, если сетка не строилась
+
+    def clear(self):
+        """Очистить сетку перед новым кадром."""
+        self.cells.clear()
+        self.everything = None
+
+    def _span(self, x, y, w, h):
+        """Вернуть диапазон ячеек (col0, col1, row0, row1), покрываемых прямоугольником."""
+        cs = self.cell_size
+        last_col = self.cols - 1
+        last_row = self.rows - 1
+        col0 = int(x) // cs
+        col1 = int(x + w - 1) // cs
+        row0 = int(y) // cs
+        row1 = int(y + h - 1) // cs
+        col0 = 0 if col0 < 0 else last_col if col0 > last_col else col0
+        col1 = 0 if col1 < 0 else last_col if col1 > last_col else col1
+        row0 = 0 if row0 < 0 else last_row if row0 > last_row else row0
+        row1 = 0 if row1 < 0 else last_row if row1 > last_row else row1
+        return col0, col1, row0, row1
+
+    def build(self, xs, ys, ws, hs):
+        """Заново разложить объекты, ключами служат их индексы в списках."""
+        self.clear()
+        count = len(xs)
+        if count < self.min_items:
+            self.everything = range(count)
+            return
+        for i in range(count):
+            self.insert(i, xs[i], ys[i], ws[i], hs[i])
+
+    def insert(self, item, x, y, w, h):
+        """Добавить объект во все ячейки, которые он покрывает."""
+        col0, col1, row0, row1 = self._span(x, y, w, h)
+        cells = self.cells
+        cols = self.cols
+        for row in range(row0, row1 + 1):
+            base = row * cols
+            for col in range(col0, col1 + 1):
+                bucket = cells.get(base + col)
+                if bucket is None:
+                    cells[base + col] = [item]
+                else:
+                    bucket.append(item)
+
+    def query(self, x, y, w, h):
+        """Вернуть кандидатов из тех же ячеек в порядке их добавления.
+
+        Порядок совпадает с порядком вставки, если объекты добавлялись
+        с возрастающими ключами (например, индексами списка).
+        """
+        if self.everything is not None:
+            return self.everything
+        col0, col1, row0, row1 = self._span(x, y, w, h)
+        cells = self.cells
+        cols = self.cols
+        if col0 == col1 and row0 == row1:
+            return cells.get(row0 * cols + col0, ())
+        found = set()
+        for row in range(row0, row1 + 1):
+            base = row * cols
+            for col in range(col0, col1 + 1):
+                bucket = cells.get(base + col)
+                if bucket:
+                    found.update(bucket)
+        return sorted(found)
+
+
+class GridIndex:
+    """Равномерная сетка над столбцами NumPy, строится одной сортировкой.
+
+    В отличие от SpatialHash, каждый объект попадает ровно в одну ячейку -
+    по своему левому верхнему углу, а строки ячеек лежат подряд в order,
+    поэтому построение - несколько векторных операций без цикла Python.
+    Объект, пересекающий прямоугольник запроса, может начинаться левее и
+    выше него, так что запрос нужно расширять влево и вверх на наибольший
+    размер объекта. Пока сетка не построена, query возвращает None - "все".
+    """
+
+    def __init__(self, width, height, cell_size=128):
+        self.cell_size = cell_size
+        self.cols = width // cell_size + 1
+        self.rows = height // cell_size + 1
+        self.order = None   # Номера строк, упорядоченные по ячейкам
+        self.starts = None  # starts[c]:starts[c + 1] - строки ячейки c в order
+        self.count = 0      # Число строк при построении
+
+    def clear(self):
+        """Забыть раскладку: до следующего build запрос возвращает None."""
+        self.order = None
+        self.starts = None
+        self.count = 0
+
+    def build(self, xs, ys):
+        """Разложить строки по ячейкам по массивам координат левого верхнего угла."""
+        cs = self.cell_size
+        cells = (np.clip(ys // cs, 0, self.rows - 1).astype(np.int64) * self.cols
+                 + np.clip(xs // cs, 0, self.cols - 1).astype(np.int64))
+        total = self.cols * self.rows
+        if total <= np.iinfo(np.int16).max:
+            cells = cells.astype(np.int16)  # Устойчивая сортировка коротких целых - поразрядная
+        self.order = np.argsort(cells, kind='stable')
+        self.starts = np.zeros(total + 1, np.int64)
+        np.cumsum(np.bincount(cells, minlength=total), out=self.starts[1:])
+        self.count = len(xs)
+
+    def query(self, x, y, w, h):
+        """Номера строк из ячеек, которые пересекает прямоугольник, по возрастанию."""
+        if self.order is None:
+            return None
+        cs = self.cell_size
+        last_col = self.cols - 1
+        last_row = self.rows - 1
+        col0 = min(max(int(x) // cs, 0), last_col)
+        col1 = min(max(int(x + w - 1) // cs, 0), last_col)
+        row0 = min(max(int(y) // cs, 0), last_row)
+        row1 = min(max(int(y + h - 1) // cs, 0), last_row)
+        order = self.order
+        starts = self.starts
+        cols = self.cols
+        # Ячейки одного ряда сетки идут подряд, так что ряд - один срез order
+        parts = [order[starts[row * cols + col0]:starts[row * cols + col1 + 1]] for row in range(row0, row1 + 1)]
+        rows = np.concatenate(parts) if len(parts) > 1 else parts[0].copy()
+        rows.sort()
+        return rows
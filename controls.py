@@ -0,0 +1,73 @@
+"""Источники управления кораблем: клавиатура или программный сценарий.
+
+Состояние управления за кадр - битовая маска нажатых клавиш.
+"""
+from lazyimport import lazy_import
+
+pygame = lazy_import("pygame")
+
+LEFT = 1
+RIGHT = 2
+UP = 4
+DOWN = 8
+FIRE = 16
+RESTART = 32
+
+# Соответствие клавиш битам маски; коды клавиш берутся из pygame при создании KeyboardInput
+KEY_BITS = (
+    ('K_LEFT', LEFT),
+    ('K_RIGHT', RIGHT),
+    ('K_UP', UP),
+    ('K_DOWN', DOWN),
+    ('K_SPACE', FIRE),
+    ('K_r', RESTART),
+)
+
+
+class KeyboardInput:
+    """Управление с клавиатуры через pygame."""
+
+    def __init__(self):
+        self.key_bits = [(getattr(pygame, name), bit) for name, bit in KEY_BITS]
+
+    def poll(self, events=()):
+        """Вернуть маску управления для текущего кадра.
+
+        События KEYDOWN учитываются отдельно, чтобы короткое нажатие,
+        отпущенное в пределах одного кадра, не потерялось.
+        """
+        keys = pygame.key.get_pressed()
+        controls = 0
+        key_bits = self.key_bits
+        for key, bit in key_bits:
+            if keys[key]:
+                controls |= bit
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                for key, bit in key_bits:
+                    if event.key == key:
+                        controls |= bit
+        return controls
+
+
+class ScriptedInput:
+    """Программное управление для безголового режима.
+
+    script - последовательность масок по кадрам либо функция frame -> маска.
+    После конца последовательности возвращается default.
+    """
+
+    def __init__(self, script=(), default=0):
+        self.script = script
+        self.default = default
+        self.frame = 0
+
+    def poll(self, events=()):
+        """Вернуть маску управления для очередного кадра."""
+        frame = self.frame
+        self.frame += 1
+        if callable(self.script):
+            return self.script(frame)
+        if frame < len(self.script):
+            return self.script[frame]
+        return self.default
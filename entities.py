@@ -0,0 +1,380 @@
+"""Хранилище игровых объектов в виде структуры массивов NumPy.
+
+Числовые поля однотипных объектов (координаты, скорости, размеры, здоровье)
+лежат в столбцах EntityStore, а сами объекты - тонкие представления строк,
+поэтому игровая логика по-прежнему работает с meteor.x, meteor.take_damage()
+и т.д., а движение и отсечение выполняются одной операцией над массивом.
+Удаленные объекты, на которые больше никто не ссылается, возвращаются в пул
+хранилища и переиспользуются в EntityStore.new() вместо создания новых.
+"""
+import sys
+
+import numpy as np
+
+MAX_POOL = 1024  # Наибольшее число свободных объектов в пуле хранилища
+
+
+class Column:
+    """Поле объекта, значение которого хранится в столбце EntityStore."""
+
+    def __init__(self, dtype=np.float64):
+        self.dtype = dtype
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        store = view._store
+        if store is None:
+            return view._values[self.name]
+        return store.columns[self.name][store.slots[view._id]].item()
+
+    def __set__(self, view, value):
+        store = view._store
+        if store is None:
+            view._values[self.name] = value
+        else:
+            store.columns[self.name][store.slots[view._id]] = value
+
+
+class EntityView:
+    """Базовый класс объекта-представления строки EntityStore.
+
+    До добавления в хранилище объект держит значения полей у себя,
+    после удаления из хранилища получает их обратно.
+    Начальные значения полей задает reset(*args), его же вызывает пул при
+    повторном использовании объекта, поэтому __init__ подкласса не нужен.
+    Подкласс может определить векторные версии своих update/is_off_screen/draw:
+    update_columns(columns, n, frames), off_screen_columns(columns, n[, bounds]) и
+    blits_columns(columns, n, lag). frames - сколько кадров занимает шаг
+    симуляции (больше одного при крупном шаге), bounds - область (left, top,
+    right, bottom), за которой объект удаляется (по умолчанию экран), lag -
+    на сколько кадров отрисовка отстает от последнего шага: объект выводится
+    между прошлым и текущим положением, как при отрисовке корабля.
+    """
+
+    __slots__ = ('_store', '_id', '_values')
+    fields = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = {}
+        for klass in reversed(cls.__mro__):
+            for name, attr in vars(klass).items():
+                if isinstance(attr, Column):
+                    fields[name] = attr.dtype
+        cls.fields = fields
+
+    def __init__(self, *args):
+        self._store = None
+        self._id = -1
+        self._values = {}
+        self.reset(*args)
+
+    def reset(self, *args):
+        """Задать начальные значения полей."""
+
+    @staticmethod
+    def update_columns(columns, n, frames=1):
+        """Векторное обновление первых n строк столбцов на frames кадров."""
+
+    @staticmethod
+    def off_screen_columns(columns, n, bounds=None):
+        """Маска строк, ушедших за экран (или за bounds), или None, если отсечения нет."""
+        return None
+
+    @staticmethod
+    def blits_columns(columns, n, lag=0.0):
+        """Список пар (спрайт, позиция) для Surface.blits."""
+        return []
+
+
+def _unreferenced_count():
+    """Счетчик ссылок объекта, который держит только список хранилища.
+
+    Меряется тем же способом, что и в EntityStore._detach (элемент списка,
+    взятый в локальную переменную), чтобы не зависеть от версии Python.
+    """
+    objects = [EntityView.__new__(EntityView)]
+    for view in objects:
+        return sys.getrefcount(view)
+
+
+UNREFERENCED = _unreferenced_count()
+
+
+class EntityStore:
+    """Набор однотипных объектов со столбцами NumPy.
+
+    Поддерживает интерфейс списка, которым пользовалась игра (append, remove,
+    итерация, индексация, len), плюс пакетные операции update и remove_rows.
+    Строки плотно упакованы в [0, count); у каждого объекта есть постоянный
+    идентификатор, а slots отображает идентификатор в текущую строку.
+    Объект-представление строки создается при первом обращении к нему.
+    """
+
+    def __init__(self, view_class, capacity=64):
+        self.view_class = view_class
+        self.columns = {name: np.zeros(capacity, dtype) for name, dtype in view_class.fields.items()}
+        self.ids = np.zeros(capacity, np.int64)       # строка -> идентификатор
+        self.slots = np.full(capacity, -1, np.int64)  # идентификатор -> строка
+        self.objects = [None] * capacity              # идентификатор -> объект
+        self.free_ids = list(range(capacity - 1, -1, -1))
+        self.count = 0
+        self.pool = []      # Удаленные объекты без внешних ссылок
+        self.allocated = 0  # Сколько объектов создано в new()
+        self.reused = 0     # Сколько объектов new() взял из пула
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def __iter__(self):
+        objects = self.objects
+        return iter([objects[i] or self._view(i) for i in self.ids[:self.count].tolist()])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("индекс объекта вне диапазона")
+        entity_id = int(self.ids[index])
+        return self.objects[entity_id] or self._view(entity_id)
+
+    def _view(self, entity_id):
+        """Создать (или взять из пула) представление строки с идентификатором entity_id."""
+        if self.pool:
+            view = self.pool.pop()
+        else:
+            view = self.view_class.__new__(self.view_class)
+            view._values = {}
+        view._store = self
+        view._id = entity_id
+        self.objects[entity_id] = view
+        return view
+
+    def __contains__(self, view):
+        return getattr(view, "_store", None) is self
+
+    def array(self, name):
+        """Вернуть столбец name для живых объектов (представление, не копия)."""
+        return self.columns[name][:self.count]
+
+    def _grow(self):
+        capacity = len(self.ids)
+        new_capacity = capacity * 2
+        for name, column in self.columns.items():
+            grown = np.zeros(new_capacity, column.dtype)
+            grown[:capacity] = column
+            self.columns[name] = grown
+        ids = np.zeros(new_capacity, np.int64)
+        ids[:capacity] = self.ids
+        self.ids = ids
+        slots = np.full(new_capacity, -1, np.int64)
+        slots[:capacity] = self.slots
+        self.slots = slots
+        self.objects.extend([None] * capacity)
+        self.free_ids.extend(range(new_capacity - 1, capacity - 1, -1))
+
+    def _attach(self, view):
+        """Занять под объект новую строку и вернуть ее номер."""
+        if self.count == len(self.ids):
+            self._grow()
+        row = self.count
+        entity_id = self.free_ids.pop()
+        self.ids[row] = entity_id
+        self.slots[entity_id] = row
+        self.objects[entity_id] = view
+        view._store = self
+        view._id = entity_id
+        self.count = row + 1
+        return row
+
+    def append(self, view):
+        """Добавить объект, перенеся его поля в столбцы."""
+        if view._store is not None:
+            raise ValueError("объект уже находится в хранилище")
+        row = self._attach(view)
+        values = view._values
+        for name, column in self.columns.items():
+            column[row] = values.get(name, 0)
+        values.clear()
+
+    def new(self, *args):
+        """Добавить объект view_class(*args), по возможности взяв его из пула."""
+        if self.pool:
+            view = self.pool.pop()
+            self.reused += 1
+        else:
+            view = self.view_class.__new__(self.view_class)
+            view._values = {}
+            self.allocated += 1
+        row = self._attach(view)
+        for column in self.columns.values():
+            column[row] = 0
+        view.reset(*args)
+        return view
+
+    def extend(self, columns):
+        """Добавить пачку строк: columns - имя столбца -> массив значений одной длины.
+
+        Столбцы, которых нет в columns, заполняются нулями; представления
+        создаются при первом обращении, как после restore.
+        """
+        count = len(next(iter(columns.values())))
+        if count == 0:
+            return
+        while self.count + count > len(self.ids):
+            self._grow()
+        start = self.count
+        end = start + count
+        # Идентификаторы в том же порядке, в каком их выдал бы new()
+        entity_ids = self.free_ids[-count:][::-1]
+        del self.free_ids[-count:]
+        self.ids[start:end] = entity_ids
+        self.slots[entity_ids] = np.arange(start, end)
+        for name, column in self.columns.items():
+            column[start:end] = columns.get(name, 0)
+        self.count = end
+
+    def _detach(self, rows):
+        """Освободить идентификаторы строк rows.
+
+        Объекты без внешних ссылок уходят в пул, остальные получают
+        свои значения обратно, как до добавления в хранилище.
+        """
+        entity_ids = self.ids[rows].tolist()
+        objects = self.objects
+        pool = self.pool
+        values = None
+        for k, entity_id in enumerate(entity_ids):
+            view = objects[entity_id]
+            if view is None:
+                continue
+            view._store = None
+            view._id = -1
+            if sys.getrefcount(view) <= UNREFERENCED and len(pool) < MAX_POOL:
+                pool.append(view)
+            else:
+                if values is None:
+                    values = {name: column[rows].tolist() for name, column in self.columns.items()}
+                view._values.update((name, column_values[k]) for name, column_values in values.items())
+            objects[entity_id] = None
+        self.slots[entity_ids] = -1
+        self.free_ids.extend(entity_ids)
+
+    def remove(self, view):
+        """Удалить один объект, переставив на его место последнюю строку."""
+        if view._store is not self:
+            raise ValueError("объект не находится в этом хранилище")
+        row = int(self.slots[view._id])
+        last = self.count - 1
+        self._detach([row])
+        if row != last:
+            for column in self.columns.values():
+                column[row] = column[last]
+            moved_id = self.ids[last]
+            self.ids[row] = moved_id
+            self.slots[moved_id] = row
+        self.count = last
+
+    def keep(self, mask):
+        """Оставить только строки, отмеченные в маске, сохраняя порядок."""
+        n = self.count
+        mask = np.asarray(mask, dtype=bool)
+        dropped = np.flatnonzero(~mask)
+        if len(dropped) == 0:
+            return
+        self._detach(dropped)
+        kept = np.flatnonzero(mask)
+        m = len(kept)
+        for column in self.columns.values():
+            column[:m] = column[:n][kept]
+        self.ids[:m] = self.ids[:n][kept]
+        self.slots[self.ids[:m]] = np.arange(m)
+        self.count = m
+
+    def remove_rows(self, rows):
+        """Удалить объекты в строках rows одним проходом."""
+        if not rows:
+            return
+        mask = np.ones(self.count, dtype=bool)
+        mask[list(rows)] = False
+        self.keep(mask)
+
+    def clear(self):
+        """Удалить все объекты."""
+        self.keep(np.zeros(self.count, dtype=bool))
+
+    def restore(self, count, columns):
+        """Заменить содержимое count строками из columns (имя -> массив значений).
+
+        Объекты получают идентификаторы 0..count-1; представления создаются
+        при первом обращении.
+        """
+        if self.count:
+            self._detach(np.arange(self.count))
+        while len(self.ids) < count:
+            self._grow()
+        for name, column in self.columns.items():
+            column[:count] = columns[name]
+        self.ids[:count] = np.arange(count)
+        self.slots[:] = -1
+        self.slots[:count] = np.arange(count)
+        self.free_ids = list(range(len(self.ids) - 1, count - 1, -1))
+        self.count = count
+
+    def blits(self, lag=0.0, rows=None, offset=None):
+        """Вернуть пары (спрайт, позиция) объектов для Surface.blits.
+
+        lag - на сколько кадров сдвинуть позиции назад по скорости, к прошлому шагу.
+        rows - номера строк, которые нужно вывести (по умолчанию все),
+        offset - (x, y), вычитаемые из позиций (положение камеры).
+        """
+        if self.count == 0:
+            return []
+        if rows is None and offset is None:
+            return self.view_class.blits_columns(self.columns, self.count, lag)
+        # Выбранные строки собираются в отдельные столбцы, блиты подкласса не меняются
+        rows = slice(0, self.count) if rows is None else rows
+        columns = {name: column[rows] for name, column in self.columns.items()}
+        if offset is not None:
+            columns['x'] = columns['x'] - offset[0]
+            columns['y'] = columns['y'] - offset[1]
+        return self.view_class.blits_columns(columns, len(columns['x']), lag)
+
+    def rows_in(self, left, top, width, height, margin=0):
+        """Номера строк, чья точка (x, y) лежит в прямоугольнике, расширенном на margin."""
+        x = self.array('x')
+        y = self.array('y')
+        return np.flatnonzero((x >= left - margin) & (x < left + width + margin)
+                              & (y >= top - margin) & (y < top + height + margin))
+
+    def update(self, frames=1, bounds=None):
+        """Сдвинуть все объекты на frames кадров и отсечь ушедшие за экран или за bounds."""
+        self.move(frames)
+        self.cull(bounds)
+
+    def move(self, frames=1):
+        """Сдвинуть все объекты на frames кадров без отсечения."""
+        if self.count:
+            self.view_class.update_columns(self.columns, self.count, frames)
+
+    def cull(self, bounds=None):
+        """Удалить объекты, ушедшие за экран или за область bounds (left, top, right, bottom)."""
+        n = self.count
+        if n == 0:
+            return
+        if bounds is None:
+            off_screen = self.view_class.off_screen_columns(self.columns, n)
+        else:
+            off_screen = self.view_class.off_screen_columns(self.columns, n, bounds)
+        if off_screen is not None and off_screen.any():
+            self.keep(~off_screen)
@@ -0,0 +1,301 @@
+"""Флот: много кораблей и их экипажи в столбцах NumPy.
+
+Fleet хранит корабли и членов экипажа в EntityStore, поэтому пакетные
+операции (расход топлива, урон, ремонт и т.д.) выполняются над всем флотом
+одним вызовом, а отдельный корабль остается объектом SpaceShip с обычными
+методами: fleet.add_ship() возвращает представление строки флота.
+
+Экипаж живет своей жизнью: Fleet.tick_crew() за шаг копит усталость
+дежурных, отправляет выбившихся из сил отдыхать, наносит травмы от
+активных событий миссии на кораблях и лечит раненых силами медиков того же
+корабля - все это операциями над столбцами экипажа, без цикла по людям.
+"""
+import numpy as np
+
+from entities import Column, EntityStore, EntityView
+from spaceship import EVENT_BITS, CrewMember, MissionEvent, Role, SpaceShip
+
+ROLES = list(Role)
+
+# Навыки со своими столбцами, по одному на роль в порядке ROLES
+SKILLS = ('piloting', 'repair', 'medicine', 'science', 'navigation')
+
+# Модель экипажа; скорости - за шаг симуляции
+MAX_FATIGUE = 100
+FATIGUE_RATE = 0.05   # Усталость дежурного
+REST_RATE = 0.25      # Восстановление отдыхающего
+RESTED = 20           # Отдыхающий возвращается на дежурство при такой усталости
+MEDIC_RATE = 0.02     # Здоровье за шаг от медика с навыком medicine = 100
+# Травмы экипажа от событий миссии на корабле: здоровье за шаг
+CREW_INJURY = {
+    MissionEvent.SOLAR_FLARE: 0.05,
+    MissionEvent.OXYGEN_LEAK: 0.03,
+    MissionEvent.SYSTEM_MALFUNCTION: 0.01,
+}
+
+
+class FleetShip(EntityView, SpaceShip):
+    """Корабль флота: числовые поля SpaceShip лежат в столбцах Fleet.ships."""
+    fuel = Column()
+    max_fuel = Column()
+    hull_integrity = Column()
+    max_hull = Column()
+    speed = Column()
+    max_speed = Column()
+    oxygen = Column()
+    max_oxygen = Column()
+    events = Column(np.int64)  # Маска активных событий миссии (EVENT_BITS)
+
+    def __init__(self, name, fuel=100, hull_integrity=100, speed=0):
+        EntityView.__init__(self)
+        SpaceShip.__init__(self, name, fuel, hull_integrity, speed)
+
+
+class FleetCrewMember(EntityView, CrewMember):
+    """Член экипажа флота: здоровье, роль, усталость и навыки в столбцах Fleet.crew.
+
+    Навыки из SKILLS лежат в одноименных столбцах, прочие - в extra_skills.
+    skills собирается из них при чтении, поэтому менять навык нужно
+    присваиванием столбца (member.medicine = 90) или всего словаря skills.
+    """
+    health = Column()
+    max_health = Column()
+    role_index = Column(np.int64)
+    ship_id = Column(np.int64)  # Идентификатор корабля в Fleet.ships
+    fatigue = Column()
+    resting = Column(np.bool_)
+    piloting = Column()
+    repair = Column()
+    medicine = Column()
+    science = Column()
+    navigation = Column()
+
+    def __init__(self, name, role, health=100, skills=None):
+        EntityView.__init__(self)
+        self.status = None  # (имя, роль, здоровье) и строка get_status для них
+        CrewMember.__init__(self, name, role, health, skills)
+
+    @property
+    def role(self):
+        return ROLES[self.role_index]
+
+    @role.setter
+    def role(self, role):
+        self.role_index = ROLES.index(role)
+
+    @property
+    def skills(self):
+        skills = {name: getattr(self, name) for name in SKILLS if getattr(self, name)}
+        skills.update(self.extra_skills)
+        return skills
+
+    @skills.setter
+    def skills(self, skills):
+        for name in SKILLS:
+            setattr(self, name, skills.get(name, 0))
+        self.extra_skills = {name: value for name, value in skills.items() if name not in SKILLS}
+
+    def get_status(self):
+        """Строка статуса; форматируется заново, только когда изменились имя, роль или здоровье."""
+        key = (self.name, self.role_index, self.health)
+        if self.status is None or self.status[0] != key:
+            self.status = (key, CrewMember.get_status(self))
+        return self.status[1]
+
+
+class Fleet:
+    """N кораблей с экипажами и пакетные операции над ними.
+
+    Массивы полей (fleet.array('fuel') и т.п.) идут в порядке строк хранилища,
+    который меняется при удалении кораблей. Аргумент amount пакетных операций -
+    число или массив по строкам, where - необязательная маска или индексы
+    строк, к которым операция применяется. Ограничения те же, что у
+    методов SpaceShip и CrewMember.
+    """
+
+    def __init__(self, capacity=64):
+        self.ships = EntityStore(FleetShip, capacity)
+        self.crew = EntityStore(FleetCrewMember, capacity)
+        # Кэш строк статуса по идентификатору члена экипажа: здоровье и роль,
+        # для которых строка построена (NaN - строки нет), и сама строка
+        self.status_health = np.full(capacity, np.nan)
+        self.status_role = np.zeros(capacity, np.int64)
+        self.status_text = [None] * capacity
+
+    def __len__(self):
+        return len(self.ships)
+
+    def __iter__(self):
+        return iter(self.ships)
+
+    def __getitem__(self, index):
+        return self.ships[index]
+
+    def array(self, name):
+        """Столбец name всех кораблей (представление, не копия)."""
+        return self.ships.array(name)
+
+    def add_ship(self, name, fuel=100, hull_integrity=100, speed=0):
+        """Добавить корабль и вернуть его представление."""
+        ship = FleetShip(name, fuel, hull_integrity, speed)
+        self.ships.append(ship)
+        return ship
+
+    def add_crew(self, ship, name, role, health=100, skills=None):
+        """Добавить члена экипажа на корабль ship."""
+        member = FleetCrewMember(name, role, health, skills)
+        member.ship_id = ship._id
+        self.crew.append(member)
+        if member._id >= len(self.status_health):
+            grow = len(self.crew.ids) - len(self.status_health)
+            self.status_health = np.concatenate((self.status_health, np.full(grow, np.nan)))
+            self.status_role = np.concatenate((self.status_role, np.zeros(grow, np.int64)))
+            self.status_text.extend([None] * grow)
+        self.status_health[member._id] = np.nan  # Идентификатор мог остаться от удаленного
+        return member
+
+    def remove_ship(self, ship):
+        """Удалить корабль вместе с экипажем."""
+        self.crew.keep(self.crew.array('ship_id') != ship._id)
+        self.ships.remove(ship)
+
+    def crew_of(self, ship):
+        """Члены экипажа корабля ship."""
+        rows = np.flatnonzero(self.crew.array('ship_id') == ship._id)
+        return [self.crew[row] for row in rows.tolist()]
+
+    def crew_status(self, rows=None):
+        """Строки get_status экипажа по строкам rows (по умолчанию всех).
+
+        Изменившиеся с прошлого вызова здоровье и роль находятся сравнением
+        столбцов, и заново форматируются только строки этих членов экипажа.
+        Имя считается неизменным после add_crew.
+        """
+        crew = self.crew
+        if rows is None:
+            rows = np.arange(len(crew))
+        ids = crew.ids[rows]
+        health = crew.array('health')[rows]
+        role = crew.array('role_index')[rows]
+        stale = (health != self.status_health[ids]) | (role != self.status_role[ids])
+        text = self.status_text
+        for row in np.asarray(rows)[stale].tolist():
+            text[int(crew.ids[row])] = crew[row].get_status()
+        self.status_health[ids] = health
+        self.status_role[ids] = role
+        return [text[entity_id] for entity_id in ids.tolist()]
+
+    def crew_rows(self, where):
+        """Маска членов экипажа, чьи корабли выбраны маской или индексами where."""
+        selected = np.zeros(len(self.ships), dtype=bool)
+        selected[where] = True
+        ship_rows = self.ships.slots[self.crew.array('ship_id')]
+        return selected[ship_rows]
+
+    def set_events(self, events, where=None):
+        """Отметить на кораблях активные события миссии (например, mission.active_events)."""
+        mask = 0
+        for event in events:
+            mask |= EVENT_BITS[event]
+        self._apply(self.array('events'), mask, where)
+
+    @staticmethod
+    def _apply(column, values, where):
+        """Записать values в column целиком или только в строки where."""
+        if where is None:
+            column[:] = values
+        else:
+            column[where] = values[where] if np.ndim(values) else values
+
+    # Пакетные версии методов SpaceShip
+
+    def consume_fuel(self, amount, where=None):
+        """Списать топливо там, где его хватает; вернуть маску успешных списаний."""
+        fuel = self.array('fuel')
+        enough = fuel >= amount
+        if where is not None:
+            selected = np.zeros(len(fuel), dtype=bool)
+            selected[where] = True
+            enough &= selected
+        np.subtract(fuel, amount, out=fuel, where=enough)
+        return enough
+
+    def refuel(self, amount, where=None):
+        self._apply(self.array('fuel'), np.minimum(self.array('max_fuel'), self.array('fuel') + amount), where)
+
+    def take_damage(self, damage, where=None):
+        """Нанести урон корпусам; вернуть маску уцелевших кораблей."""
+        hull = self.array('hull_integrity')
+        self._apply(hull, np.maximum(0, hull - damage), where)
+        return hull > 0
+
+    def repair(self, amount, where=None):
+        hull = self.array('hull_integrity')
+        self._apply(hull, np.minimum(self.array('max_hull'), hull + amount), where)
+
+    def consume_oxygen(self, amount, where=None):
+        oxygen = self.array('oxygen')
+        self._apply(oxygen, np.maximum(0, oxygen - amount), where)
+
+    def refill_oxygen(self, amount, where=None):
+        oxygen = self.array('oxygen')
+        self._apply(oxygen, np.minimum(self.array('max_oxygen'), oxygen + amount), where)
+
+    def accelerate(self, delta, where=None):
+        speed = self.array('speed')
+        self._apply(speed, np.clip(speed + delta, 0, self.array('max_speed')), where)
+
+    # Пакетные версии методов CrewMember (маска where - по строкам экипажа)
+
+    def damage_crew(self, damage, where=None):
+        """Нанести урон экипажу; вернуть маску живых членов экипажа."""
+        health = self.crew.array('health')
+        self._apply(health, np.maximum(0, health - damage), where)
+        return health > 0
+
+    def heal_crew(self, amount, where=None):
+        health = self.crew.array('health')
+        self._apply(health, np.minimum(self.crew.array('max_health'), health + amount), where)
+
+    def tick_crew(self, frames=1):
+        """Шаг жизни экипажа длиной frames кадров; вернуть маску живых.
+
+        Дежурные устают, отдыхающие восстанавливаются: при MAX_FATIGUE член
+        экипажа уходит отдыхать и возвращается, когда усталость падает до
+        RESTED. События миссии на корабле (set_events) наносят травмы по
+        CREW_INJURY. Дежурные медики лечат раненых своего корабля: сила
+        медика MEDIC_RATE * medicine / 100 падает с усталостью вдвое к
+        MAX_FATIGUE, и сумма по кораблю делится поровну между ранеными.
+        """
+        crew = self.crew
+        n = len(crew)
+        health = crew.array('health')
+        if n == 0:
+            return health > 0
+        fatigue = crew.array('fatigue')
+        resting = crew.array('resting')
+        alive = health > 0
+        ship_rows = self.ships.slots[crew.array('ship_id')]
+
+        on_duty = alive & ~resting
+        fatigue += np.where(on_duty, FATIGUE_RATE * frames, np.where(alive, -REST_RATE * frames, 0))
+        np.clip(fatigue, 0, MAX_FATIGUE, out=fatigue)
+        resting[:] = alive & np.where(resting, fatigue > RESTED, fatigue >= MAX_FATIGUE)
+
+        ship_events = self.array('events')[ship_rows]
+        injury = np.zeros(n)
+        for event, rate in CREW_INJURY.items():
+            injury += np.where(ship_events & EVENT_BITS[event], rate, 0)
+
+        medics = on_duty & (crew.array('role_index') == ROLES.index(Role.MEDIC))
+        power = MEDIC_RATE / 100 * crew.array('medicine') * (1 - fatigue / (2 * MAX_FATIGUE))
+        ships = len(self.ships)
+        care = np.bincount(ship_rows[medics], weights=power[medics], minlength=ships)
+        injured = alive & (health < crew.array('max_health'))
+        patients = np.bincount(ship_rows[injured], minlength=ships)
+        heal = np.where(injured, care[ship_rows] / np.maximum(patients[ship_rows], 1), 0)
+
+        health += (heal - injury) * frames
+        np.clip(health, 0, crew.array('max_health'), out=health)
+        health[~alive] = 0
+        return health > 0
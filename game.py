@@ -1,14 +1,35 @@
-import pygame
+import argparse
+import numpy as np
 import random
 import sys
-from spaceship import SpaceShip, CrewMember, Mission, Role, MissionEvent
+import time
+import zlib
+from collections import deque
+from spaceship import SpaceShip, CrewMember, Mission, Role, MissionEvent, Scheduler
+from entities import EntityStore, EntityView, Column
+from particles import ParticleSystem
+from sprites import SpriteCache, new_sprite
+from hud import Hud
+from profiler import FrameProfiler
+from starfield import Starfield
+from collision import SpatialHash, GridIndex, swept_overlap
+from camera import Camera
+from controls import KeyboardInput, ScriptedInput, LEFT, RIGHT, UP, DOWN, FIRE, RESTART
+from replay import Recording, InputRecorder, ReplayInput
+from telemetry import Telemetry
+from waves import CAMPAIGN, METEOR, WaveEngine
+import savestate
+from lazyimport import lazy_import
 
-# Инициализация Pygame
-pygame.init()
+pygame = lazy_import("pygame")  # Загружается при первой отрисовке; безголовой игре не нужен
 
 # Константы
 WIDTH, HEIGHT = 800, 600
-FPS = 60
+FPS = 60                  # Частота шагов симуляции; скорости и таймеры заданы в шагах
+SIM_DT = 1.0 / FPS        # Длительность шага симуляции, с
+MAX_STEPS_PER_FRAME = 5   # Больше шагов за кадр не догоняем, лишнее время отбрасываем
+MAX_RENDER_FPS = 240      # Ограничение частоты отрисовки (0 - без ограничения)
+QUICKSAVE_PATH = "quicksave.sav"  # Быстрое сохранение: F5 - записать, F9 - загрузить
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 RED = (255, 0, 0)
@@ -17,63 +38,187 @@ BLUE = (0, 100, 255)
 YELLOW = (255, 255, 0)
 ORANGE = (255, 165, 0)
 GRAY = (100, 100, 100)
+PARTICLE_CAPACITY = 4096  # Емкость общего буфера частиц взрывов
+STAR_COUNT = 100
+# Режимы волн: авторские сегменты (дальше - процедурные) или только процедурные
+WAVES = {'authored': CAMPAIGN, 'procedural': []}
+# Способы отрисовки: sprites - звезды плитками слоев, частицы спрайтами через blits;
+# pixels - звезды и частицы записываются прямо в пиксели экрана (pixels.py)
+RENDERERS = ('sprites', 'pixels')
+LOD_MARGIN = 256    # Активная зона - обзор камеры плюс столько пикселей с каждой стороны (не меньше, см. Game.lod_margin)
+LOD_INTERVAL = 4    # Метеориты вне активной зоны двигаются раз в столько шагов
+MAX_METEOR_SIZE = 50
+MAX_METEOR_SPEED = 8  # Пикселей за кадр; быстрее всех метеориты поздних процедурных волн (waves.py)
+METEOR_SPAWN_INTERVAL = (30, 60)     # Пределы порога счетчика появления метеоритов (см. spawn_delay)
+POWERUP_SPAWN_INTERVAL = (180, 300)  # То же для бонусов
+EVENT_INTERVAL = 300                 # Шагов между проверками события миссии
+# Цели миссии и их условия; каждая выполненная цель повышает сложность волн
+OBJECTIVE_SURVIVE = "Выжить 5 минут"
+OBJECTIVE_COLLECT = "Собрать ресурсы"
+OBJECTIVE_AVOID = "Избежать астероидов"
+SURVIVE_STEPS = 5 * 60 * FPS  # Продержаться столько шагов
+COLLECT_GOAL = 10             # Собрать столько бонусов
+AVOID_STEPS = 2 * 60 * FPS    # Столько шагов подряд без столкновения с метеоритом
 
-class Star:
-    """Фоновая звездная частица."""
-    def __init__(self):
-        self.x = random.randint(0, WIDTH)
-        self.y = random.randint(0, HEIGHT)
-        self.speed = random.randint(1, 4)
-        self.size = random.randint(1, 2)
-    
-    def update(self):
-        self.y += self.speed
-        if self.y > HEIGHT:
-            self.y = 0
-            self.x = random.randint(0, WIDTH)
-    
-    def draw(self, screen):
-        pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), self.size)
+# Параметры баланса: атрибут Game -> значение по умолчанию.
+# Переопределяются аргументом Game(balance={...}), например в montecarlo.py.
+BALANCE = {
+    'meteor_spawn_interval': METEOR_SPAWN_INTERVAL,
+    'powerup_spawn_interval': POWERUP_SPAWN_INTERVAL,
+    'fuel_interval': 60,      # Расход топлива после каждых fuel_interval шагов (раз в 61 шаг)
+    'fuel_rate': 0.5,         # Расход топлива за раз
+    'oxygen_interval': 90,    # Расход кислорода после каждых oxygen_interval шагов (раз в 91 шаг)
+    'oxygen_rate': 1,         # Расход кислорода за раз
+    'fuel_powerup': 30,       # Топливо от бонуса
+    'health_powerup': 25,     # Ремонт корпуса от бонуса
+    'oxygen_powerup': 30,     # Кислород от бонуса
+    'event_chance': 0.3,      # Вероятность события миссии при каждой проверке (раз в 301 шаг)
+}
+POWERUP_TYPES = ('fuel', 'health', 'oxygen')
+POWERUP_COLORS = (RED, GREEN, BLUE)
+
+# Общий кэш спрайтов метеоритов, бонусов, ракет и корабля
+SPRITES = SpriteCache()
+
+# Загруженные шрифты по размеру: переживают перезапуск игры
+FONTS = {}
+
+
+def spawn_delay(rng, interval):
+    """Шагов до следующего появления объекта при пределах interval = (low, high).
 
-class Meteor:
+    Раньше счетчик рос на 1 за кадр, и объект появлялся, как только счетчик
+    превышал заново выбранное rng.randint(low, high). Здесь те же броски
+    делаются разом, поэтому промежутки распределены точно так же (в среднем
+    короче середины interval), а каждый кадр ничего не проверяется.
+    """
+    low, high = interval
+    delay = low + 1
+    while delay <= rng.randint(low, high):
+        delay += 1
+    return delay
+
+
+def init_pygame():
+    """Инициализировать подсистемы Pygame, нужные окну: экран и шрифты.
+
+    Звук и джойстики (полный pygame.init()) игре не нужны.
+    """
+    if pygame is None:
+        raise ImportError("Для игры в окне нужен pygame: pip install pygame")
+    pygame.display.init()
+    pygame.font.init()
+
+
+def load_font(size):
+    """Шрифт по умолчанию размера size, загруженный один раз."""
+    font = FONTS.get(size)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = FONTS[size] = pygame.font.Font(None, size)
+    return font
+
+
+class Meteor(EntityView):
     """Метеорит - препятствие."""
-    def __init__(self):
-        self.size = random.choice([20, 30, 40, 50])
-        self.x = random.randint(0, WIDTH - self.size)
+    __slots__ = ()
+    x = Column()
+    y = Column()
+    speed = Column()
+    size = Column(np.int64)
+    max_health = Column(np.int64)
+    health = Column(np.int64)
+    hit_flash = Column(np.int64)
+    moved_at = Column(np.int64)  # Время симуляции, которому соответствует положение (ведется при Game.lod)
+    
+    def reset(self, rng=random, width=WIDTH, time=0):
+        self.size = rng.choice([20, 30, 40, 50])
+        self.x = rng.randint(0, width - self.size)
         self.y = -self.size
-        self.speed = random.randint(2, 5)
+        self.speed = rng.randint(2, 5)
         # Уменьшенное здоровье - теперь маленькие метеориты уничтожаются за 1-2 попадания, большие за 2-5
         self.max_health = max(1, self.size // 20)
         self.health = self.max_health
         self.hit_flash = 0  # Визуальная обратная связь при попадании
+        self.moved_at = time
     
     def update(self):
         self.y += self.speed
         if self.hit_flash > 0:
             self.hit_flash -= 1
     
-    def draw(self, screen):
+    @staticmethod
+    def update_columns(columns, n, frames=1):
+        columns['y'][:n] += columns['speed'][:n] * frames
+        hit_flash = columns['hit_flash'][:n]
+        np.subtract(hit_flash, np.minimum(hit_flash, frames), out=hit_flash)
+    
+    @staticmethod
+    def advance_rows(columns, rows, time):
+        """Догнать строки rows (срез или номера) до времени time, сколько бы шагов они ни пропустили."""
+        elapsed = time - columns['moved_at'][rows]
+        columns['y'][rows] += columns['speed'][rows] * elapsed
+        hit_flash = columns['hit_flash'][rows]
+        columns['hit_flash'][rows] = hit_flash - np.minimum(hit_flash, elapsed)
+        columns['moved_at'][rows] = time
+    
+    @staticmethod
+    def off_screen_columns(columns, n, bounds=(0, 0, WIDTH, HEIGHT)):
+        return columns['y'][:n] > bounds[3]
+    
+    @staticmethod
+    def render_sprite(size, health, max_health, flashing):
+        """Нарисовать метеорит с полоской здоровья; начало спрайта - (x, y - 8)."""
+        sprite = new_sprite(size + 1, size + 9)
         # Вспышка белым при попадании
-        if self.hit_flash > 0:
+        if flashing:
             color = (200, 200, 200)
         else:
             # Цвет в зависимости от здоровья - темнеет при повреждении
-            health_ratio = self.health / self.max_health
+            health_ratio = health / max_health
             gray_value = int(100 * health_ratio)
             color = (gray_value, gray_value, gray_value)
         
-        pygame.draw.circle(screen, color, (int(self.x + self.size // 2), int(self.y + self.size // 2)), self.size // 2)
-        pygame.draw.circle(screen, (80, 80, 80), (int(self.x + self.size // 2), int(self.y + self.size // 2)), self.size // 2, 2)
+        pygame.draw.circle(sprite, color, (size // 2, 8 + size // 2), size // 2)
+        pygame.draw.circle(sprite, (80, 80, 80), (size // 2, 8 + size // 2), size // 2, 2)
         
         # Отрисовка полоски здоровья для больших метеоритов
-        if self.max_health > 1:
-            bar_width = self.size
+        if max_health > 1:
+            bar_width = size
             bar_height = 4
-            health_width = int(bar_width * (self.health / self.max_health))
+            health_width = int(bar_width * (health / max_health))
             # Фон
-            pygame.draw.rect(screen, RED, (int(self.x), int(self.y - 8), bar_width, bar_height))
+            pygame.draw.rect(sprite, RED, (0, 0, bar_width, bar_height))
             # Здоровье
-            pygame.draw.rect(screen, GREEN, (int(self.x), int(self.y - 8), health_width, bar_height))
+            pygame.draw.rect(sprite, GREEN, (0, 0, health_width, bar_height))
+        return sprite
+    
+    def draw(self, screen):
+        sprite = SPRITES.get(('meteor', self.size, self.health, self.max_health, self.hit_flash > 0),
+                             self.render_sprite, self.size, self.health, self.max_health, self.hit_flash > 0)
+        screen.blit(sprite, (int(self.x), int(self.y) - 8))
+    
+    @staticmethod
+    def blits_columns(columns, n, lag=0.0):
+        """Пары (спрайт, позиция) для Surface.blits по первым n строкам."""
+        render = Meteor.render_sprite
+        get = SPRITES.get
+        y = columns['y'][:n]
+        if lag:
+            y = y - columns['speed'][:n] * lag
+        result = []
+        for x, y, size, health, max_health, flashing in zip(
+                columns['x'][:n].astype(np.int64).tolist(),
+                y.astype(np.int64).tolist(),
+                columns['size'][:n].tolist(),
+                columns['health'][:n].tolist(),
+                columns['max_health'][:n].tolist(),
+                (columns['hit_flash'][:n] > 0).tolist()):
+            sprite = get(('meteor', size, health, max_health, flashing),
+                         render, size, health, max_health, flashing)
+            result.append((sprite, (x, y - 8)))
+        return result
     
     def take_damage(self, damage=1):
         """Нанести урон метеориту и вернуть True, если уничтожен."""
@@ -84,9 +229,16 @@ class Meteor:
     def is_off_screen(self):
         return self.y > HEIGHT
 
-class Rocket:
+class Rocket(EntityView):
     """Ракета игрока - снаряд."""
-    def __init__(self, x, y, offset=0):
+    __slots__ = ()
+    x = Column()
+    y = Column()
+    speed = Column()
+    width = Column(np.int64)
+    height = Column(np.int64)
+    
+    def reset(self, x, y, offset=0):
         self.x = x + offset
         self.y = y
         self.speed = 10
@@ -96,99 +248,240 @@ class Rocket:
     def update(self):
         self.y -= self.speed
     
+    @staticmethod
+    def update_columns(columns, n, frames=1):
+        columns['y'][:n] -= columns['speed'][:n] * frames
+    
+    @staticmethod
+    def off_screen_columns(columns, n, bounds=(0, 0, WIDTH, HEIGHT)):
+        return columns['y'][:n] < bounds[1]
+    
+    @staticmethod
+    def render_sprite(width, height):
+        """Нарисовать ракету с головной частью; начало спрайта - (x, y - 5)."""
+        sprite = new_sprite(width + 1, height + 5)
+        pygame.draw.rect(sprite, YELLOW, (0, 5, width, height))
+        pygame.draw.polygon(sprite, RED, [(0, 5), (width, 5), (width // 2, 0)])
+        return sprite
+    
     def draw(self, screen):
-        pygame.draw.rect(screen, YELLOW, (self.x, self.y, self.width, self.height))
-        pygame.draw.polygon(screen, RED, [(self.x, self.y), (self.x + self.width, self.y), (self.x + self.width // 2, self.y - 5)])
+        sprite = SPRITES.get(('rocket', self.width, self.height), self.render_sprite, self.width, self.height)
+        screen.blit(sprite, (int(self.x), int(self.y) - 5))
+    
+    @staticmethod
+    def blits_columns(columns, n, lag=0.0):
+        """Пары (спрайт, позиция) для Surface.blits по первым n строкам."""
+        render = Rocket.render_sprite
+        get = SPRITES.get
+        y = columns['y'][:n]
+        if lag:
+            y = y + columns['speed'][:n] * lag
+        return [
+            (get(('rocket', width, height), render, width, height), (x, y - 5))
+            for x, y, width, height in zip(
+                columns['x'][:n].astype(np.int64).tolist(),
+                y.astype(np.int64).tolist(),
+                columns['width'][:n].tolist(),
+                columns['height'][:n].tolist())
+        ]
     
     def is_off_screen(self):
         return self.y < 0
 
-class Powerup:
+class Powerup(EntityView):
     """Собираемый бонус."""
-    def __init__(self, powerup_type):
+    __slots__ = ()
+    x = Column()
+    y = Column()
+    speed = Column()
+    size = Column(np.int64)
+    kind = Column(np.int64)  # Индекс типа в POWERUP_TYPES
+    
+    def reset(self, powerup_type, rng=random, width=WIDTH):
         self.type = powerup_type  # 'fuel', 'health', 'oxygen'
-        self.x = random.randint(20, WIDTH - 20)
+        self.x = rng.randint(20, width - 20)
         self.y = -20
         self.speed = 3
         self.size = 20
-        
-        if powerup_type == 'fuel':
-            self.color = RED
-        elif powerup_type == 'health':
-            self.color = GREEN
-        else:  # oxygen
-            self.color = BLUE
+    
+    @property
+    def type(self):
+        return POWERUP_TYPES[self.kind]
+    
+    @type.setter
+    def type(self, powerup_type):
+        self.kind = POWERUP_TYPES.index(powerup_type)
+    
+    @property
+    def color(self):
+        return POWERUP_COLORS[self.kind]
     
     def update(self):
         self.y += self.speed
     
-    def draw(self, screen):
-        if self.type == 'fuel':
+    @staticmethod
+    def update_columns(columns, n, frames=1):
+        columns['y'][:n] += columns['speed'][:n] * frames
+    
+    @staticmethod
+    def off_screen_columns(columns, n, bounds=(0, 0, WIDTH, HEIGHT)):
+        return columns['y'][:n] > bounds[3]
+    
+    @staticmethod
+    def render_sprite(kind):
+        """Нарисовать бонус; начало спрайта - (x - 12, y - 12)."""
+        sprite = new_sprite(25, 25)
+        color = POWERUP_COLORS[kind]
+        if POWERUP_TYPES[kind] == 'fuel':
             # Красная бочка
-            pygame.draw.rect(screen, self.color, (self.x - 10, self.y - 10, 20, 20))
-            pygame.draw.rect(screen, (150, 0, 0), (self.x - 10, self.y - 10, 20, 20), 2)
-        elif self.type == 'health':
+            pygame.draw.rect(sprite, color, (2, 2, 20, 20))
+            pygame.draw.rect(sprite, (150, 0, 0), (2, 2, 20, 20), 2)
+        elif POWERUP_TYPES[kind] == 'health':
             # Зеленая аптечка
-            pygame.draw.rect(screen, self.color, (self.x - 10, self.y - 10, 20, 20))
-            pygame.draw.rect(screen, WHITE, (self.x - 8, self.y - 2, 16, 4))
-            pygame.draw.rect(screen, WHITE, (self.x - 2, self.y - 8, 4, 16))
+            pygame.draw.rect(sprite, color, (2, 2, 20, 20))
+            pygame.draw.rect(sprite, WHITE, (4, 10, 16, 4))
+            pygame.draw.rect(sprite, WHITE, (10, 4, 4, 16))
         else:  # oxygen
             # Синий баллон
-            pygame.draw.ellipse(screen, self.color, (self.x - 8, self.y - 12, 16, 24))
-            pygame.draw.ellipse(screen, (0, 50, 200), (self.x - 8, self.y - 12, 16, 24), 2)
+            pygame.draw.ellipse(sprite, color, (4, 0, 16, 24))
+            pygame.draw.ellipse(sprite, (0, 50, 200), (4, 0, 16, 24), 2)
+        return sprite
+    
+    def draw(self, screen):
+        sprite = SPRITES.get(('powerup', self.kind), self.render_sprite, self.kind)
+        screen.blit(sprite, (int(self.x) - 12, int(self.y) - 12))
+    
+    @staticmethod
+    def blits_columns(columns, n, lag=0.0):
+        """Пары (спрайт, позиция) для Surface.blits по первым n строкам."""
+        render = Powerup.render_sprite
+        get = SPRITES.get
+        y = columns['y'][:n]
+        if lag:
+            y = y - columns['speed'][:n] * lag
+        return [
+            (get(('powerup', kind), render, kind), (x - 12, y - 12))
+            for x, y, kind in zip(
+                columns['x'][:n].astype(np.int64).tolist(),
+                y.astype(np.int64).tolist(),
+                columns['kind'][:n].tolist())
+        ]
     
     def is_off_screen(self):
         return self.y > HEIGHT
 
-class Explosion:
-    """Визуальный эффект взрыва при уничтожении метеорита."""
-    def __init__(self, x, y, size):
-        self.x = x
-        self.y = y
-        self.particles = []
-        # Создание частиц
-        for _ in range(int(size // 5)):
-            angle = random.uniform(0, 2 * 3.14159)
-            speed = random.uniform(1, 4)
-            self.particles.append({
-                'x': x,
-                'y': y,
-                'vx': speed * (random.random() - 0.5) * 2,
-                'vy': speed * (random.random() - 0.5) * 2,
-                'life': 20,
-                'size': random.randint(2, 4)
-            })
+class Game:
+    """Главный игровой класс.
+
+    В безголовом режиме (headless=True) окно и часы не создаются, а
+    симуляция продвигается методами step/simulate так быстро, как позволяет CPU.
+    Вся случайность идет из self.rng, поэтому при одинаковом seed и одинаковом
+    управлении игра повторяется кадр в кадр.
     
-    def update(self):
-        for particle in self.particles:
-            particle['x'] += particle['vx']
-            particle['y'] += particle['vy']
-            particle['life'] -= 1
-        self.particles = [p for p in self.particles if p['life'] > 0]
+    Симуляция всегда идет шагами фиксированной длины SIM_DT, а окно
+    отрисовывается так часто, как успевает: run() копит реальное время и
+    выполняет столько шагов, сколько в него поместилось.
     
-    def draw(self, screen):
-        for particle in self.particles:
-            alpha = particle['life'] / 20
-            color_value = int(255 * alpha)
-            color = (color_value, color_value // 2, 0)  # Оранжевый/желтый
-            pygame.draw.circle(screen, color, (int(particle['x']), int(particle['y'])), particle['size'])
+    frames_per_step > 1 - крупный шаг: за один вызов step игра продвигается
+    на столько кадров сразу. Столкновения при этом ищутся на всем пути
+    объектов за шаг, поэтому быстрые объекты не пролетают друг сквозь друга.
     
-    def is_finished(self):
-        return len(self.particles) == 0
-
-class Game:
-    """Главный игровой класс."""
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Spaceship Simulator")
-        self.clock = pygame.time.Clock()
+    world_size=(ширина, высота) больше экрана - мир с камерой, следящей за
+    кораблем. Отрисовываются только объекты в обзоре камеры, а метеориты
+    дальше lod_margin от обзора не проверяются на столкновения и двигаются
+    раз в LOD_INTERVAL шагов (положение при этом точное, см. Meteor.advance_rows).
+    
+    renderer - способ отрисовки звезд и частиц из RENDERERS; спрайты
+    метеоритов, бонусов и ракет в обоих случаях выводятся одним blits.
+    
+    waves - появление метеоритов и бонусов по расписанию волн (waves.py)
+    вместо случайных таймеров: 'authored' - кампания waves.CAMPAIGN,
+    'procedural' - только процедурные волны, список сегментов - свои волны.
+    """
+    def __init__(self, headless=False, input_source=None, dirty_rects=True, seed=None, balance=None,
+                 frames_per_step=1, world_size=None, renderer='sprites', waves=None):
+        if renderer not in RENDERERS:
+            raise ValueError(f"Неизвестный способ отрисовки: {renderer}")
+        if isinstance(waves, str) and waves not in WAVES:
+            raise ValueError(f"Неизвестный режим волн: {waves}")
+        self.headless = headless
+        self.renderer = renderer
+        self.waves = WAVES[waves] if isinstance(waves, str) else waves  # Сегменты волн; None - таймеры
+        self.world_width, self.world_height = world_size if world_size else (WIDTH, HEIGHT)
+        self.camera = Camera(WIDTH, HEIGHT, self.world_width, self.world_height)
+        self.world_bounds = (0, 0, self.world_width, self.world_height)
+        # Активная зона и отрисовка по обзору камеры; в мире размером с экран не нужны.
+        # False - все объекты обновляются, проверяются и рисуются каждый шаг (см. свойство lod)
+        self._lod = self.world_width > WIDTH or self.world_height > HEIGHT
+        self.frames_per_step = frames_per_step  # Кадров игрового времени за один шаг симуляции
+        self.swept = True  # Искать касания на всем пути за шаг, а не только в конечных положениях
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+        self.dirty_rects = dirty_rects  # Обновлять на экране только измененные области
+        self.previous_rects = []
+        self.render_times = deque(maxlen=FPS)  # Время отрисовки последних кадров, с
+        self.show_render_time = False
+        self.profiler = FrameProfiler(window=FPS * 5)  # Включается клавишей F4
+        self.profile_lines = []  # Строки оверлея профилировщика
+        self.profile_slots = 0   # Сколько строк оверлея сейчас на экране
+        self.telemetry = None    # telemetry.Telemetry: строка показателей на каждый шаг
+        if headless:
+            self.screen = None
+            self.clock = None
+            self.input = input_source if input_source else ScriptedInput()
+        else:
+            init_pygame()
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption("Spaceship Simulator")
+            self.clock = pygame.time.Clock()
+            self.input = input_source if input_source else KeyboardInput()
+            self.font = load_font(24)
+            self.small_font = load_font(20)
+        self.meteor_grid = SpatialHash(self.world_width, self.world_height)
+        self.meteor_index = GridIndex(self.world_width, self.world_height)  # Метеориты по ячейкам на конец шага
+        self.particles = ParticleSystem(PARTICLE_CAPACITY, rng=np.random.default_rng(self.rng.getrandbits(64)))
+        self.starfield = Starfield(WIDTH, HEIGHT, STAR_COUNT, rng=self.rng)
+        self.fire_held = False  # Пробел был нажат в прошлом кадре
+        balance = balance if balance else {}
+        unknown = set(balance) - set(BALANCE)
+        if unknown:
+            raise ValueError(f"Неизвестные параметры баланса: {', '.join(sorted(unknown))}")
+        for name, value in BALANCE.items():
+            setattr(self, name, balance.get(name, value))
+        self.alpha = 1.0  # Доля пути от прошлого шага к текущему, на которой рисуются объекты
+        self.dropped_steps = 0  # Шаги, отброшенные из-за ограничения MAX_STEPS_PER_FRAME
         self.reset_game()
     
+    @property
+    def lod(self):
+        return self._lod
+    
+    @lod.setter
+    def lod(self, enabled):
+        # Без активной зоны moved_at не ведется: при включении все метеориты уже на текущем времени
+        if enabled and not self._lod:
+            self.meteors.array('moved_at')[:] = self.scheduler.time
+            self.meteor_index.clear()
+        self._lod = enabled
+    
+    @property
+    def lod_margin(self):
+        """Запас активной зоны вокруг обзора камеры, пикселей.
+
+        Отставший метеорит вне зоны догоняет свое положение только раз в
+        LOD_INTERVAL шагов и за это время проходит до
+        LOD_INTERVAL * MAX_METEOR_SPEED * frames_per_step пикселей без проверки
+        столкновений, поэтому при крупном шаге запас растет вместе с этим путем.
+        """
+        return max(LOD_MARGIN, LOD_INTERVAL * MAX_METEOR_SPEED * self.frames_per_step)
+    
     def reset_game(self):
         """Сброс состояния игры."""
         # Создание корабля и экипажа
         self.ship = SpaceShip("Explorer-1")
-        self.ship.position = [WIDTH // 2, HEIGHT - 80]
+        self.ship.position = [self.world_width // 2, self.world_height - 80]
+        self.previous_ship_position = tuple(self.ship.position)  # Для интерполяции
+        self.camera.follow(*self.ship.position)
         
         self.crew = [
             CrewMember("Alex", Role.PILOT, skills={'piloting': 90}),
@@ -196,56 +489,171 @@ class Game:
             CrewMember("Taylor", Role.MEDIC, skills={'medicine': 80})
         ]
         
-        # Создание миссии
+        # Таймеры игры и миссии - в одной очереди, за шаг срабатывают только наступившие.
+        # Периодические срабатывают раз в interval + 1 шагов, как прежние счетчики,
+        # которые срабатывали, превысив интервал
+        self.scheduler = Scheduler()
+        
+        # Создание миссии; в ресурсах - собранные бонусы и время последнего столкновения
         self.mission = Mission(
             "Глубокий космос",
-            ["Выжить 5 минут", "Собрать ресурсы", "Избежать астероидов"]
+            [OBJECTIVE_SURVIVE, OBJECTIVE_COLLECT, OBJECTIVE_AVOID],
+            resources={'collected': 0, 'hit_at': 0},
+            rng=self.rng,
+            event_chance=self.event_chance,
+            scheduler=self.scheduler,
+            event_interval=EVENT_INTERVAL + 1
         )
+        if self.waves is None:
+            self.wave_engine = None
+            self.scheduler.schedule(spawn_delay(self.rng, self.meteor_spawn_interval), self._on_meteor_timer)
+            self.scheduler.schedule(spawn_delay(self.rng, self.powerup_spawn_interval), self._on_powerup_timer)
+        else:
+            self.wave_engine = WaveEngine(self.rng, self.world_width, self.waves, self.powerup_spawn_interval,
+                                          len(POWERUP_TYPES))
+        self.scheduler.schedule(self.fuel_interval + 1, self._on_fuel_timer)
+        self.scheduler.schedule(self.oxygen_interval + 1, self._on_oxygen_timer)
         
         # Игровые объекты
-        self.stars = [Star() for _ in range(100)]
-        self.meteors = []
-        self.rockets = []
-        self.powerups = []
-        self.explosions = []
+        self.meteors = EntityStore(Meteor)
+        self.rockets = EntityStore(Rocket)
+        self.powerups = EntityStore(Powerup)
+        self.meteor_index.clear()
+        self.particles.clear()
         
         # Состояние игры
-        self.meteor_spawn_timer = 0
-        self.powerup_spawn_timer = 0
         self.rocket_launcher_index = 0  # Чередование пусковых установок
-        self.current_event = None
-        self.event_timer = 0
-        self.fuel_consumption_timer = 0
-        self.oxygen_consumption_timer = 0
         self.score = 0
         self.game_over_reason = ""  # Причина окончания игры
+        self.game_active = True
         
-        # Шрифты
-        self.font = pygame.font.Font(None, 24)
-        self.small_font = pygame.font.Font(None, 20)
+        if not self.headless:
+            self.hud = Hud(self.small_font)
+        self.full_redraw = True  # Следующий кадр выводится на экран целиком
+    
+    def handle_input(self, controls):
+        """Обработка ввода игрока по маске управления."""
+        # Движение на 5 пикселей за кадр, не дальше края поля
+        position = self.ship.position
+        distance = 5 * self.frames_per_step
+        if controls & LEFT and position[0] > 30:
+            position[0] = max(30, position[0] - distance)
+        if controls & RIGHT and position[0] < self.world_width - 30:
+            position[0] = min(self.world_width - 30, position[0] + distance)
+        if controls & UP and position[1] > 30:
+            position[1] = max(30, position[1] - distance)
+        if controls & DOWN and position[1] < self.world_height - 30:
+            position[1] = min(self.world_height - 30, position[1] + distance)
     
-    def handle_input(self):
-        """Обработка ввода игрока."""
-        keys = pygame.key.get_pressed()
+    def step(self, controls):
+        """Продвинуть игру на один кадр и вернуть, активна ли она."""
+        telemetry = self.telemetry
+        if telemetry is not None:
+            start = time.perf_counter()
         
-        # Движение
-        if keys[pygame.K_LEFT] and self.ship.position[0] > 30:
-            self.ship.position[0] -= 5
-        if keys[pygame.K_RIGHT] and self.ship.position[0] < WIDTH - 30:
-            self.ship.position[0] += 5
-        if keys[pygame.K_UP] and self.ship.position[1] > 30:
-            self.ship.position[1] -= 5
-        if keys[pygame.K_DOWN] and self.ship.position[1] < HEIGHT - 30:
-            self.ship.position[1] += 5
+        # Выстрел только в момент нажатия, удержание не стреляет очередью
+        fire = controls & FIRE and not self.fire_held
+        self.fire_held = bool(controls & FIRE)
+        
+        if not self.game_active:
+            if not controls & RESTART:
+                return False
+            self.reset_game()
+        
+        if fire:
+            self.shoot_rocket()
+        self.previous_ship_position = tuple(self.ship.position)
+        self.handle_input(controls)
+        self.game_active = self.update()
+        if telemetry is not None:
+            telemetry.record(self, time.perf_counter() - start)
+        
+        profiler = self.profiler
+        if profiler.enabled:
+            profiler.count('meteors', len(self.meteors))
+            profiler.count('rockets', len(self.rockets))
+            profiler.count('powerups', len(self.powerups))
+            profiler.count('particles', self.particles.count)
+            profiler.count('allocated', self.meteors.allocated + self.rockets.allocated + self.powerups.allocated)
+        return self.game_active
+    
+    def simulate(self, frames):
+        """Безголовая симуляция до frames кадров или до конца игры.
+
+        Возвращает число фактически просчитанных кадров.
+        """
+        profiler = self.profiler
+        for frame in range(frames):
+            active = self.step(self.input.poll())
+            profiler.end_frame()
+            if not active:
+                return frame + 1
+        return frames
+    
+    def state_digest(self):
+        """Контрольная сумма состояния симуляции для проверки точного повтора."""
+        ship = self.ship
+        scalars = (
+            self.score, self.game_active, self.game_over_reason,
+            ship.hull_integrity, ship.fuel, ship.oxygen, tuple(ship.position),
+            self.mission.mission_time, tuple(event.name for event in self.mission.active_events),
+            self.scheduler.time, self.rocket_launcher_index,
+            tuple((due, timer, handler.__name__, argument) for due, timer, handler, argument in self.scheduler.pending()),
+        )
+        engine = self.wave_engine
+        if engine is not None:
+            scalars += (engine.segment, engine.cursor, engine.time)
+        digest = zlib.crc32(repr(scalars).encode())
+        for store in (self.meteors, self.rockets, self.powerups):
+            for name in store.columns:
+                digest = zlib.crc32(store.array(name).tobytes(), digest)
+        return digest
     
     def spawn_meteor(self):
         """Создать новый метеорит."""
-        self.meteors.append(Meteor())
+        self.meteors.new(self.rng, self.world_width, self.scheduler.time)
     
     def spawn_powerup(self):
         """Создать случайный бонус."""
-        powerup_type = random.choice(['fuel', 'health', 'oxygen'])
-        self.powerups.append(Powerup(powerup_type))
+        powerup_type = self.rng.choice(POWERUP_TYPES)
+        self.powerups.new(powerup_type, self.rng, self.world_width)
+    
+    def spawn_wave_entries(self):
+        """Создать метеориты и бонусы из наступивших записей расписания волн."""
+        entries = self.wave_engine.take(self.scheduler.time, self.mission)
+        if entries is None:
+            return
+        times, kinds, xs, sizes, speeds = entries
+        meteors = kinds == METEOR
+        if meteors.any():
+            health = np.maximum(1, sizes[meteors] // 20)
+            self.meteors.extend({'x': xs[meteors], 'y': -sizes[meteors], 'speed': speeds[meteors],
+                                 'size': sizes[meteors], 'max_health': health, 'health': health,
+                                 'moved_at': times[meteors]})
+        powerups = ~meteors
+        if powerups.any():
+            self.powerups.extend({'x': xs[powerups], 'y': np.full(np.count_nonzero(powerups), -20),
+                                  'speed': speeds[powerups], 'size': sizes[powerups], 'kind': kinds[powerups] - 1})
+    
+    def _on_meteor_timer(self, _):
+        self.spawn_meteor()
+        delay = spawn_delay(self.rng, self.meteor_spawn_interval) * self.mission.modifier('meteor_spawn')
+        self.scheduler.schedule(round(delay), self._on_meteor_timer)
+    
+    def _on_powerup_timer(self, _):
+        self.spawn_powerup()
+        delay = spawn_delay(self.rng, self.powerup_spawn_interval) * self.mission.modifier('powerup_spawn')
+        self.scheduler.schedule(round(delay), self._on_powerup_timer)
+    
+    def _on_fuel_timer(self, _):
+        # Не больше остатка: иначе при дробном множителе события топливо не дойдет до нуля
+        rate = self.fuel_rate * self.mission.modifier('fuel_rate')
+        self.ship.consume_fuel(min(rate, self.ship.fuel))
+        self.scheduler.schedule(self.fuel_interval + 1, self._on_fuel_timer)
+    
+    def _on_oxygen_timer(self, _):
+        self.ship.consume_oxygen(self.oxygen_rate * self.mission.modifier('oxygen_rate'))
+        self.scheduler.schedule(self.oxygen_interval + 1, self._on_oxygen_timer)
     
     def shoot_rocket(self):
         """Выстрелить ракетой из чередующихся установок."""
@@ -254,121 +662,220 @@ class Game:
         offset = offsets[self.rocket_launcher_index]
         self.rocket_launcher_index = (self.rocket_launcher_index + 1) % 2
         
-        rocket = Rocket(self.ship.position[0], self.ship.position[1] - 20, offset)
-        self.rockets.append(rocket)
+        self.rockets.new(self.ship.position[0], self.ship.position[1] - 20, offset)
     
-    def check_collisions(self):
-        """Проверка столкновений между объектами."""
-        ship_rect = pygame.Rect(self.ship.position[0] - 25, self.ship.position[1] - 15, 50, 30)
+    def check_collisions(self, rows=None):
+        """Проверка столкновений между объектами за прошедший шаг.
+
+        rows - номера строк метеоритов, которые могут с чем-то столкнуться
+        (активная зона); по умолчанию проверяются все. При self.swept объекты сравниваются не только в конечных положениях:
+        каждая пара проверяется на касание на всем пути за шаг (swept_overlap),
+        поэтому быстрые ракеты и метеориты не проскакивают друг сквозь друга
+        и при крупном шаге frames_per_step. Без swept путь за шаг не
+        учитывается, как в прежней дискретной проверке.
+        """
+        frames = self.frames_per_step if self.swept else 0
+        ship_x = self.ship.position[0] - 25
+        ship_y = self.ship.position[1] - 15
+        if frames:
+            ship_x0 = self.previous_ship_position[0] - 25
+            ship_y0 = self.previous_ship_position[1] - 15
+        else:
+            ship_x0, ship_y0 = ship_x, ship_y
+        ship_dx = ship_x - ship_x0
+        ship_dy = ship_y - ship_y0
+        # Область, которую корабль заметает за шаг
+        ship_left = min(ship_x, ship_x0)
+        ship_top = min(ship_y, ship_y0)
+        ship_w = 50 + abs(ship_dx)
+        ship_h = 30 + abs(ship_dy)
+        
+        # Широкая фаза: раскладываем метеориты по ячейкам сетки вместе с путем за шаг
+        meteors = self.meteors
+        xs, ys, sizes, speeds = (meteors.array(name) for name in ('x', 'y', 'size', 'speed'))
+        meteor_rows = None
+        if rows is not None:
+            xs, ys, sizes, speeds = xs[rows], ys[rows], sizes[rows], speeds[rows]
+            meteor_rows = rows.tolist()  # Номер в списках ниже -> строка хранилища
+        meteor_x = xs.tolist()
+        meteor_size = sizes.tolist()
+        meteor_path = speeds * frames
+        meteor_speed = meteor_path.tolist()
+        meteor_y = (ys - meteor_path).tolist()  # Положение в начале шага
+        grid = self.meteor_grid
+        grid.build(meteor_x, meteor_y, meteor_size, (sizes + meteor_path).tolist())
+        
+        meteor_health = meteors.array('health')
+        meteor_flash = meteors.array('hit_flash')
+        removed_meteors = set()
+        spent_rockets = set()
         
         # Столкновения ракет с метеоритами
-        for rocket in self.rockets[:]:
-            rocket_rect = pygame.Rect(rocket.x, rocket.y, rocket.width, rocket.height)
-            for meteor in self.meteors[:]:
-                meteor_rect = pygame.Rect(meteor.x, meteor.y, meteor.size, meteor.size)
-                if rocket_rect.colliderect(meteor_rect):
-                    # Удалить ракету
-                    if rocket in self.rockets:
-                        self.rockets.remove(rocket)
-                    
-                    # Нанести урон метеориту
-                    if meteor.take_damage(1):
-                        # Метеорит уничтожен
-                        if meteor in self.meteors:
-                            # Создать взрыв
-                            self.explosions.append(Explosion(
-                                meteor.x + meteor.size // 2,
-                                meteor.y + meteor.size // 2,
-                                meteor.size
-                            ))
-                            self.meteors.remove(meteor)
-                            self.score += meteor.size  # Очки в зависимости от размера метеорита
-                    break
+        rockets = self.rockets
+        rocket_x = rockets.array('x').tolist()
+        rocket_y = rockets.array('y').tolist()
+        rocket_w = rockets.array('width').tolist()
+        rocket_h = rockets.array('height').tolist()
+        rocket_speed = (rockets.array('speed') * frames).tolist()
+        for j in range(len(rocket_x)):
+            rx, ry, rw, rh, rs = rocket_x[j], rocket_y[j], rocket_w[j], rocket_h[j], rocket_speed[j]
+            # Ракета первой задевает метеорит, которого касается раньше других
+            hit = None
+            first = 1.0
+            for i in grid.query(rx, ry, rw, rh + rs):
+                if i in removed_meteors:
+                    continue
+                size = meteor_size[i]
+                mx = meteor_x[i]
+                # Ракета и метеорит движутся только по вертикали: без перекрытия по x касания нет
+                if not (rx < mx + size and mx < rx + rw):
+                    continue
+                t = swept_overlap(rx, ry + rs, rw, rh, 0, -rs - meteor_speed[i],
+                                  mx, meteor_y[i], size, size)
+                if t is not None and (hit is None or t < first):
+                    hit = i
+                    first = t
+                    if t == 0.0:
+                        break
+            if hit is not None:
+                i = hit
+                size = meteor_size[i]
+                # Удалить ракету
+                spent_rockets.add(j)
+                
+                # Нанести урон метеориту прямо в столбцах, как Meteor.take_damage
+                row = i if meteor_rows is None else meteor_rows[i]
+                meteor_health[row] -= 1
+                meteor_flash[row] = 5
+                if meteor_health[row] <= 0:
+                    # Метеорит уничтожен - создать взрыв
+                    self.particles.explode(
+                        meteor_x[i] + size // 2,
+                        meteor_y[i] + meteor_speed[i] + size // 2,
+                        size
+                    )
+                    removed_meteors.add(i)
+                    self.score += size  # Очки в зависимости от размера метеорита
         
         # Столкновения корабля с метеоритами
-        for meteor in self.meteors[:]:
-            meteor_rect = pygame.Rect(meteor.x, meteor.y, meteor.size, meteor.size)
-            if ship_rect.colliderect(meteor_rect):
-                damage = meteor.size // 5
+        for i in grid.query(ship_left, ship_top, ship_w, ship_h):
+            if i in removed_meteors:
+                continue
+            size = meteor_size[i]
+            if swept_overlap(ship_x0, ship_y0, 50, 30, ship_dx, ship_dy - meteor_speed[i],
+                             meteor_x[i], meteor_y[i], size, size) is not None:
+                damage = size // 5
                 self.ship.take_damage(damage)
-                if meteor in self.meteors:
-                    self.meteors.remove(meteor)
-        
-        # Столкновения корабля с бонусами
-        for powerup in self.powerups[:]:
-            powerup_rect = pygame.Rect(powerup.x - 10, powerup.y - 10, 20, 20)
-            if ship_rect.colliderect(powerup_rect):
-                if powerup.type == 'fuel':
-                    self.ship.refuel(30)
-                elif powerup.type == 'health':
-                    self.ship.repair(25)
+                self.mission.resources['hit_at'] = self.scheduler.time
+                removed_meteors.add(i)
+        
+        # Удаление одним проходом вместо list.remove внутри цикла
+        rockets.remove_rows(spent_rockets)
+        meteors.remove_rows(removed_meteors if meteor_rows is None else [meteor_rows[i] for i in removed_meteors])
+        
+        # Столкновения корабля с бонусами; точная проверка - только для бонусов,
+        # чей путь за шаг пересекает область, заметенную кораблем
+        ship_right = ship_left + ship_w
+        ship_bottom = ship_top + ship_h
+        powerups = self.powerups
+        collected = []
+        for i, (x, y, speed, kind) in enumerate(zip(powerups.array('x').tolist(),
+                                                    powerups.array('y').tolist(),
+                                                    (powerups.array('speed') * frames).tolist(),
+                                                    powerups.array('kind').tolist())):
+            if (x - 10 < ship_right and ship_left < x + 10 and y - speed - 10 < ship_bottom
+                    and ship_top < y + 10 and swept_overlap(ship_x0, ship_y0, 50, 30, ship_dx, ship_dy - speed,
+                                                            x - 10, y - speed - 10, 20, 20) is not None):
+                powerup_type = POWERUP_TYPES[kind]
+                if powerup_type == 'fuel':
+                    self.ship.refuel(self.fuel_powerup)
+                elif powerup_type == 'health':
+                    self.ship.repair(self.health_powerup)
                 else:  # oxygen
-                    self.ship.refill_oxygen(30)
-                self.powerups.remove(powerup)
+                    self.ship.refill_oxygen(self.oxygen_powerup)
+                collected.append(i)
+        powerups.remove_rows(collected)
+        self.mission.resources['collected'] += len(collected)
+    
+    def move_meteors(self, frames):
+        """Сдвинуть метеориты на шаг в frames кадров при self.lod.
+
+        Строки активной зоны (обзор камеры плюс lod_margin) находятся по
+        meteor_index с прошлого шага и двигаются каждый шаг, остальные - раз
+        в LOD_INTERVAL шагов, сразу на все пропущенное время.
+        Возвращает номера строк активной зоны или None, если активны все.
+        """
+        meteors = self.meteors
+        n = meteors.count
+        if n == 0:
+            return None
+        time = self.scheduler.time + frames
+        rows = None
+        index = self.meteor_index
+        if index.count == n:
+            left, top, width, height = self.camera.rect(self.lod_margin)
+            rows = index.query(left - MAX_METEOR_SIZE, top - MAX_METEOR_SIZE,
+                               width + MAX_METEOR_SIZE, height + MAX_METEOR_SIZE)
+            if rows is not None and len(rows) == n:
+                rows = None
+        if rows is None or time // frames % LOD_INTERVAL == 0:
+            Meteor.advance_rows(meteors.columns, slice(0, n), time)
+        else:
+            Meteor.advance_rows(meteors.columns, rows, time)
+        return rows
     
     def update(self):
         """Обновление состояния игры."""
-        # Обновление звезд
-        for star in self.stars:
-            star.update()
-        
-        # Обновление метеоритов
-        for meteor in self.meteors[:]:
-            meteor.update()
-            if meteor.is_off_screen():
-                self.meteors.remove(meteor)
-        
-        # Обновление ракет
-        for rocket in self.rockets[:]:
-            rocket.update()
-            if rocket.is_off_screen():
-                self.rockets.remove(rocket)
-        
-        # Обновление бонусов
-        for powerup in self.powerups[:]:
-            powerup.update()
-            if powerup.is_off_screen():
-                self.powerups.remove(powerup)
+        profiler = self.profiler
+        profiler.mark()
+        
+        frames = self.frames_per_step
+        lod = self._lod
+        world = self.world_bounds
+        
+        # Прокрутка звездного фона
+        self.starfield.update(frames)
+        
+        # Движение метеоритов (при lod вне активной зоны - реже), ракет и бонусов - над столбцами целиком
+        if lod:
+            self.camera.follow(*self.ship.position)
+            active = self.move_meteors(frames)
+            spawned = len(self.meteors)
+        else:
+            self.meteors.move(frames)
+        self.rockets.move(frames)
+        self.powerups.move(frames)
         
         # Обновление взрывов
-        for explosion in self.explosions[:]:
-            explosion.update()
-            if explosion.is_finished():
-                self.explosions.remove(explosion)
-        
-        # Появление метеоритов
-        self.meteor_spawn_timer += 1
-        if self.meteor_spawn_timer > random.randint(30, 60):
-            self.spawn_meteor()
-            self.meteor_spawn_timer = 0
-        
-        # Появление бонусов
-        self.powerup_spawn_timer += 1
-        if self.powerup_spawn_timer > random.randint(180, 300):
-            self.spawn_powerup()
-            self.powerup_spawn_timer = 0
-        
-        # Расход ресурсов
-        self.fuel_consumption_timer += 1
-        if self.fuel_consumption_timer > 60:
-            self.ship.consume_fuel(0.5)
-            self.fuel_consumption_timer = 0
-        
-        self.oxygen_consumption_timer += 1
-        if self.oxygen_consumption_timer > 90:
-            self.ship.consume_oxygen(1)
-            self.oxygen_consumption_timer = 0
-        
-        # Обновление миссии и событий
-        self.event_timer += 1
-        if self.event_timer > 300:
-            event = self.mission.update()
-            if event:
-                self.current_event = event
-            self.event_timer = 0
-        
-        # Проверка столкновений
-        self.check_collisions()
+        self.particles.update(frames)
+        
+        # Появление объектов, расход ресурсов и события миссии - по таймерам,
+        # а в режиме волн появление - по расписанию, уже с учетом новых событий
+        self.scheduler.advance(frames)
+        if self.wave_engine is not None:
+            self.spawn_wave_entries()
+        
+        # Проверка столкновений; ушедшие за мир отсекаются после нее,
+        # чтобы не потерять касания на последнем отрезке пути
+        profiler.lap('update')
+        if lod:
+            if len(self.meteors) > spawned:
+                # Новые метеориты стоят в точке появления на конец шага, как и без lod
+                self.meteors.array('moved_at')[spawned:] = self.scheduler.time
+                if active is not None:
+                    active = np.concatenate((active, np.arange(spawned, len(self.meteors))))
+            self.check_collisions(active)
+            self.meteors.cull(world)
+            # Ракета выше активной зоны уже ни во что не попадет
+            self.rockets.cull((0, max(0, self.camera.y - self.lod_margin), self.world_width, self.world_height))
+            self.powerups.cull(world)
+            self.meteor_index.build(self.meteors.array('x'), self.meteors.array('y'))
+        else:
+            self.check_collisions()
+            self.meteors.cull(world)
+            self.rockets.cull(world)
+            self.powerups.cull(world)
+        profiler.lap('collisions')
         
         # Проверка окончания игры
         if self.ship.hull_integrity <= 0:
@@ -383,63 +890,110 @@ class Game:
             self.game_over_reason = "Кислород закончился!"
             return False
         
+        self.update_objectives()
         return True
     
-    def draw_ship(self):
-        """Отрисовка космического корабля."""
-        x, y = self.ship.position
+    def update_objectives(self):
+        """Отметить цели миссии, выполненные к текущему шагу."""
+        mission = self.mission
+        time = self.scheduler.time
+        resources = mission.resources
+        if time >= SURVIVE_STEPS:
+            mission.complete_objective(OBJECTIVE_SURVIVE)
+        if resources['collected'] >= COLLECT_GOAL:
+            mission.complete_objective(OBJECTIVE_COLLECT)
+        if time - resources['hit_at'] >= AVOID_STEPS:
+            mission.complete_objective(OBJECTIVE_AVOID)
+    
+    @staticmethod
+    def render_ship():
+        """Нарисовать корабль; начало спрайта - (x - 40, y - 20)."""
+        sprite = new_sprite(81, 44)
+        x, y = 40, 20
         
         # Корпус корабля
-        pygame.draw.polygon(self.screen, BLUE, 
+        pygame.draw.polygon(sprite, BLUE, 
                           [(x, y - 20), (x - 25, y + 10), (x + 25, y + 10)])
         
         # Кабина
-        pygame.draw.circle(self.screen, (100, 200, 255), (x, y - 5), 8)
+        pygame.draw.circle(sprite, (100, 200, 255), (x, y - 5), 8)
         
         # Крылья
-        pygame.draw.polygon(self.screen, (0, 80, 200), 
+        pygame.draw.polygon(sprite, (0, 80, 200), 
                           [(x - 25, y + 10), (x - 40, y + 20), (x - 25, y + 15)])
-        pygame.draw.polygon(self.screen, (0, 80, 200), 
+        pygame.draw.polygon(sprite, (0, 80, 200), 
                           [(x + 25, y + 10), (x + 40, y + 20), (x + 25, y + 15)])
         
         # Двигатели
-        pygame.draw.rect(self.screen, RED, (x - 15, y + 10, 8, 8))
-        pygame.draw.rect(self.screen, RED, (x + 7, y + 10, 8, 8))
-        pygame.draw.rect(self.screen, ORANGE, (x - 15, y + 18, 8, 5))
-        pygame.draw.rect(self.screen, ORANGE, (x + 7, y + 18, 8, 5))
+        pygame.draw.rect(sprite, RED, (x - 15, y + 10, 8, 8))
+        pygame.draw.rect(sprite, RED, (x + 7, y + 10, 8, 8))
+        pygame.draw.rect(sprite, ORANGE, (x - 15, y + 18, 8, 5))
+        pygame.draw.rect(sprite, ORANGE, (x + 7, y + 18, 8, 5))
+        return sprite
+    
+    def ship_draw_position(self):
+        """Положение корабля для отрисовки - между прошлым и текущим по self.alpha."""
+        x, y = self.ship.position
+        if self.alpha < 1.0:
+            previous_x, previous_y = self.previous_ship_position
+            x = int(previous_x + (x - previous_x) * self.alpha)
+            y = int(previous_y + (y - previous_y) * self.alpha)
+        return x, y
+    
+    def draw_ship(self, offset=(0, 0)):
+        """Отрисовка космического корабля; offset - положение камеры."""
+        x, y = self.ship_draw_position()
+        return self.screen.blit(SPRITES.get(('ship',), self.render_ship), (x - 40 - offset[0], y - 20 - offset[1]))
     
     def draw_hud(self):
-        """Отрисовка элементов HUD."""
+        """Отрисовка элементов HUD. Текст перерисовывается только при изменении."""
+        hud = self.hud
+        screen = self.screen
+        
         # Полоса здоровья
-        health_text = self.small_font.render(f"Корпус: {int(self.ship.hull_integrity)}%", True, WHITE)
-        self.screen.blit(health_text, (10, 10))
-        pygame.draw.rect(self.screen, RED, (10, 30, 200, 20), 2)
-        pygame.draw.rect(self.screen, GREEN, (10, 30, int(200 * self.ship.hull_integrity / 100), 20))
+        hud.text(screen, 'hull', f"Корпус: {int(self.ship.hull_integrity)}%", WHITE, (10, 10))
+        hud.bar(screen, 'hull_bar', (10, 30, 200, 20), GREEN, self.ship.hull_integrity)
         
         # Полоса топлива
-        fuel_text = self.small_font.render(f"Топливо: {int(self.ship.fuel)}%", True, WHITE)
-        self.screen.blit(fuel_text, (10, 55))
-        pygame.draw.rect(self.screen, RED, (10, 75, 200, 20), 2)
-        pygame.draw.rect(self.screen, YELLOW, (10, 75, int(200 * self.ship.fuel / 100), 20))
+        hud.text(screen, 'fuel', f"Топливо: {int(self.ship.fuel)}%", WHITE, (10, 55))
+        hud.bar(screen, 'fuel_bar', (10, 75, 200, 20), YELLOW, self.ship.fuel)
         
         # Полоса кислорода
-        oxygen_text = self.small_font.render(f"Кислород: {int(self.ship.oxygen)}%", True, WHITE)
-        self.screen.blit(oxygen_text, (10, 100))
-        pygame.draw.rect(self.screen, RED, (10, 120, 200, 20), 2)
-        pygame.draw.rect(self.screen, BLUE, (10, 120, int(200 * self.ship.oxygen / 100), 20))
+        hud.text(screen, 'oxygen', f"Кислород: {int(self.ship.oxygen)}%", WHITE, (10, 100))
+        hud.bar(screen, 'oxygen_bar', (10, 120, 200, 20), BLUE, self.ship.oxygen)
         
         # Счет
-        score_text = self.small_font.render(f"Счет: {self.score}", True, YELLOW)
-        self.screen.blit(score_text, (10, 145))
+        hud.text(screen, 'score', f"Счет: {self.score}", YELLOW, (10, 145))
         
         # Текущее событие
+        event_text = None
         if self.mission.active_events:
-            event_text = self.small_font.render(f"Событие: {self.mission.active_events[-1].value}", True, RED)
-            self.screen.blit(event_text, (WIDTH - 250, 10))
+            event_text = f"Событие: {self.mission.active_events[-1].value}"
+        hud.text(screen, 'event', event_text, RED, (WIDTH - 250, 10))
         
         # Название миссии
-        mission_text = self.small_font.render(f"Миссия: {self.mission.name}", True, WHITE)
-        self.screen.blit(mission_text, (WIDTH - 300, HEIGHT - 30))
+        hud.text(screen, 'mission', f"Миссия: {self.mission.name}", WHITE, (WIDTH - 300, HEIGHT - 30))
+        
+        # Время отрисовки (переключается клавишей F3)
+        render_text = None
+        if self.show_render_time and self.render_times:
+            render_ms = 1000 * sum(self.render_times) / len(self.render_times)
+            render_text = f"Рендер: {render_ms:.1f} мс"
+        hud.text(screen, 'render_time', render_text, GRAY, (WIDTH - 150, HEIGHT - 55))
+        
+        # Оверлей профилировщика (F4); строки обновляются 4 раза в секунду
+        profiler = self.profiler
+        if profiler.enabled and profiler.frames % (FPS // 4) == 0:
+            self.profile_lines = profiler.report()
+        elif not profiler.enabled:
+            self.profile_lines = []
+        lines = self.profile_lines
+        for index in range(max(len(lines), self.profile_slots)):
+            line = lines[index] if index < len(lines) else None
+            hud.text(screen, ('profile', index), line, GRAY, (WIDTH - 420, 40 + index * 18))
+        self.profile_slots = len(lines)
+        
+        return hud.take_dirty()
     
     def draw_game_over(self):
         """Отрисовка экрана окончания игры."""
@@ -463,73 +1017,239 @@ class Game:
         self.screen.blit(score_text, score_rect)
         self.screen.blit(restart_text, restart_rect)
     
-    def run(self):
-        """Главный игровой цикл."""
+    def render(self):
+        """Отрисовать кадр и вывести его на экран.
+
+        В режиме dirty_rects на экран отправляются только области, где
+        объекты были в прошлом или текущем кадре, и изменившиеся элементы HUD.
+        Все движущиеся объекты выводятся между прошлым и текущим шагом по
+        self.alpha: корабль - по сохраненному прошлому положению, остальные -
+        по скорости, отступив на lag кадров назад.
+        """
+        screen = self.screen
+        collect = self.dirty_rects
+        # Скорости объектов заданы за кадр, а шаг длится frames_per_step кадров
+        lag = (1.0 - self.alpha) * self.frames_per_step if self.game_active else 0.0
+        profiler = self.profiler
+        profiler.mark()
+        
+        # Звездный фон закрашивает весь экран, отдельная заливка не нужна.
+        # В режиме pixels экран заблокирован, пока жив массив pixels
+        pixels = pygame.surfarray.pixels2d(screen) if self.renderer == 'pixels' else None
+        if pixels is None:
+            drawn = self.starfield.draw(screen, collect, lag)
+        else:
+            drawn = self.starfield.draw_pixels(pixels, screen, collect, lag)
+        profiler.lap('starfield')
+        
+        # В большом мире камера идет за кораблем, а выводятся только объекты в ее обзоре
+        offset = None
+        if self.lod:
+            camera = self.camera
+            camera.follow(*self.ship_draw_position())
+            offset = (camera.x, camera.y)
+            left, top, width, height = camera.rect()
+        
+        # Отрисовка взрывов (позади метеоритов)
+        if pixels is None:
+            rects = self.particles.draw(screen, collect, lag, offset)
+        else:
+            rects = self.particles.draw_pixels(pixels, screen, collect, lag, offset)
+            del pixels  # Снять блокировку экрана до blits
+        if collect and rects:
+            drawn.extend(rects)
+        profiler.lap('particles')
+        
+        # Метеориты, бонусы и ракеты - одним пакетом готовых спрайтов
+        if offset is None:
+            sprites = self.meteors.blits(lag) + self.powerups.blits(lag) + self.rockets.blits(lag)
+        else:
+            # Сетка метеоритов ищет по левому верхнему углу, а за lag они сдвигаются вверх
+            margin = MAX_METEOR_SIZE + MAX_METEOR_SPEED * self.frames_per_step
+            meteor_rows = self.meteor_index.query(left - margin, top - margin, width + margin, height + margin)
+            if self.meteor_index.count != len(self.meteors):
+                meteor_rows = None  # Сетка устарела (например, после загрузки) - выводим все
+            sprites = (self.meteors.blits(lag, meteor_rows, offset)
+                       + self.powerups.blits(lag, self.powerups.rows_in(left, top, width, height, 30), offset)
+                       + self.rockets.blits(lag, self.rockets.rows_in(left, top, width, height, 30), offset))
+        rects = screen.blits(sprites, collect)
+        if collect:
+            drawn.extend(rects)
+        profiler.lap('entities')
+        
+        # Отрисовка корабля
+        drawn.append(self.draw_ship(offset or (0, 0)))
+        profiler.lap('ship')
+        
+        # Отрисовка HUD
+        hud_rects = self.draw_hud()
+        
+        if not self.game_active:
+            self.draw_game_over()
+            self.full_redraw = True
+        profiler.lap('hud')
+        
+        if collect and not self.full_redraw:
+            pygame.display.update(self.previous_rects + drawn + hud_rects)
+        else:
+            pygame.display.flip()
+            self.full_redraw = not self.game_active
+        self.previous_rects = drawn
+        profiler.lap('present')
+    
+    def run(self, max_fps=MAX_RENDER_FPS, interpolate=True):
+        """Главный игровой цикл с фиксированным шагом симуляции.
+
+        Прошедшее реальное время копится в аккумуляторе и расходуется
+        шагами по SIM_DT * frames_per_step, не более MAX_STEPS_PER_FRAME
+        за кадр: после долгой задержки игра догоняет до этого предела,
+        а остаток отбрасывается. Кадр рисуется раз за проход цикла, с частотой до
+        max_fps; при interpolate=True объекты рисуются между прошлым и
+        текущим шагом по уже накопленной доле следующего шага, чтобы движение
+        было плавным на любой частоте (ценой отставания картинки меньше чем на шаг).
+        """
         running = True
-        game_active = True
-        space_pressed = False
+        accumulator = 0.0
+        step_dt = SIM_DT * self.frames_per_step  # Реальное время одного шага
+        pending_events = []  # События, еще не переданные ни одному шагу
+        previous = time.perf_counter()
         
         while running:
-            for event in pygame.event.get():
+            events = pygame.event.get()
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
-                
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE and game_active:
-                        if not space_pressed:
-                            self.shoot_rocket()
-                            space_pressed = True
-                    
-                    if event.key == pygame.K_r and not game_active:
-                        self.reset_game()
-                        game_active = True
-                
-                if event.type == pygame.KEYUP:
-                    if event.key == pygame.K_SPACE:
-                        space_pressed = False
-            
-            if game_active:
-                self.handle_input()
-                game_active = self.update()
-            
-            # Отрисовка всего
-            self.screen.fill(BLACK)
-            
-            # Отрисовка звезд
-            for star in self.stars:
-                star.draw(self.screen)
-            
-            # Отрисовка взрывов (позади метеоритов)
-            for explosion in self.explosions:
-                explosion.draw(self.screen)
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.show_render_time = not self.show_render_time
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    self.profiler.toggle()
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                    savestate.save(self, QUICKSAVE_PATH)
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                    try:
+                        savestate.load(self, QUICKSAVE_PATH)
+                    except (OSError, ValueError):
+                        pass  # Нет быстрого сохранения или оно повреждено - продолжаем игру
+            pending_events.extend(events)
             
-            # Отрисовка метеоритов
-            for meteor in self.meteors:
-                meteor.draw(self.screen)
+            now = time.perf_counter()
+            accumulator += now - previous
+            previous = now
             
-            # Отрисовка бонусов
-            for powerup in self.powerups:
-                powerup.draw(self.screen)
+            steps = 0
+            while accumulator >= step_dt and steps < MAX_STEPS_PER_FRAME:
+                # Нажатия между шагами достаются первому шагу, чтобы не потеряться
+                self.step(self.input.poll(pending_events))
+                pending_events = []
+                accumulator -= step_dt
+                steps += 1
+            if accumulator >= step_dt:
+                dropped = int(accumulator / step_dt)
+                self.dropped_steps += dropped
+                accumulator -= dropped * step_dt
+            self.alpha = accumulator / step_dt if interpolate else 1.0
             
-            # Отрисовка ракет
-            for rocket in self.rockets:
-                rocket.draw(self.screen)
+            start = time.perf_counter()
+            self.render()
+            self.render_times.append(time.perf_counter() - start)
             
-            # Отрисовка корабля
-            self.draw_ship()
-            
-            # Отрисовка HUD
-            self.draw_hud()
-            
-            if not game_active:
-                self.draw_game_over()
-            
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            profiler = self.profiler
+            profiler.count('steps', steps)
+            profiler.mark()
+            self.clock.tick(max_fps)
+            profiler.lap('idle')
+            profiler.end_frame()
         
+        FONTS.clear()  # Шрифты недействительны после pygame.quit()
         pygame.quit()
-        sys.exit()
 
-if __name__ == "__main__":
-    game = Game()
+def run_headless(frames, seed=None, profile=False, frames_per_step=1, telemetry=None, waves=None):
+    """Безголовый прогон с простым сценарием: стрельба каждые 10 кадров.
+
+    При frames_per_step > 1 кадры считаются крупными шагами, а сценарий
+    по-прежнему задан по кадрам игрового времени.
+    """
+    script = ScriptedInput(lambda step: FIRE if step * frames_per_step % 10 < 5 else 0)
+    game = Game(headless=True, seed=seed, input_source=script, frames_per_step=frames_per_step, waves=waves)
+    game.profiler.enabled = profile
+    game.profiler.tracing = profile
+    game.telemetry = telemetry
+    start = time.perf_counter()
+    simulated = game.simulate(-(-frames // frames_per_step)) * frames_per_step
+    elapsed = time.perf_counter() - start
+    print(f"Кадров: {simulated}, время: {elapsed:.2f} с, {simulated / elapsed:.0f} кадров/с")
+    print(f"Счет: {game.score}, причина окончания: {game.game_over_reason or '-'}")
+    return game
+
+
+def replay_session(recording):
+    """Воспроизвести запись без окна с максимальной скоростью.
+
+    Возвращает игру в итоговом состоянии; совпадение game.state_digest()
+    с recording.digest подтверждает, что сеанс повторился кадр в кадр.
+    """
+    game = Game(headless=True, seed=recording.seed, input_source=ReplayInput(recording),
+                frames_per_step=recording.frames_per_step, waves=recording.waves, balance=recording.balance)
+    for _ in range(len(recording)):
+        game.step(game.input.poll())
+    return game
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Spaceship Simulator")
+    parser.add_argument("--headless", type=int, metavar="FRAMES", help="безголовый прогон на FRAMES кадров")
+    parser.add_argument("--seed", type=int, help="seed генератора случайных чисел")
+    parser.add_argument("--record", metavar="PATH", help="записать управление сеанса в файл")
+    parser.add_argument("--replay", metavar="PATH", help="воспроизвести запись без окна и проверить итог")
+    parser.add_argument("--profile", metavar="PATH", help="включить профилировщик и сохранить трассу (.csv или .json)")
+    parser.add_argument("--frames-per-step", type=int, default=1, metavar="N",
+                        help="крупный шаг симуляции: N кадров за шаг")
+    parser.add_argument("--telemetry", metavar="PATH", help="писать показатели каждого шага в файл телеметрии")
+    parser.add_argument("--renderer", choices=RENDERERS, default='sprites',
+                        help="отрисовка звезд и частиц: спрайтами или записью в пиксели")
+    parser.add_argument("--waves", choices=sorted(WAVES),
+                        help="появление метеоритов и бонусов по расписанию волн вместо таймеров")
+    args = parser.parse_args()
+    
+    if args.replay:
+        recording = Recording.load(args.replay)
+        start = time.perf_counter()
+        game = replay_session(recording)
+        elapsed = time.perf_counter() - start
+        matches = game.state_digest() == recording.digest
+        print(f"Кадров: {len(recording)}, время: {elapsed:.2f} с, счет: {game.score}")
+        print("Итоговое состояние совпадает с записью" if matches else "РАСХОЖДЕНИЕ с записью!")
+        return 0 if matches else 1
+    
+    telemetry = Telemetry(args.telemetry) if args.telemetry else None
+    if args.headless is not None:
+        game = run_headless(args.headless, args.seed, profile=bool(args.profile),
+                            frames_per_step=args.frames_per_step, telemetry=telemetry, waves=args.waves)
+        if telemetry:
+            telemetry.close()
+        if args.profile:
+            print("\n".join(game.profiler.report()))
+            game.profiler.export(args.profile)
+        return 0
+    
+    game = Game(seed=args.seed, frames_per_step=args.frames_per_step, renderer=args.renderer, waves=args.waves)
+    if args.profile:
+        game.profiler.enabled = True
+        game.profiler.tracing = True
+    if args.record:
+        recording = Recording(game.seed, frames_per_step=game.frames_per_step, waves=args.waves)
+        game.input = InputRecorder(game.input, recording)
+    game.telemetry = telemetry
     game.run()
+    if telemetry:
+        telemetry.close()
+    if args.record:
+        recording.digest = game.state_digest()
+        recording.save(args.record)
+    if args.profile:
+        game.profiler.export(args.profile)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
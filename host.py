@@ -0,0 +1,337 @@
+"""Хост игровых сессий: сотни безголовых игр на общем тике asyncio.
+
+В отличие от server.py, где каждая игра привязана к TCP-подключению,
+SessionHost сам заводит сессии (игра, seed, политика управления из
+montecarlo.POLICIES или маска от внешнего кода) и раз в тик шагает их все.
+Сессии разложены по шардам, шард шагается одним заданием бэкенда:
+    inline  - прямо в цикле событий, с передачей управления между шардами;
+    thread  - в пуле потоков;
+    process - в отдельных процессах, где и живут игры шарда (масштабирование по ядрам).
+
+Для каждой сессии копится задержка тика: время от начала тика до конца ее
+шага. Если тики не укладываются в бюджет, хост сбрасывает нагрузку: сессии
+шагают по очереди, каждая раз в stride тиков (их время замедляется, но
+состояние от этого не зависит), и новые сессии не принимаются, пока
+перегрузка не пройдет.
+
+Запуск: python host.py --sessions 200 --backend process --workers 4 --seconds 10
+"""
+import argparse
+import asyncio
+import math
+import multiprocessing
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from game import Game, FPS
+from montecarlo import POLICIES
+
+BACKENDS = ('inline', 'thread', 'process')
+LATENCY_HISTORY = FPS * 10  # Сколько последних задержек тика хранить на сессию
+LOAD_WINDOW = 15            # Тиков между пересчетами stride
+
+
+class Shard:
+    """Игры группы сессий; шагаются одним вызовом step в том процессе, где живет шард."""
+
+    def __init__(self):
+        self.games = {}  # номер сессии -> [игра, политика или None, кадр]
+
+    def step(self, added, removed, work):
+        """Добавить и удалить сессии, затем шагнуть сессии из work.
+
+        added - список (номер, seed, политика), removed - номера, work - список
+        (номер, маска или None для управления политикой). Возвращает список
+        (номер, время конца шага по perf_counter, итог), итог - None, пока игра
+        идет, иначе (счет, кадров, причина); закончившиеся игры удаляются.
+        """
+        games = self.games
+        for session_id, seed, policy in added:
+            controls = POLICIES[policy](random.Random(seed ^ 0x5EED)) if policy else None
+            games[session_id] = [Game(headless=True, seed=seed), controls, 0]
+        for session_id in removed:
+            games.pop(session_id, None)
+        results = []
+        for session_id, mask in work:
+            entry = games.get(session_id)
+            if entry is None:
+                continue
+            game, controls, frame = entry
+            active = game.step(controls(frame) if mask is None else mask)
+            entry[2] = frame + 1
+            if active:
+                results.append((session_id, time.perf_counter(), None))
+            else:
+                del games[session_id]
+                results.append((session_id, time.perf_counter(), (game.score, frame + 1, game.game_over_reason)))
+        return results
+
+    def close(self):
+        self.games.clear()
+
+
+def _shard_worker(conn):
+    shard = Shard()
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        conn.send(shard.step(*message))
+    conn.close()
+
+
+class ProcessShard:
+    """Шард в отдельном процессе: step пересылает задание по каналу и ждет ответа.
+
+    Часы perf_counter на Linux общие для процессов, поэтому время конца шага
+    из дочернего процесса сравнимо со временем начала тика.
+    """
+
+    def __init__(self, context):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_shard_worker, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def step(self, added, removed, work):
+        self.conn.send((added, removed, work))
+        return self.conn.recv()
+
+    def close(self):
+        self.conn.send(None)
+        self.process.join()
+        self.conn.close()
+
+
+class HostedSession:
+    """Сессия хоста: шард, управление и задержки тиков."""
+
+    def __init__(self, session_id, seed, policy, shard):
+        self.id = session_id
+        self.seed = seed
+        self.policy = policy
+        self.shard = shard
+        self.controls = 0  # Маска для сессий без политики (set_controls)
+        self.steps = 0
+        self.latencies = deque(maxlen=LATENCY_HISTORY)  # Задержки тиков, с
+
+
+class SessionHost:
+    """Хост многих безголовых сессий на общем тике.
+
+    budget - доля периода тика, которую может занимать шаг всех сессий;
+    при превышении в среднем за LOAD_WINDOW тиков хост увеличивает stride
+    и перестает принимать сессии, при запасе - уменьшает stride по одному.
+    """
+
+    def __init__(self, backend='inline', workers=None, tick_rate=FPS, budget=0.8, max_stride=8):
+        if backend not in BACKENDS:
+            raise ValueError(f"Неизвестный бэкенд: {backend}")
+        self.backend = backend
+        self.workers = workers or (os.cpu_count() if backend != 'inline' else 1)
+        self.dt = 1.0 / tick_rate
+        self.budget = budget
+        self.max_stride = max_stride
+        self.sessions = {}
+        self.finished = []  # Итоги закончившихся сессий
+        self.next_id = 1
+        self.tick_count = 0
+        self.tick_times = deque(maxlen=tick_rate * 10)  # Время обработки тиков, с
+        self.window = []    # Время тиков с последнего пересчета stride
+        self.stride = 1
+        self.overruns = 0   # Тиков дольше периода
+        self.shed = 0       # Пропущенных из-за перегрузки шагов сессий
+        self.rejected = 0   # Отклоненных из-за перегрузки сессий
+        self.executor = None
+        if backend == 'process':
+            # Процессы запускаются до появления потоков пула
+            context = multiprocessing.get_context()
+            self.shards = [ProcessShard(context) for _ in range(self.workers)]
+        else:
+            self.shards = [Shard() for _ in range(self.workers)]
+        if backend != 'inline':
+            self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="host")
+        self.pending = {shard: ([], []) for shard in self.shards}  # шард -> (added, removed)
+        self.sizes = {shard: 0 for shard in self.shards}
+
+    @property
+    def overloaded(self):
+        return self.stride > 1
+
+    def add_session(self, seed=None, policy='random'):
+        """Завести сессию; вернуть ее номер или None, если хост перегружен.
+
+        policy - имя политики из montecarlo.POLICIES или None для управления
+        через set_controls. Игра создается в шарде к следующему тику.
+        """
+        if self.overloaded:
+            self.rejected += 1
+            return None
+        if seed is None:
+            seed = random.randrange(1, 2 ** 31)
+        shard = min(self.shards, key=self.sizes.__getitem__)
+        session = HostedSession(self.next_id, seed, policy, shard)
+        self.next_id += 1
+        self.sessions[session.id] = session
+        self.pending[shard][0].append((session.id, seed, policy))
+        self.sizes[shard] += 1
+        return session.id
+
+    def remove_session(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            self.pending[session.shard][1].append(session_id)
+            self.sizes[session.shard] -= 1
+
+    def set_controls(self, session_id, controls):
+        """Маска управления сессии без политики на следующие тики."""
+        self.sessions[session_id].controls = controls
+
+    def _jobs(self):
+        """Задания шардам на этот тик: при stride > 1 шагает только очередная часть сессий."""
+        work = {shard: [] for shard in self.shards}
+        stride = self.stride
+        phase = self.tick_count % stride
+        for session in self.sessions.values():
+            if stride > 1 and session.id % stride != phase:
+                self.shed += 1
+                continue
+            work[session.shard].append((session.id, None if session.policy else session.controls))
+        jobs = []
+        for shard in self.shards:
+            added, removed = self.pending[shard]
+            if added or removed or work[shard]:
+                jobs.append((shard, added, removed, work[shard]))
+            self.pending[shard] = ([], [])
+        return jobs
+
+    def _collect(self, results, start):
+        sessions = self.sessions
+        for session_id, end, outcome in results:
+            session = sessions.get(session_id)
+            if session is None:
+                continue
+            session.latencies.append(end - start)
+            session.steps += 1
+            if outcome is not None:
+                score, frames, reason = outcome
+                del sessions[session_id]
+                self.sizes[session.shard] -= 1
+                self.finished.append({'id': session_id, 'seed': session.seed, 'score': score,
+                                      'frames': frames, 'reason': reason})
+
+    async def tick(self):
+        """Шаг всех (при перегрузке - очередных) сессий."""
+        start = time.perf_counter()
+        jobs = self._jobs()
+        self.tick_count += 1
+        if self.executor is None:
+            for shard, added, removed, work in jobs:
+                self._collect(shard.step(added, removed, work), start)
+                await asyncio.sleep(0)  # Между шардами цикл событий обслуживает остальные задачи
+        else:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(*(loop.run_in_executor(self.executor, shard.step, added, removed, work)
+                                             for shard, added, removed, work in jobs))
+            for result in results:
+                self._collect(result, start)
+        elapsed = time.perf_counter() - start
+        self.tick_times.append(elapsed)
+        if elapsed > self.dt:
+            self.overruns += 1
+        self._adjust_load(elapsed)
+
+    def _adjust_load(self, elapsed):
+        """Пересчитать stride по среднему времени тиков окна."""
+        window = self.window
+        window.append(elapsed)
+        if len(window) < LOAD_WINDOW:
+            return
+        load = sum(window) / len(window) / self.dt
+        window.clear()
+        stride = self.stride
+        if load > self.budget:
+            # Время тика примерно пропорционально числу шагаемых сессий
+            target = self.budget * 0.9
+            self.stride = min(self.max_stride, max(stride + 1, math.ceil(stride * load / target)))
+        elif stride > 1 and load * stride / (stride - 1) < self.budget * 0.8:
+            self.stride = stride - 1
+
+    async def run(self, ticks=None, seconds=None):
+        """Тикать с частотой 1 / dt, как GameServer.run; при отставании догонять без сна."""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        end = None if seconds is None else next_tick + seconds
+        first = self.tick_count
+        while (ticks is None or self.tick_count - first < ticks) and (end is None or loop.time() < end):
+            await self.tick()
+            next_tick += self.dt
+            delay = next_tick - loop.time()
+            if delay < -self.dt * 5:
+                next_tick = loop.time()  # Слишком отстали - не пытаемся догнать
+            await asyncio.sleep(max(0.0, delay))
+
+    def stats(self):
+        """Сводка: тики, задержки сессий и сброс нагрузки."""
+        ticks = np.array(self.tick_times) * 1000
+        latencies = [latency for session in self.sessions.values() for latency in session.latencies]
+        latencies = np.array(latencies) * 1000
+        tick50, tick99 = np.percentile(ticks, (50, 99)) if len(ticks) else (0.0, 0.0)
+        latency50, latency99 = np.percentile(latencies, (50, 99)) if len(latencies) else (0.0, 0.0)
+        return {
+            'sessions': len(self.sessions),
+            'ticks': self.tick_count,
+            'tick_p50_ms': float(tick50),
+            'tick_p99_ms': float(tick99),
+            'latency_p50_ms': float(latency50),
+            'latency_p99_ms': float(latency99),
+            'overruns': self.overruns,
+            'stride': self.stride,
+            'shed': self.shed,
+            'rejected': self.rejected,
+            'finished': len(self.finished),
+        }
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+        if self.executor is not None:
+            self.executor.shutdown()
+
+
+async def serve(args):
+    host = SessionHost(args.backend, args.workers, args.tick_rate, args.budget)
+    try:
+        for _ in range(args.sessions):
+            host.add_session(policy=args.policy)
+        await host.run(seconds=args.seconds)
+        return host.stats()
+    finally:
+        host.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Хост многих безголовых игровых сессий")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--backend", choices=BACKENDS, default='inline')
+    parser.add_argument("--workers", type=int, default=None, help="число шардов (потоков или процессов)")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default='random')
+    parser.add_argument("--tick-rate", type=int, default=FPS)
+    parser.add_argument("--budget", type=float, default=0.8, help="доля периода тика на шаг сессий")
+    args = parser.parse_args()
+    try:
+        stats = asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        return
+    for name, value in stats.items():
+        print(f"{name:<16}{value:.2f}" if isinstance(value, float) else f"{name:<16}{value}")
+
+
+if __name__ == "__main__":
+    main()
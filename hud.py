@@ -0,0 +1,60 @@
+"""HUD с кэшем отрисованного текста и учетом измененных областей экрана."""
+from lazyimport import lazy_import
+
+pygame = lazy_import("pygame")
+
+
+class Hud:
+    """Элементы HUD, перерисовываемые только при изменении значения.
+
+    Каждый элемент занимает именованный слот. Текст слота растеризуется
+    шрифтом заново лишь когда меняется его строка или цвет, а области
+    изменившихся слотов копятся для частичного обновления экрана
+    (pygame.display.update(rects)).
+    """
+
+    def __init__(self, font):
+        self.font = font
+        self.slots = {}  # слот -> (ключ, поверхность или None, Rect)
+        self.dirty = []
+        self.renders = 0  # Сколько раз вызывался font.render
+
+    def _mark(self, slot, key, surface, rect):
+        """Запомнить новое содержимое слота и отметить старую и новую области."""
+        previous = self.slots.get(slot)
+        if previous is not None:
+            self.dirty.append(previous[2])
+        self.dirty.append(rect)
+        self.slots[slot] = (key, surface, rect)
+
+    def text(self, screen, slot, text, color, pos):
+        """Вывести текст слота; при text=None слот убирается."""
+        entry = self.slots.get(slot)
+        if text is None:
+            if entry is not None:
+                self.dirty.append(entry[2])
+                del self.slots[slot]
+            return
+        key = (text, color)
+        if entry is None or entry[0] != key:
+            surface = self.font.render(text, True, color)
+            self.renders += 1
+            self._mark(slot, key, surface, surface.get_rect(topleft=pos))
+            entry = self.slots[slot]
+        screen.blit(entry[1], entry[2])
+
+    def bar(self, screen, slot, rect, color, value, maximum=100, border=(255, 0, 0)):
+        """Вывести полосу с рамкой, заполненную на долю value / maximum."""
+        x, y, width, height = rect
+        fill = int(width * value / maximum)
+        entry = self.slots.get(slot)
+        if entry is None or entry[0] != (fill, color):
+            self._mark(slot, (fill, color), None, pygame.Rect(rect))
+        pygame.draw.rect(screen, border, rect, 2)
+        pygame.draw.rect(screen, color, (x, y, fill, height))
+
+    def take_dirty(self):
+        """Вернуть и сбросить накопленные измененные области."""
+        dirty = self.dirty
+        self.dirty = []
+        return dirty
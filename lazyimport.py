@@ -0,0 +1,27 @@
+"""Отложенный импорт: модуль загружается при первом обращении к его атрибуту.
+
+Так модули с отрисовкой импортируют pygame, а безголовые инструменты
+(Monte Carlo, сервер, бенчмарки симуляции), которые до отрисовки не
+доходят, не платят за его загрузку и работают даже без установленного pygame.
+"""
+import importlib.util
+import sys
+
+
+def lazy_import(name):
+    """Вернуть модуль name с отложенной загрузкой; None, если модуль не установлен."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None:
+        return None
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,214 @@
+"""Пакетный прогон безголовых сессий для балансировки миссии.
+
+Тысячи игр с заданной политикой управления и параметрами баланса (см.
+game.BALANCE) распределяются по процессам concurrent.futures. Результат
+каждой сессии сразу дописывается строкой JSON в файл результатов, поэтому
+прерванный прогон продолжается с того же места повторным запуском с тем
+же файлом. Итог - таблица по причинам окончания игры.
+
+Пример:
+    python montecarlo.py --sessions 2000 --policy random --out runs.jsonl
+    python montecarlo.py --sessions 2000 --set fuel_powerup=40 --set event_chance=0.2 --out fuel40.jsonl
+    python montecarlo.py --sessions 2000 --frames-per-step 4 --out coarse.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from controls import ScriptedInput, LEFT, RIGHT, UP, DOWN, FIRE
+from game import Game, BALANCE, FPS
+
+MAX_SECONDS = 300  # Цель миссии - выжить 5 минут
+CHUNK = 8          # Сессий в одной задаче процесса
+SURVIVED = "Выжил"
+
+
+def idle_policy(rng):
+    """Корабль стоит на месте и не стреляет."""
+    return lambda frame: 0
+
+
+def sweep_policy(rng):
+    """Проход влево-вправо со стрельбой каждые 10 кадров."""
+    period = rng.randint(180, 300)
+    return lambda frame: (FIRE if frame % 10 < 5 else 0) | (LEFT if frame % period < period // 2 else RIGHT)
+
+
+def random_policy(rng):
+    """Случайное направление на 10-40 кадров, стрельба с вероятностью 1/2."""
+    state = {'until': 0, 'controls': 0, 'polls': 0}
+    directions = (0, LEFT, RIGHT, UP, DOWN, LEFT | UP, RIGHT | UP, LEFT | DOWN, RIGHT | DOWN)
+
+    def policy(frame):
+        if frame >= state['until']:
+            state['until'] = frame + rng.randint(10, 40)
+            state['controls'] = rng.choice(directions) | (FIRE if rng.random() < 0.5 else 0)
+        controls = state['controls']
+        # Отпускаем пробел через опрос, чтобы выстрелы шли очередью и при крупном шаге
+        polls = state['polls']
+        state['polls'] = polls + 1
+        return controls if polls % 2 == 0 else controls & ~FIRE
+
+    return policy
+
+
+POLICIES = {
+    'idle': idle_policy,
+    'sweep': sweep_policy,
+    'random': random_policy,
+}
+
+
+def play_session(seed, policy, balance, max_frames, frames_per_step=1):
+    """Сыграть одну сессию и вернуть ее итог.
+
+    При frames_per_step > 1 политика опрашивается раз за шаг, по первому кадру шага.
+    """
+    controls = POLICIES[policy](random.Random(seed ^ 0x5EED))
+    script = ScriptedInput(lambda step: controls(step * frames_per_step))
+    game = Game(headless=True, seed=seed, balance=balance, input_source=script,
+                frames_per_step=frames_per_step)
+    steps = -(-max_frames // frames_per_step)
+    frames = min(game.simulate(steps) * frames_per_step, max_frames)
+    return {
+        'seed': seed,
+        'frames': frames,
+        'survival': frames / FPS,
+        'score': game.score,
+        'reason': game.game_over_reason if not game.game_active else SURVIVED,
+    }
+
+
+def play_chunk(seeds, policy, balance, max_frames, frames_per_step=1):
+    """Сыграть несколько сессий в одном процессе."""
+    return [play_session(seed, policy, balance, max_frames, frames_per_step) for seed in seeds]
+
+
+def load_results(path, config):
+    """Прочитать уже готовые результаты; файл должен быть с той же конфигурацией."""
+    results = []
+    if not os.path.exists(path):
+        return results
+    with open(path, encoding='utf-8') as f:
+        header = f.readline()
+        if header and json.loads(header).get('config') != config:
+            raise SystemExit(f"{path} содержит прогон с другими параметрами; укажите другой --out")
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                break  # Строка, оборванная прерыванием
+    return results
+
+
+def run_batch(path, sessions, policy='random', balance=None, workers=None, base_seed=0,
+              max_seconds=MAX_SECONDS, chunk=CHUNK, frames_per_step=1):
+    """Доиграть недостающие из sessions сессий и вернуть все результаты."""
+    balance = balance if balance else {}
+    max_frames = int(max_seconds * FPS)
+    config = {'policy': policy, 'balance': balance, 'base_seed': base_seed, 'max_frames': max_frames,
+              'frames_per_step': frames_per_step}
+    config = json.loads(json.dumps(config))  # Кортежи -> списки, как при чтении из файла
+    results = load_results(path, config)
+    done = {result['seed'] for result in results}
+    todo = [seed for seed in range(base_seed, base_seed + sessions) if seed not in done]
+    if not todo:
+        return results
+
+    # Переписываем файл, чтобы отбросить возможную оборванную строку
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'config': config}) + "\n")
+        for result in results:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    print(f"Готово {len(results)} из {sessions}, осталось {len(todo)}")
+    start = time.perf_counter()
+    played = 0
+    with open(path, 'a', encoding='utf-8') as f, ProcessPoolExecutor(workers) as executor:
+        futures = [
+            executor.submit(play_chunk, todo[i:i + chunk], policy, balance, max_frames, frames_per_step)
+            for i in range(0, len(todo), chunk)
+        ]
+        try:
+            for future in as_completed(futures):
+                for result in future.result():
+                    f.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    results.append(result)
+                    played += 1
+                f.flush()
+                elapsed = time.perf_counter() - start
+                print(f"\r{len(results)}/{sessions} сессий, {played / elapsed:.1f} в секунду",
+                      end='', flush=True)
+        except KeyboardInterrupt:
+            # cancel_futures у shutdown появился только в Python 3.9
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            print(f"\nПрервано: сохранено {len(results)} сессий, повторный запуск продолжит прогон")
+            raise SystemExit(130)
+    print()
+    return results
+
+
+def summarize(results):
+    """Строки таблицы итогов: по каждой причине окончания и в целом."""
+    groups = {}
+    for result in results:
+        groups.setdefault(result['reason'], []).append(result)
+    total = len(results)
+    lines = [f"{'причина':<24}{'сессий':>8}{'доля':>7}{'время, с':>10}{'p10':>7}{'p90':>7}{'счет':>8}"]
+    rows = sorted(groups.items(), key=lambda item: -len(item[1]))
+    rows.append(("Всего", results))
+    for reason, group in rows:
+        survival = np.array([result['survival'] for result in group])
+        score = np.array([result['score'] for result in group])
+        p10, p90 = np.percentile(survival, (10, 90))
+        lines.append(f"{reason:<24}{len(group):>8}{len(group) / total:>7.1%}{survival.mean():>10.1f}"
+                     f"{p10:>7.1f}{p90:>7.1f}{score.mean():>8.0f}")
+    return lines
+
+
+def parse_balance(assignments):
+    """Разобрать аргументы вида имя=значение в словарь параметров баланса."""
+    balance = {}
+    for assignment in assignments:
+        name, _, value = assignment.partition('=')
+        if name not in BALANCE:
+            raise SystemExit(f"Неизвестный параметр баланса {name}; есть: {', '.join(BALANCE)}")
+        balance[name] = json.loads(value.replace('(', '[').replace(')', ']'))
+        if isinstance(balance[name], list):
+            balance[name] = tuple(balance[name])
+    return balance
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетный прогон сессий для балансировки миссии")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default='random')
+    parser.add_argument("--workers", type=int, help="число процессов (по умолчанию - по числу ядер)")
+    parser.add_argument("--seed", type=int, default=0, help="seed первой сессии")
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS)
+    parser.add_argument("--set", action="append", default=[], metavar="ИМЯ=ЗНАЧЕНИЕ",
+                        help="параметр баланса, например fuel_powerup=40 или meteor_spawn_interval=(20,40)")
+    parser.add_argument("--frames-per-step", type=int, default=1, metavar="N",
+                        help="крупный шаг симуляции: N кадров за шаг, быстрее ценой точности управления")
+    parser.add_argument("--out", default="montecarlo.jsonl", help="файл результатов (продолжается при повторе)")
+    args = parser.parse_args()
+
+    results = run_batch(args.out, args.sessions, args.policy, parse_balance(args.set), args.workers,
+                        args.seed, args.max_seconds, frames_per_step=args.frames_per_step)
+    print("\n".join(summarize(results)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
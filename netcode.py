@@ -0,0 +1,190 @@
+"""Сетевые сообщения и снимки состояния игры в компактном двоичном виде.
+
+Снимок - словарь вид -> {идентификатор: кортеж целых полей} для корабля,
+метеоритов, ракет и бонусов. По сети он передается разностью с последним
+снимком, подтвержденным клиентом: для каждого вида - удаленные
+идентификаторы и записи с маской изменившихся полей, так что у летящего
+метеорита передается только новая координата y. Без подтвержденного
+снимка отправляется полный (разность с пустым состоянием).
+
+Кадр сообщения: '<I' длина, затем байт типа и данные (little-endian):
+    HELLO    '<Q'   seed (0 - случайный)                       клиент -> сервер
+    WELCOME  '<IQ'  номер сессии, seed                         сервер -> клиент
+    INPUT    '<BI'  маска управления, последний принятый тик   клиент -> сервер
+    SNAPSHOT '<IIB' тик, базовый тик (NO_BASE - полный), ширина, виды   сервер -> клиент
+Вид в снимке: '<H' число удаленных и их идентификаторы, затем '<H' число
+записей и записи: идентификатор и байт маски, далее только поля из маски
+в порядке KINDS. Идентификаторы и координаты x, y - '<H' и int16, а если
+в снимке что-то в них не помещается (мир больше экрана, долгая сессия), -
+'<I' и int32 (ширина 1). Значение, не помещающееся и так, и больше
+MAX_RECORDS записей одного вида дают ValueError.
+"""
+import struct
+from itertools import compress
+
+import numpy as np
+
+HELLO = 1
+WELCOME = 2
+INPUT = 3
+SNAPSHOT = 4
+
+FRAME = struct.Struct('<I')
+MESSAGE_TYPE = struct.Struct('<B')
+HELLO_BODY = struct.Struct('<Q')
+WELCOME_BODY = struct.Struct('<IQ')
+INPUT_BODY = struct.Struct('<BI')
+SNAPSHOT_HEADER = struct.Struct('<IIB')
+COUNT = struct.Struct('<H')
+MAX_RECORDS = 0xFFFF  # Больше записей одного вида в снимке не помещается в COUNT
+# Ширина снимка -> (формат идентификатора, формат координаты)
+WIDTHS = (('H', 'h'), ('I', 'i'))
+RECORD_HEADERS = tuple(struct.Struct(f'<{id_format}B') for id_format, _ in WIDTHS)
+NO_BASE = 0xFFFFFFFF
+RESOURCE_SCALE = 10  # Ресурсы корабля передаются в десятых долях
+
+# Вид -> форматы полей записи после координат x, y
+KINDS = (
+    ('ship', 'HHHIBB'),        # x, y, корпус, топливо, кислород (x10), счет, активна, событие + 1
+    ('meteors', 'BBBB'),       # x, y, размер, здоровье, макс. здоровье, вспышка
+    ('rockets', ''),           # x, y
+    ('powerups', 'B'),         # x, y, тип
+)
+BITS = tuple(1 << i for i in range(8))
+_record_structs = {}  # (вид, маска, ширина) -> (struct полей из маски, флаги полей для compress)
+
+
+def _fields_struct(kind, formats, mask, wide):
+    key = (kind, mask, wide)
+    entry = _record_structs.get(key)
+    if entry is None:
+        formats = WIDTHS[wide][1] * 2 + formats
+        selectors = tuple(bool(mask & bit) for bit in BITS[:len(formats)])
+        entry = (struct.Struct('<' + ''.join(compress(formats, selectors))), selectors)
+        _record_structs[key] = entry
+    return entry
+
+
+def frame(message_type, body=b''):
+    """Упаковать сообщение в кадр с длиной."""
+    return FRAME.pack(len(body) + 1) + MESSAGE_TYPE.pack(message_type) + body
+
+
+def _rows(store, *columns):
+    """Словарь идентификатор -> кортеж целых полей; columns - имена столбцов или массивы."""
+    n = store.count
+    if n == 0:
+        return {}
+    values = [(store.array(column) if isinstance(column, str) else column).astype(np.int64).tolist()
+              for column in columns]
+    return dict(zip(store.ids[:n].tolist(), zip(*values)))
+
+
+def capture(game):
+    """Снять состояние игры для передачи клиентам."""
+    ship = game.ship
+    events = game.mission.active_events
+    event = list(type(events[-1])).index(events[-1]) + 1 if events else 0
+    meteors = game.meteors
+    return {
+        'ship': {0: (
+            int(ship.position[0]), int(ship.position[1]),
+            int(ship.hull_integrity * RESOURCE_SCALE), int(ship.fuel * RESOURCE_SCALE),
+            int(ship.oxygen * RESOURCE_SCALE), game.score, 1 if game.game_active else 0, event,
+        )},
+        'meteors': _rows(meteors, 'x', 'y', 'size', 'health', 'max_health', meteors.array('hit_flash') > 0),
+        'rockets': _rows(game.rockets, 'x', 'y'),
+        'powerups': _rows(game.powerups, 'x', 'y', 'kind'),
+    }
+
+
+def encode_snapshot(tick, state, base_tick=NO_BASE, base=None):
+    """Упаковать снимок state как разность с base (None - полный снимок).
+
+    Снимок пакуется узким, а если не поместился - широким. Бросает
+    ValueError, если записей слишком много или поле не помещается и в широкий.
+    """
+    try:
+        return _encode(tick, state, base_tick, base, 0)
+    except struct.error:
+        pass
+    try:
+        return _encode(tick, state, base_tick, base, 1)
+    except struct.error as error:
+        raise ValueError(f"Состояние не помещается в снимок: {error}") from error
+
+
+def _encode(tick, state, base_tick, base, wide):
+    chunks = [SNAPSHOT_HEADER.pack(tick, base_tick if base is not None else NO_BASE, wide)]
+    id_format = WIDTHS[wide][0]
+    pack_header = RECORD_HEADERS[wide].pack
+    for kind, formats in KINDS:
+        records = state[kind]
+        previous = base[kind] if base is not None else {}
+        full_mask = (1 << len(formats) + 2) - 1
+        removed = [entity_id for entity_id in previous if entity_id not in records]
+        if len(removed) > MAX_RECORDS or len(records) > MAX_RECORDS:
+            raise ValueError(f"Слишком много объектов вида {kind} для снимка: {max(len(removed), len(records))}")
+        chunks.append(COUNT.pack(len(removed)))
+        if removed:
+            chunks.append(struct.pack(f'<{len(removed)}{id_format}', *removed))
+        changed = []
+        for entity_id, values in records.items():
+            old = previous.get(entity_id)
+            if old is None:
+                mask = full_mask
+            elif old == values:
+                continue
+            else:
+                mask = 0
+                for bit, value, old_value in zip(BITS, values, old):
+                    if value != old_value:
+                        mask |= bit
+            packer, selectors = _fields_struct(kind, formats, mask, wide)
+            changed.append(pack_header(entity_id, mask) + packer.pack(*compress(values, selectors)))
+        chunks.append(COUNT.pack(len(changed)))
+        chunks.extend(changed)
+    return b''.join(chunks)
+
+
+def decode_snapshot(data, states):
+    """Распаковать снимок; states - словарь тик -> ранее принятые состояния.
+
+    Возвращает (тик, состояние). Если базового снимка нет, бросает KeyError.
+    """
+    tick, base_tick, wide = SNAPSHOT_HEADER.unpack_from(data)
+    offset = SNAPSHOT_HEADER.size
+    base = states[base_tick] if base_tick != NO_BASE else None
+    id_format = WIDTHS[wide][0]
+    record_header = RECORD_HEADERS[wide]
+    state = {}
+    for kind, formats in KINDS:
+        records = dict(base[kind]) if base is not None else {}
+        (removed,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        if removed:
+            removed_ids = struct.Struct(f'<{removed}{id_format}')
+            for entity_id in removed_ids.unpack_from(data, offset):
+                del records[entity_id]
+            offset += removed_ids.size
+        (count,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        fields_count = len(formats) + 2
+        full_mask = (1 << fields_count) - 1
+        for _ in range(count):
+            entity_id, mask = record_header.unpack_from(data, offset)
+            offset += record_header.size
+            packer, _ = _fields_struct(kind, formats, mask, wide)
+            fields = packer.unpack_from(data, offset)
+            offset += packer.size
+            if mask == full_mask:
+                records[entity_id] = fields
+            else:
+                values = list(records[entity_id])
+                changed = iter(fields)
+                for i in range(fields_count):
+                    if mask >> i & 1:
+                        values[i] = next(changed)
+                records[entity_id] = tuple(values)
+        state[kind] = records
+    return tick, state
@@ -0,0 +1,203 @@
+"""Общий пул частиц взрывов в заранее выделенных массивах NumPy."""
+import numpy as np
+
+from lazyimport import lazy_import
+from pixels import plot
+
+pygame = lazy_import("pygame")
+
+PARTICLE_LIFETIME = 20  # Время жизни частицы в кадрах
+MAX_PARTICLE_SIZE = 4   # Наибольший радиус частицы
+
+# Политики переполнения буфера
+OVERFLOW_DROP = 'drop'        # Лишние новые частицы отбрасываются
+OVERFLOW_RECYCLE = 'recycle'  # Новые частицы вытесняют самые старые
+
+
+def particle_color(life):
+    """Цвет частицы с остатком жизни life: от оранжевого к темному."""
+    color_value = int(255 * (life / PARTICLE_LIFETIME))
+    return (color_value, color_value // 2, 0)
+
+
+class ParticleSystem:
+    """Все живые частицы игры в одном буфере фиксированной емкости.
+
+    Взрывы не хранят своих частиц: explode() только ставит запрос на
+    появление, а запросы кадра разворачиваются в буфер одной векторной
+    операцией. Движение и истечение времени жизни тоже векторные.
+    """
+
+    def __init__(self, capacity=4096, overflow=OVERFLOW_RECYCLE, rng=None):
+        if overflow not in (OVERFLOW_DROP, OVERFLOW_RECYCLE):
+            raise ValueError(f"Неизвестная политика переполнения: {overflow}")
+        self.capacity = capacity
+        self.overflow = overflow
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.x = np.zeros(capacity, np.float64)
+        self.y = np.zeros(capacity, np.float64)
+        self.vx = np.zeros(capacity, np.float64)
+        self.vy = np.zeros(capacity, np.float64)
+        self.life = np.zeros(capacity, np.int32)
+        self.size = np.zeros(capacity, np.int32)
+        self.count = 0
+        self.pending = []  # Запросы (x, y, size) еще не развернутых взрывов
+        self.dropped = 0   # Сколько частиц потеряно из-за переполнения
+        self._sprites = None
+        self._pixel_colors = None  # Цвета по остатку жизни в формате экрана, см. draw_pixels
+
+    def __len__(self):
+        return self.count + sum(int(size // 5) for _, _, size in self.pending)
+
+    def clear(self):
+        """Удалить все частицы и запросы."""
+        self.count = 0
+        self.pending.clear()
+
+    def explode(self, x, y, size):
+        """Запросить взрыв метеорита размера size с центром в (x, y)."""
+        self.pending.append((x, y, size))
+
+    def _flush(self):
+        """Развернуть накопленные запросы на взрывы в частицы."""
+        if not self.pending:
+            return
+        requests = np.array(self.pending, dtype=np.float64)
+        self.pending.clear()
+        counts = (requests[:, 2] // 5).astype(np.int64)
+        total = int(counts.sum())
+        if total == 0:
+            return
+        rng = self.rng
+        speed = rng.uniform(1, 4, total)
+        self._spawn(
+            np.repeat(requests[:, 0], counts),
+            np.repeat(requests[:, 1], counts),
+            speed * (rng.random(total) - 0.5) * 2,
+            speed * (rng.random(total) - 0.5) * 2,
+            rng.integers(2, MAX_PARTICLE_SIZE + 1, total),
+        )
+
+    def _spawn(self, x, y, vx, vy, size):
+        """Записать новые частицы в буфер с учетом политики переполнения."""
+        total = len(x)
+        free = self.capacity - self.count
+        if total > free:
+            if self.overflow == OVERFLOW_DROP:
+                self.dropped += total - free
+                total = free
+                x, y, vx, vy, size = x[:free], y[:free], vx[:free], vy[:free], size[:free]
+            else:
+                # Вытесняем частицы с наименьшим остатком жизни
+                evict = total - free
+                if evict >= self.count:
+                    self.dropped += self.count + total - self.capacity
+                    self.count = 0
+                    total = self.capacity
+                    x, y, vx, vy, size = x[-total:], y[-total:], vx[-total:], vy[-total:], size[-total:]
+                else:
+                    self.dropped += evict
+                    oldest = np.argpartition(self.life[:self.count], evict - 1)[:evict]
+                    keep = np.ones(self.count, dtype=bool)
+                    keep[oldest] = False
+                    self._compact(keep)
+        start = self.count
+        end = start + total
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vx[start:end] = vx
+        self.vy[start:end] = vy
+        self.life[start:end] = PARTICLE_LIFETIME
+        self.size[start:end] = size
+        self.count = end
+
+    def _compact(self, keep):
+        """Оставить только частицы, отмеченные в маске keep."""
+        n = self.count
+        kept = np.flatnonzero(keep)
+        m = len(kept)
+        for array in (self.x, self.y, self.vx, self.vy, self.life, self.size):
+            array[:m] = array[:n][kept]
+        self.count = m
+
+    def update(self, frames=1):
+        """Сдвинуть все частицы на frames кадров и удалить отжившие."""
+        self._flush()
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.vx[:n] * frames
+        self.y[:n] += self.vy[:n] * frames
+        life = self.life[:n]
+        life -= frames
+        alive = life > 0
+        if not alive.all():
+            self._compact(alive)
+
+    def _sprite_table(self):
+        """Круги частиц для всех пар (размер, остаток жизни), рисуются один раз.
+
+        Спрайт для пары лежит по индексу size * (PARTICLE_LIFETIME + 1) + life.
+        """
+        if self._sprites is None:
+            self._sprites = [None] * ((MAX_PARTICLE_SIZE + 1) * (PARTICLE_LIFETIME + 1))
+            for size in range(MAX_PARTICLE_SIZE + 1):
+                for life in range(PARTICLE_LIFETIME + 1):
+                    sprite = pygame.Surface((size * 2 + 1, size * 2 + 1))
+                    sprite.set_colorkey((0, 0, 0))
+                    pygame.draw.circle(sprite, particle_color(life), (size, size), size)
+                    self._sprites[size * (PARTICLE_LIFETIME + 1) + life] = sprite
+        return self._sprites
+
+    def draw(self, screen, doreturn=False, lag=0.0, offset=None):
+        """Отрисовать все частицы одним вызовом Surface.blits.
+
+        lag - на сколько кадров частицы отступают назад по скорости (между шагами),
+        offset - (x, y), вычитаемые из позиций (положение камеры).
+        При doreturn=True возвращает список областей, занятых частицами.
+        """
+        self._flush()
+        n = self.count
+        if n == 0:
+            return []
+        size = self.size[:n]
+        keys = (size * (PARTICLE_LIFETIME + 1) + self.life[:n]).tolist()
+        x, y = self._centers(lag, offset)
+        xs = (x - size).tolist()
+        ys = (y - size).tolist()
+        sprites = map(self._sprite_table().__getitem__, keys)
+        return screen.blits(zip(sprites, zip(xs, ys)), doreturn)
+
+    def draw_pixels(self, pixels, screen, doreturn=False, lag=0.0, offset=None):
+        """То же, что draw, но частицы пишутся прямо в пиксели экрана.
+
+        pixels - pygame.surfarray.pixels2d(screen). При doreturn=True
+        возвращает области частиц, как draw (без обрезки по экрану).
+        """
+        self._flush()
+        n = self.count
+        if n == 0:
+            return []
+        if self._pixel_colors is None:
+            self._pixel_colors = np.array([screen.map_rgb(particle_color(life))
+                                           for life in range(PARTICLE_LIFETIME + 1)], pixels.dtype)
+        size = self.size[:n]
+        x, y = self._centers(lag, offset)
+        plot(pixels, x, y, size, self._pixel_colors[self.life[:n]])
+        if not doreturn:
+            return []
+        sides = (size * 2 + 1).tolist()
+        return list(zip((x - size).tolist(), (y - size).tolist(), sides, sides))
+
+    def _centers(self, lag, offset):
+        """Целые экранные координаты центров частиц."""
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        if lag:
+            x = x - self.vx[:n] * lag
+            y = y - self.vy[:n] * lag
+        if offset is not None:
+            x = x - offset[0]
+            y = y - offset[1]
+        return x.astype(np.int64), y.astype(np.int64)
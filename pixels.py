@@ -0,0 +1,91 @@
+"""Вывод точечных объектов (звезд, частиц) записью прямо в пиксели поверхности.
+
+Вместо blit спрайта на каждый объект центры всех объектов разворачиваются
+в пиксели их кругов операциями NumPy и записываются в массив
+pygame.surfarray.pixels2d одной индексацией. Форма круга берется у
+pygame.draw.circle, а на перекрытиях каждый пиксель получает цвет последнего
+по порядку объекта, так что картинка совпадает со спрайтами, выведенными по
+очереди.
+"""
+import numpy as np
+
+from lazyimport import lazy_import
+
+pygame = lazy_import("pygame")
+
+_DISKS = {}  # Радиус -> смещения пикселей круга
+_disk_table = None  # Смещения кругов радиусов 0..r подряд, см. disk_table
+_WINNERS = {}  # Размер массива пикселей -> номер последней записи в каждый пиксель, см. plot
+
+
+def disk_offsets(radius):
+    """Смещения пикселей круга радиуса radius от центра: массивы dx, dy."""
+    offsets = _DISKS.get(radius)
+    if offsets is None:
+        size = radius * 2 + 1
+        surface = pygame.Surface((size, size), 0, 32)
+        pygame.draw.circle(surface, (255, 255, 255), (radius, radius), radius)
+        dx, dy = np.nonzero(pygame.surfarray.pixels2d(surface))
+        offsets = _DISKS[radius] = (dx - radius, dy - radius)
+    return offsets
+
+
+def disk_table(max_radius):
+    """Смещения кругов всех радиусов до max_radius одной таблицей.
+
+    Возвращает (dx, dy, lengths, starts): смещения кругов радиусов 0, 1, ...
+    подряд, число пикселей круга и начало его смещений по радиусу.
+    """
+    global _disk_table
+    if _disk_table is None or len(_disk_table[2]) <= max_radius:
+        disks = [disk_offsets(radius) for radius in range(max_radius + 1)]
+        lengths = np.array([len(dx) for dx, _ in disks])
+        _disk_table = (np.concatenate([dx for dx, _ in disks]).astype(np.int32),
+                       np.concatenate([dy for _, dy in disks]).astype(np.int32),
+                       lengths, np.cumsum(lengths) - lengths)
+    return _disk_table
+
+
+def plot(pixels, xs, ys, radii, colors):
+    """Нарисовать круги с центрами (xs, ys) и радиусами radii в массив pixels.
+
+    pixels - pygame.surfarray.pixels2d(поверхность), colors - значения
+    пикселей (Surface.map_rgb) по кругам или одно на все. Части кругов за
+    краями поверхности отбрасываются. На перекрытиях побеждает более поздний
+    круг, как при blit по очереди. NumPy не обещает, какая из повторных
+    записей одной индексацией останется, поэтому сначала для каждого пикселя
+    находится номер последней записи в него, и все записи в пиксель несут цвет
+    этой последней.
+    """
+    if len(xs) == 0:
+        return
+    width, height = pixels.shape
+    colors = np.broadcast_to(colors, np.shape(xs))
+    table_dx, table_dy, lengths, starts = disk_table(int(radii.max()))
+    counts = lengths[radii]
+    ends = np.cumsum(counts)
+    # Номер пикселя в таблице: начало круга своего радиуса плюс номер внутри круга
+    index = np.arange(ends[-1], dtype=np.int32)
+    index += np.repeat((starts[radii] - (ends - counts)).astype(np.int32), counts)
+    px = table_dx[index]
+    px += np.repeat(xs.astype(np.int32), counts)
+    py = table_dy[index]
+    py += np.repeat(ys.astype(np.int32), counts)
+    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    px = px[inside]
+    py = py[inside]
+    cells = px * height + py
+    winners = _WINNERS.get(pixels.shape)
+    if winners is None:
+        winners = _WINNERS[pixels.shape] = np.empty(width * height, dtype=np.int32)
+    # Записи, оставшиеся позади более ранних в тот же пиксель, пишутся заново,
+    # пока в каждом пикселе не окажется номер самой поздней
+    order = np.arange(len(cells), dtype=np.int32)
+    winners[cells] = order
+    last = winners[cells]
+    late = order[last < order]
+    while len(late):
+        winners[cells[late]] = late
+        last = winners[cells]
+        late = late[last[late] < late]
+    pixels[px, py] = np.repeat(colors, counts)[inside][last]
@@ -0,0 +1,153 @@
+"""Покадровый профилировщик: время по разделам кадра и число объектов.
+
+Разделы отмечаются вызовами lap(): время раздела - от предыдущей отметки
+(mark или lap) до текущей. Если за кадр раздел встречается несколько раз
+(например, несколько шагов симуляции), время суммируется. Выключенный
+профилировщик сводится к одной проверке флага на вызов.
+
+Трассу можно сохранить в CSV или JSON и сравнить две сборки:
+    python profiler.py base.csv new.csv
+"""
+import csv
+import json
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    """Скользящая статистика времени разделов кадра и трасса по кадрам."""
+
+    def __init__(self, window=300, enabled=False, tracing=False):
+        self.window = window      # Сколько последних кадров учитывать в статистике
+        self.enabled = enabled
+        self.tracing = tracing    # Сохранять каждый кадр для экспорта
+        self.samples = {}         # раздел -> deque времени за кадр, мс
+        self.counts = {}          # имя -> последнее число объектов
+        self.trace = []           # Строки трассы: {'frame': ..., раздел: мс, ...}
+        self.frames = 0
+        self._frame = {}
+        self._last = 0.0
+
+    def toggle(self):
+        """Включить или выключить сбор; при включении статистика сбрасывается."""
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.samples.clear()
+            self._frame = {}
+        return self.enabled
+
+    def mark(self):
+        """Начать отсчет следующего раздела."""
+        if self.enabled:
+            self._last = time.perf_counter()
+
+    def lap(self, section):
+        """Записать время от предыдущей отметки в раздел section."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        frame = self._frame
+        frame[section] = frame.get(section, 0.0) + (now - self._last)
+        self._last = now
+
+    def count(self, name, value):
+        """Запомнить число объектов name в текущем кадре."""
+        if self.enabled:
+            self.counts[name] = value
+
+    def end_frame(self):
+        """Закрыть кадр: перенести его разделы в статистику и трассу."""
+        if not self.enabled:
+            return
+        frame = self._frame
+        self._frame = {}
+        samples = self.samples
+        for section, seconds in frame.items():
+            history = samples.get(section)
+            if history is None:
+                history = samples[section] = deque(maxlen=self.window)
+            history.append(seconds * 1000)
+        if self.tracing:
+            row = {'frame': self.frames}
+            row.update((section, round(seconds * 1000, 4)) for section, seconds in frame.items())
+            row.update(self.counts)
+            self.trace.append(row)
+        self.frames += 1
+
+    def stats(self, section):
+        """Словарь p50/p95/p99/max (мс) раздела по последним кадрам."""
+        history = self.samples.get(section)
+        if not history:
+            return None
+        values = np.fromiter(history, np.float64, len(history))
+        result = {f'p{p}': value for p, value in zip(PERCENTILES, np.percentile(values, PERCENTILES).tolist())}
+        result['max'] = float(values.max())
+        return result
+
+    def report(self):
+        """Строки со статистикой всех разделов для вывода на экран или в консоль."""
+        lines = []
+        for section in self.samples:
+            s = self.stats(section)
+            lines.append(f"{section:<10} p50 {s['p50']:6.2f}  p95 {s['p95']:6.2f}  "
+                         f"p99 {s['p99']:6.2f}  max {s['max']:6.2f} мс")
+        if self.counts:
+            lines.append("  ".join(f"{name}: {value}" for name, value in self.counts.items()))
+        return lines
+
+    def export(self, path):
+        """Сохранить трассу в CSV или JSON (по расширению файла)."""
+        columns = ['frame']
+        for row in self.trace:
+            for key in row:
+                if key not in columns:
+                    columns.append(key)
+        if path.endswith('.json'):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'columns': columns, 'frames': self.trace}, f)
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, columns, restval=0)
+                writer.writeheader()
+                writer.writerows(self.trace)
+
+
+def load_trace(path):
+    """Прочитать трассу из CSV или JSON: раздел -> массив значений по кадрам."""
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        columns, rows = data['columns'], data['frames']
+    else:
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            columns, rows = reader.fieldnames, list(reader)
+    return {
+        column: np.array([float(row.get(column, 0)) for row in rows])
+        for column in columns if column != 'frame'
+    }
+
+
+def compare(base_path, new_path):
+    """Напечатать p50/p95 каждого раздела двух трасс и их отношение."""
+    base = load_trace(base_path)
+    new = load_trace(new_path)
+    print(f"{'раздел':<12}{'p50 было':>10}{'p50 стало':>11}{'p95 было':>10}{'p95 стало':>11}{'p95':>8}")
+    for column in base:
+        if column not in new or not len(base[column]) or not len(new[column]):
+            continue
+        b50, b95 = np.percentile(base[column], (50, 95))
+        n50, n95 = np.percentile(new[column], (50, 95))
+        ratio = f"{n95 / b95:.2f}x" if b95 else "-"
+        print(f"{column:<12}{b50:10.3f}{n50:11.3f}{b95:10.3f}{n95:11.3f}{ratio:>8}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Использование: python profiler.py base.csv new.csv")
+    compare(sys.argv[1], sys.argv[2])
@@ -0,0 +1,153 @@
+"""Запись и воспроизведение управления по шагам в компактном двоичном формате.
+
+Формат файла (little-endian):
+    заголовок  '<4sBQIIH': сигнатура b'SSRP', версия, seed игры,
+               число шагов, контрольная сумма итогового состояния,
+               кадров за шаг симуляции (Game.frames_per_step);
+    режим появления - имя набора волн из game.WAVES ('' - таймеры):
+               '<B' длина и UTF-8;
+    баланс - '<B' число измененных параметров Game(balance=...), для каждого
+               имя, как режим, '<B' число чисел значения (0 - одно число, а
+               не кортеж) и числа '<?d' (целое ли, значение);
+    далее серии '<BH': маска управления и число шагов подряд с ней.
+Удерживаемые клавиши дают длинные серии, поэтому минута игры занимает
+обычно несколько сотен байт.
+"""
+import struct
+
+MAGIC = b'SSRP'
+VERSION = 3
+HEADER = struct.Struct('<4sBQIIH')
+BYTE = struct.Struct('<B')
+NUMBER = struct.Struct('<?d')
+RUN = struct.Struct('<BH')
+MAX_RUN = 0xFFFF
+
+
+class Recording:
+    """Сеанс игры: seed, настройки Game и маска управления для каждого шага.
+
+    Настройки - все, что меняет ход игры при том же seed: длина шага, режим
+    появления (имя из game.WAVES или None - таймеры) и измененные параметры баланса.
+    """
+
+    def __init__(self, seed, masks=None, digest=0, frames_per_step=1, waves=None, balance=None):
+        self.seed = seed
+        self.masks = bytearray(masks) if masks else bytearray()
+        self.digest = digest  # Контрольная сумма состояния после последнего шага
+        self.frames_per_step = frames_per_step
+        self.waves = waves
+        self.balance = balance if balance else {}
+
+    def __len__(self):
+        return len(self.masks)
+
+    def append(self, controls):
+        self.masks.append(controls)
+
+    def to_bytes(self):
+        """Упаковать запись в байты."""
+        chunks = [HEADER.pack(MAGIC, VERSION, self.seed, len(self.masks), self.digest, self.frames_per_step)]
+        _pack_str(chunks, self.waves or '')
+        chunks.append(BYTE.pack(len(self.balance)))
+        for name, value in self.balance.items():
+            _pack_str(chunks, name)
+            values = value if isinstance(value, tuple) else (value,)
+            chunks.append(BYTE.pack(len(values) if isinstance(value, tuple) else 0))
+            for number in values:
+                chunks.append(NUMBER.pack(isinstance(number, int), number))
+        masks = self.masks
+        i = 0
+        while i < len(masks):
+            mask = masks[i]
+            run = 1
+            while i + run < len(masks) and masks[i + run] == mask and run < MAX_RUN:
+                run += 1
+            chunks.append(RUN.pack(mask, run))
+            i += run
+        return b''.join(chunks)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Распаковать запись из байтов."""
+        magic, version, seed, steps, digest, frames_per_step = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Это не файл записи сеанса")
+        if version != VERSION:
+            raise ValueError(f"Неподдерживаемая версия записи: {version}")
+        try:
+            offset = HEADER.size
+            waves, offset = _unpack_str(data, offset)
+            (count,) = BYTE.unpack_from(data, offset)
+            offset += BYTE.size
+            balance = {}
+            for _ in range(count):
+                name, offset = _unpack_str(data, offset)
+                (size,) = BYTE.unpack_from(data, offset)
+                offset += BYTE.size
+                values = []
+                for _ in range(max(size, 1)):
+                    is_int, number = NUMBER.unpack_from(data, offset)
+                    offset += NUMBER.size
+                    values.append(int(number) if is_int else number)
+                balance[name] = tuple(values) if size else values[0]
+            masks = bytearray()
+            for mask, run in RUN.iter_unpack(data[offset:]):
+                masks.extend(bytes((mask,)) * run)
+        except (struct.error, UnicodeDecodeError) as error:
+            raise ValueError(f"Запись повреждена: {error}") from error
+        if len(masks) != steps:
+            raise ValueError("Запись повреждена: число шагов не совпадает")
+        return cls(seed, masks, digest, frames_per_step, waves or None, balance)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def _pack_str(chunks, text):
+    data = text.encode()
+    chunks.append(BYTE.pack(len(data)) + data)
+
+
+def _unpack_str(data, offset):
+    """Строка с длиной '<B' с позиции offset: (строка, позиция после нее)."""
+    (length,) = BYTE.unpack_from(data, offset)
+    start = offset + BYTE.size
+    if start + length > len(data):
+        raise ValueError("Запись повреждена: строка за концом файла")
+    return data[start:start + length].decode(), start + length
+
+
+class InputRecorder:
+    """Источник управления, записывающий маски другого источника."""
+
+    def __init__(self, source, recording):
+        self.source = source
+        self.recording = recording
+
+    def poll(self, events=()):
+        controls = self.source.poll(events)
+        self.recording.append(controls)
+        return controls
+
+
+class ReplayInput:
+    """Источник управления, воспроизводящий запись; после конца записи - 0."""
+
+    def __init__(self, recording):
+        self.masks = recording.masks
+        self.frame = 0
+
+    def poll(self, events=()):
+        frame = self.frame
+        self.frame += 1
+        if frame < len(self.masks):
+            return self.masks[frame]
+        return 0
+
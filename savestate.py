@@ -0,0 +1,370 @@
+"""Сохранение и восстановление полного состояния игры в двоичном виде.
+
+Снимок содержит корабль, экипаж, миссию (события, время, выполненные
+цели), очередь таймеров и счет, все метеориты, ракеты, бонусы и частицы, смещения
+звездного фона, расписание волн и состояние генераторов случайных чисел, поэтому игра,
+восстановленная из снимка, продолжается точно так же, как исходная.
+Параметры баланса, размер мира, набор волн и отрисовка (окно, шрифты, спрайты) в
+снимок не входят: снимок загружается в уже созданный Game.
+
+Формат (little-endian): заголовок '<4sBI' - сигнатура b'SSSV', версия,
+CRC32 данных; далее разделы в порядке dumps(). Числовые столбцы
+хранилищ и частиц записываются как есть (ndarray.tobytes).
+"""
+import struct
+import zlib
+
+import numpy as np
+
+from spaceship import CrewMember, MissionEvent, Role
+
+MAGIC = b'SSSV'
+VERSION = 5
+HEADER = struct.Struct('<4sBI')
+
+GAME = struct.Struct('<qB??iiii')        # счет, установка, активна, пробел, позиция и прошлая позиция
+MISSION = struct.Struct('<qdI')          # время, вероятность события, интервал проверки событий
+SCHEDULER = struct.Struct('<qqI')        # время, номер следующего таймера, число таймеров
+TIMER = struct.Struct('<qqb')            # срок, номер, аргумент-событие (-1 - нет); затем имя обработчика
+RANDOM = struct.Struct('<625I?d')        # состояние random.Random: ключ, есть ли gauss_next, gauss_next
+PCG64 = struct.Struct('<4QBI')           # state и inc по 128 бит, has_uint32, uinteger
+PARTICLES = struct.Struct('<IIq')        # частиц, запросов на взрыв, потеряно
+COUNT = struct.Struct('<I')
+SHORT = struct.Struct('<H')
+BYTE = struct.Struct('<B')
+NUMBER = struct.Struct('<?d')            # целое ли число, значение: int и float различаются в HUD
+OFFSETS = struct.Struct('<4i')
+WAVES = struct.Struct('<?qqqqI')         # есть ли волны, сегмент, его начало, курсор, взято до, записей
+
+ROLES = list(Role)
+EVENTS = list(MissionEvent)
+STORES = ('meteors', 'rockets', 'powerups')
+SHIP_FIELDS = ('fuel', 'max_fuel', 'hull_integrity', 'max_hull', 'speed', 'max_speed', 'oxygen', 'max_oxygen')
+MASK64 = (1 << 64) - 1
+
+
+def _timer_handlers(game):
+    """Имя -> обработчик для таймеров, которые бывают в очереди игры."""
+    return {
+        'meteor': game._on_meteor_timer,
+        'powerup': game._on_powerup_timer,
+        'fuel': game._on_fuel_timer,
+        'oxygen': game._on_oxygen_timer,
+        'mission_update': game.mission._on_update,
+        'mission_expire': game.mission._on_expire,
+    }
+
+
+def _particle_arrays(particles):
+    return particles.x, particles.y, particles.vx, particles.vy, particles.life, particles.size
+
+
+def _pack_str(chunks, text):
+    data = text.encode('utf-8')
+    chunks.append(SHORT.pack(len(data)))
+    chunks.append(data)
+
+
+def _pack_number(chunks, value):
+    chunks.append(NUMBER.pack(isinstance(value, int), value))
+
+
+def _pack_numbers(chunks, mapping):
+    """Словарь строка -> число."""
+    chunks.append(SHORT.pack(len(mapping)))
+    for key, value in mapping.items():
+        _pack_str(chunks, key)
+        _pack_number(chunks, value)
+
+
+class _Reader:
+    """Последовательное чтение разделов снимка."""
+
+    def __init__(self, data, offset):
+        self.data = data
+        self.offset = offset
+
+    def unpack(self, packer):
+        values = packer.unpack_from(self.data, self.offset)
+        self.offset += packer.size
+        return values
+
+    def string(self):
+        (length,) = self.unpack(SHORT)
+        start = self.offset
+        self.offset += length
+        return bytes(self.data[start:self.offset]).decode('utf-8')
+
+    def number(self):
+        is_int, value = self.unpack(NUMBER)
+        return int(value) if is_int else value
+
+    def numbers(self):
+        (count,) = self.unpack(SHORT)
+        result = {}
+        for _ in range(count):
+            key = self.string()
+            result[key] = self.number()
+        return result
+
+    def array(self, dtype, count):
+        dtype = np.dtype(dtype)
+        start = self.offset
+        self.offset += dtype.itemsize * count
+        return np.frombuffer(self.data, dtype, count, start)
+
+
+def dumps(game):
+    """Упаковать состояние игры в байты."""
+    ship = game.ship
+    mission = game.mission
+    chunks = [GAME.pack(
+        game.score, game.rocket_launcher_index, game.game_active, game.fire_held,
+        int(ship.position[0]), int(ship.position[1]),
+        int(game.previous_ship_position[0]), int(game.previous_ship_position[1]),
+    )]
+    _pack_str(chunks, game.game_over_reason)
+
+    # Корабль
+    _pack_str(chunks, ship.name)
+    for field in SHIP_FIELDS:
+        _pack_number(chunks, getattr(ship, field))
+
+    # Экипаж
+    chunks.append(SHORT.pack(len(game.crew)))
+    for member in game.crew:
+        _pack_str(chunks, member.name)
+        chunks.append(BYTE.pack(ROLES.index(member.role)))
+        _pack_number(chunks, member.health)
+        _pack_number(chunks, member.max_health)
+        _pack_numbers(chunks, member.skills)
+
+    # Миссия: выполненные цели - индексы в списке целей
+    _pack_str(chunks, mission.name)
+    chunks.append(MISSION.pack(mission.mission_time, mission.event_chance, mission.event_interval))
+    chunks.append(SHORT.pack(len(mission.objectives)))
+    for objective in mission.objectives:
+        _pack_str(chunks, objective)
+    completed = [mission.objectives.index(objective) for objective in mission.completed_objectives]
+    events = [EVENTS.index(event) for event in mission.active_events]
+    chunks.append(SHORT.pack(len(completed)) + bytes(completed))
+    chunks.append(SHORT.pack(len(events)) + bytes(events))
+    chunks.append(np.array(mission.event_timers, dtype=np.int64).tobytes())
+    _pack_numbers(chunks, mission.resources)
+
+    # Очередь таймеров
+    scheduler = game.scheduler
+    names = {handler: name for name, handler in _timer_handlers(game).items()}
+    timers = scheduler.pending()
+    chunks.append(SCHEDULER.pack(scheduler.time, scheduler.sequence, len(timers)))
+    for due, timer, handler, argument in timers:
+        chunks.append(TIMER.pack(due, timer, EVENTS.index(argument) if argument is not None else -1))
+        _pack_str(chunks, names[handler])
+
+    # Генераторы случайных чисел
+    version, key, gauss = game.rng.getstate()
+    chunks.append(RANDOM.pack(*key, gauss is not None, gauss or 0.0))
+    particles = game.particles
+    state = particles.rng.bit_generator.state
+    inner = state['state']
+    chunks.append(PCG64.pack(inner['state'] & MASK64, inner['state'] >> 64, inner['inc'] & MASK64,
+                             inner['inc'] >> 64, state['has_uint32'], state['uinteger']))
+
+    # Частицы и запросы на взрывы
+    n = particles.count
+    chunks.append(PARTICLES.pack(n, len(particles.pending), particles.dropped))
+    if particles.pending:
+        chunks.append(np.array(particles.pending, dtype=np.float64).tobytes())
+    for array in _particle_arrays(particles):
+        chunks.append(array[:n].tobytes())
+
+    # Метеориты, ракеты и бонусы
+    for name in STORES:
+        store = getattr(game, name)
+        chunks.append(COUNT.pack(store.count))
+        for column in store.columns.values():
+            chunks.append(column[:store.count].tobytes())
+
+    chunks.append(OFFSETS.pack(*game.starfield.offsets))
+
+    # Расписание волн текущего сегмента
+    engine = game.wave_engine
+    if engine is None:
+        chunks.append(WAVES.pack(False, 0, 0, 0, 0, 0))
+    else:
+        # До первого шага расписания еще нет (сегмент -1)
+        schedule = engine.schedule or ()
+        count = len(schedule[0]) if schedule else 0
+        chunks.append(WAVES.pack(True, engine.segment, engine.origin, engine.cursor, engine.time, count))
+        _pack_numbers(chunks, engine.modifiers)
+        for column in schedule:
+            chunks.append(column.tobytes())
+
+    payload = b''.join(chunks)
+    return HEADER.pack(MAGIC, VERSION, zlib.crc32(payload)) + payload
+
+
+def _read(game, data):
+    """Разобрать и проверить снимок, ничего не меняя в game; вернуть словарь разделов."""
+    magic, version, checksum = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Это не файл сохранения")
+    if version != VERSION:
+        raise ValueError(f"Неподдерживаемая версия сохранения: {version}")
+    payload = memoryview(data)[HEADER.size:]
+    if zlib.crc32(payload) != checksum:
+        raise ValueError("Сохранение повреждено: контрольная сумма не совпадает")
+    reader = _Reader(payload, 0)
+    state = {}
+
+    state['game'] = reader.unpack(GAME)
+    state['game_over_reason'] = reader.string()
+    state['ship_name'] = reader.string()
+    state['ship'] = [reader.number() for _ in SHIP_FIELDS]
+
+    (crew_count,) = reader.unpack(SHORT)
+    crew = []
+    for _ in range(crew_count):
+        name = reader.string()
+        (role,) = reader.unpack(BYTE)
+        member = CrewMember(name, ROLES[role], reader.number())
+        member.max_health = reader.number()
+        member.skills = reader.numbers()
+        crew.append(member)
+    state['crew'] = crew
+
+    state['mission_name'] = reader.string()
+    state['mission'] = reader.unpack(MISSION)
+    (objective_count,) = reader.unpack(SHORT)
+    objectives = state['objectives'] = [reader.string() for _ in range(objective_count)]
+    (count,) = reader.unpack(SHORT)
+    state['completed'] = [objectives[i] for i in reader.array(np.uint8, count).tolist()]
+    (count,) = reader.unpack(SHORT)
+    state['events'] = [EVENTS[i] for i in reader.array(np.uint8, count).tolist()]
+    state['event_timers'] = reader.array(np.int64, count).tolist()
+    state['resources'] = reader.numbers()
+
+    handlers = _timer_handlers(game)
+    time, sequence, count = reader.unpack(SCHEDULER)
+    timers = []
+    for _ in range(count):
+        due, timer, argument = reader.unpack(TIMER)
+        timers.append((due, timer, handlers[reader.string()], EVENTS[argument] if argument >= 0 else None))
+    state['scheduler'] = (time, sequence, timers)
+
+    state['random'] = reader.unpack(RANDOM)
+    state['pcg64'] = reader.unpack(PCG64)
+
+    particles = game.particles
+    n, pending, dropped = reader.unpack(PARTICLES)
+    if n > particles.capacity:
+        raise ValueError("В сохранении больше частиц, чем вмещает буфер")
+    pending = [tuple(request) for request in reader.array(np.float64, pending * 3).reshape(-1, 3).tolist()]
+    state['particles'] = (n, pending, dropped, [reader.array(array.dtype, n) for array in _particle_arrays(particles)])
+
+    stores = {}
+    for name in STORES:
+        store = getattr(game, name)
+        (count,) = reader.unpack(COUNT)
+        stores[name] = (count, {column_name: reader.array(column.dtype, count)
+                                for column_name, column in store.columns.items()})
+    state['stores'] = stores
+
+    state['offsets'] = list(reader.unpack(OFFSETS))
+
+    has_waves, segment, origin, cursor, taken, count = reader.unpack(WAVES)
+    if has_waves != (game.wave_engine is not None):
+        raise ValueError("Сохранение сделано с другим режимом появления объектов (волны или таймеры)")
+    if has_waves:
+        modifiers = reader.numbers()
+        schedule = None
+        if segment >= 0:
+            schedule = tuple(reader.array(dtype, count).copy()
+                             for dtype in (np.int64, np.int64, np.float64, np.int64, np.float64))
+        state['waves'] = (segment, origin, cursor, taken, modifiers, schedule)
+    if reader.offset != len(payload):
+        raise ValueError("Сохранение повреждено: лишние данные в конце")
+    return state
+
+
+def loads(game, data):
+    """Восстановить в game состояние из байтов, полученных dumps().
+
+    Снимок сначала целиком разбирается и проверяется; если он поврежден или
+    не подходит к game (ValueError), состояние игры остается прежним.
+    """
+    try:
+        state = _read(game, data)
+    except (struct.error, IndexError, KeyError, UnicodeDecodeError) as error:
+        raise ValueError(f"Сохранение повреждено: {error!r}") from error
+
+    (game.score, game.rocket_launcher_index, game.game_active, game.fire_held,
+     x, y, previous_x, previous_y) = state['game']
+    game.game_over_reason = state['game_over_reason']
+
+    ship = game.ship
+    ship.name = state['ship_name']
+    for field, value in zip(SHIP_FIELDS, state['ship']):
+        setattr(ship, field, value)
+    ship.position = [x, y]
+    game.previous_ship_position = (previous_x, previous_y)
+    game.crew = state['crew']
+
+    mission = game.mission
+    mission.name = state['mission_name']
+    mission.mission_time, mission.event_chance, mission.event_interval = state['mission']
+    mission.objectives = state['objectives']
+    mission.completed_objectives = state['completed']
+    mission.active_events = state['events']
+    mission.event_timers = state['event_timers']
+    mission.update_modifiers()
+    mission.resources = state['resources']
+
+    game.scheduler.restore(*state['scheduler'])
+
+    values = state['random']
+    game.rng.setstate((3, values[:625], values[626] if values[625] else None))
+    state_low, state_high, inc_low, inc_high, has_uint32, uinteger = state['pcg64']
+    particles = game.particles
+    particles.rng.bit_generator.state = {
+        'bit_generator': 'PCG64',
+        'state': {'state': state_low | state_high << 64, 'inc': inc_low | inc_high << 64},
+        'has_uint32': has_uint32,
+        'uinteger': uinteger,
+    }
+
+    n, particles.pending, particles.dropped, arrays = state['particles']
+    for array, values in zip(_particle_arrays(particles), arrays):
+        array[:n] = values
+    particles.count = n
+
+    for name, (count, columns) in state['stores'].items():
+        getattr(game, name).restore(count, columns)
+    # Сетка активной зоны строится в конце шага по положениям, которые и сохранены
+    if game.lod:
+        game.meteor_index.build(game.meteors.array('x'), game.meteors.array('y'))
+    else:
+        game.meteor_index.clear()
+
+    game.starfield.offsets = state['offsets']
+
+    engine = game.wave_engine
+    if engine is not None:
+        segment, origin, cursor, taken, modifiers, schedule = state['waves']
+        engine.segment, engine.origin, engine.cursor, engine.time = segment, origin, cursor, taken
+        if schedule is None:
+            engine.schedule = engine.starts = None
+            engine.modifiers = modifiers
+        else:
+            engine.set_schedule(schedule, modifiers)
+    game.full_redraw = True
+
+
+def save(game, path):
+    with open(path, 'wb') as f:
+        f.write(dumps(game))
+
+
+def load(game, path):
+    with open(path, 'rb') as f:
+        loads(game, f.read())
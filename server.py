@@ -0,0 +1,234 @@
+"""Авторитетный сервер для многих игровых сессий на asyncio (TCP).
+
+Каждое подключение - отдельная сессия со своей безголовой игрой. Сервер
+один раз за тик (SIM_DT) применяет накопленное управление каждой сессии,
+делает шаг симуляции и отправляет снимок, сжатый разностью с последним
+подтвержденным клиентом тиком (см. netcode.py).
+
+Тик не ждет медленных клиентов. Если в буфере отправки клиента больше
+HIGH_WATER байт, снимки ему пропускаются: следующий все равно строится от
+подтвержденного тика и несет все накопившиеся изменения. Клиент, который
+не разбирает снимки STALL_TICKS тиков подряд, отключается.
+
+Запуск: python server.py --port 7777
+"""
+import argparse
+import asyncio
+import time
+from collections import deque
+
+import netcode
+from game import Game, FPS
+
+HISTORY = 64             # Сколько последних отправленных снимков хранить для разностей
+HIGH_WATER = 64 * 1024   # Байт в буфере отправки, сверх которых снимки клиенту пропускаются
+STALL_TICKS = FPS * 10   # Тиков подряд с полным буфером, после которых клиент отключается
+
+
+class Session:
+    """Сессия одного клиента: игра, управление и история снимков."""
+
+    def __init__(self, session_id, game, writer):
+        self.id = session_id
+        self.game = game
+        self.writer = writer
+        self.controls = 0   # Последняя присланная маска
+        self.pressed = 0    # Объединение масок, пришедших с прошлого тика
+        self.acked = netcode.NO_BASE
+        self.history = {}   # тик -> отправленное состояние
+        self.order = deque()
+        self.stalled = 0    # Тиков подряд, когда снимок пропущен из-за полного буфера
+
+    def remember(self, tick, state):
+        self.history[tick] = state
+        self.order.append(tick)
+        while len(self.order) > HISTORY:
+            del self.history[self.order.popleft()]
+
+
+class GameServer:
+    """Сервер сессий: прием подключений и общий цикл тиков."""
+
+    def __init__(self, tick_rate=FPS, full_snapshots=False):
+        self.dt = 1.0 / tick_rate  # При tick_rate = FPS совпадает с SIM_DT
+        self.full_snapshots = full_snapshots  # Для сравнения: всегда полные снимки
+        self.sessions = {}
+        self.next_id = 1
+        self.tick_count = 0
+        self.tick_times = deque(maxlen=tick_rate * 10)  # Время обработки тиков, с
+        self.bytes_sent = 0
+        self.snapshots_sent = 0
+        self.snapshots_skipped = 0  # Пропущено из-за полного буфера отправки
+        self.dropped_clients = 0    # Отключено за долгую остановку или непередаваемое состояние
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=7777):
+        self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def handle_client(self, reader, writer):
+        session = None
+        try:
+            while True:
+                header = await reader.readexactly(netcode.FRAME.size)
+                (length,) = netcode.FRAME.unpack(header)
+                body = await reader.readexactly(length)
+                message_type = body[0]
+                if message_type == netcode.HELLO and session is None:
+                    (seed,) = netcode.HELLO_BODY.unpack_from(body, 1)
+                    game = Game(headless=True, seed=seed if seed else None)
+                    session = Session(self.next_id, game, writer)
+                    self.next_id += 1
+                    self.sessions[session.id] = session
+                    writer.write(netcode.frame(netcode.WELCOME, netcode.WELCOME_BODY.pack(session.id, game.seed)))
+                elif message_type == netcode.INPUT and session is not None:
+                    controls, acked = netcode.INPUT_BODY.unpack_from(body, 1)
+                    session.controls = controls
+                    session.pressed |= controls
+                    if acked in session.history:
+                        session.acked = acked
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if session is not None:
+                self.sessions.pop(session.id, None)
+            writer.close()
+
+    def disconnect(self, session):
+        self.sessions.pop(session.id, None)
+        session.writer.close()
+
+    def tick(self):
+        """Шаг всех сессий и рассылка снимков."""
+        self.tick_count += 1
+        tick = self.tick_count
+        for session in list(self.sessions.values()):
+            game = session.game
+            game.step(session.controls | session.pressed)
+            session.pressed = 0
+            writer = session.writer
+            if writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > HIGH_WATER:
+                # Клиент не успевает читать: снимок не строится и не отправляется
+                self.snapshots_skipped += 1
+                session.stalled += 1
+                if session.stalled > STALL_TICKS:
+                    self.dropped_clients += 1
+                    self.disconnect(session)
+                continue
+            session.stalled = 0
+            state = netcode.capture(game)
+            base = None if self.full_snapshots else session.history.get(session.acked)
+            try:
+                payload = netcode.encode_snapshot(tick, state, session.acked, base)
+            except ValueError:
+                # Состояние этой игры не передать - отключаем ее, остальные сессии тикают дальше
+                self.dropped_clients += 1
+                self.disconnect(session)
+                continue
+            writer.write(netcode.frame(netcode.SNAPSHOT, payload))
+            session.remember(tick, state)
+            self.bytes_sent += len(payload)
+            self.snapshots_sent += 1
+
+    async def run(self, ticks=None):
+        """Тикать с частотой 1 / dt; при отставании догонять без сна."""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while ticks is None or self.tick_count < ticks:
+            start = time.perf_counter()
+            self.tick()
+            self.tick_times.append(time.perf_counter() - start)
+            next_tick += self.dt
+            delay = next_tick - loop.time()
+            if delay < -self.dt * 5:
+                next_tick = loop.time()  # Слишком отстали - не пытаемся догнать
+            await asyncio.sleep(max(0.0, delay))
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        for session in self.sessions.values():
+            session.writer.close()
+
+
+class GameClient:
+    """Клиент для проверки и нагрузочного теста: принимает снимки и шлет управление."""
+
+    def __init__(self, policy=None):
+        self.policy = policy  # Функция тик -> маска управления
+        self.session_id = None
+        self.seed = None
+        self.states = {}      # тик -> принятое состояние
+        self.order = deque()  # Тики принятых состояний по порядку приема
+        self.tick = netcode.NO_BASE
+        self.state = None
+        self.received = 0
+        self.reader = None
+        self.writer = None
+
+    async def connect(self, host='127.0.0.1', port=7777, seed=0):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(netcode.frame(netcode.HELLO, netcode.HELLO_BODY.pack(seed)))
+        message_type, body = await self._read()
+        self.session_id, self.seed = netcode.WELCOME_BODY.unpack_from(body)
+
+    async def _read(self):
+        (length,) = netcode.FRAME.unpack(await self.reader.readexactly(netcode.FRAME.size))
+        body = await self.reader.readexactly(length)
+        return body[0], body[1:]
+
+    async def play(self, snapshots):
+        """Принять snapshots снимков, отвечая на каждый управлением и подтверждением."""
+        for _ in range(snapshots):
+            message_type, body = await self._read()
+            if message_type != netcode.SNAPSHOT:
+                continue
+            _, base_tick, _ = netcode.SNAPSHOT_HEADER.unpack_from(body)
+            self.tick, self.state = netcode.decode_snapshot(body, self.states)
+            self.remember(self.tick, self.state, base_tick)
+            self.received += 1
+            controls = self.policy(self.tick) if self.policy else 0
+            self.writer.write(netcode.frame(netcode.INPUT, netcode.INPUT_BODY.pack(controls, self.tick)))
+
+    def remember(self, tick, state, base_tick):
+        """Сохранить принятое состояние и забыть те, что сервер уже не возьмет базой.
+
+        Сервер строит разности от подтвержденных тиков из своих HISTORY
+        последних отправленных снимков, а снимки приходят по порядку: все такие
+        тики - среди HISTORY последних принятых. Пропуск снимков при полном
+        буфере растягивает их на сколько угодно тиков, поэтому считаются снимки,
+        а не тики. Кроме того, база сервера не идет назад, так что состояния
+        старше базы только что принятой разности тоже не нужны.
+        """
+        self.states[tick] = state
+        self.order.append(tick)
+        while len(self.order) > HISTORY or (base_tick != netcode.NO_BASE and self.order[0] < base_tick):
+            del self.states[self.order.popleft()]
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def serve(host, port):
+    server = GameServer()
+    port = await server.start(host, port)
+    print(f"Сервер слушает {host}:{port}")
+    await server.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сервер игровых сессий")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
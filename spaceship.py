@@ -1,3 +1,4 @@
+import heapq
 import random
 from enum import Enum
 
@@ -97,29 +98,154 @@ class MissionEvent(Enum):
     SYSTEM_MALFUNCTION = "Сбой системы"
     FRIENDLY_ENCOUNTER = "Дружественная встреча"
 
+MISSION_EVENTS = tuple(MissionEvent)
+
+# Бит события в маске активных событий (телеметрия, корабли флота)
+EVENT_BITS = {event: 1 << index for index, event in enumerate(MISSION_EVENTS)}
+
+# Событие -> (длительность в шагах, эффекты). Эффект - множитель параметра:
+# интервалов появления (meteor_spawn, powerup_spawn) или расхода (fuel_rate, oxygen_rate).
+# Эффекты одновременно активных событий перемножаются.
+EVENT_EFFECTS = {
+    MissionEvent.ASTEROID_FIELD: (600, {'meteor_spawn': 0.7}),
+    MissionEvent.METEOR_SHOWER: (300, {'meteor_spawn': 0.4}),
+    MissionEvent.SOLAR_FLARE: (240, {'fuel_rate': 1.5, 'powerup_spawn': 1.5}),
+    MissionEvent.FUEL_SHORTAGE: (600, {'fuel_rate': 2.0}),
+    MissionEvent.OXYGEN_LEAK: (420, {'oxygen_rate': 2.0}),
+    MissionEvent.SYSTEM_MALFUNCTION: (300, {'fuel_rate': 1.5, 'oxygen_rate': 1.5}),
+    MissionEvent.FRIENDLY_ENCOUNTER: (300, {'powerup_spawn': 0.5}),
+}
+
+class Scheduler:
+    """Очередь таймеров на двоичной куче.
+
+    Таймер - (срок, номер, обработчик, аргумент); при срабатывании
+    вызывается обработчик(аргумент). За шаг просматриваются только
+    наступившие таймеры: O(log n) на таймер вместо опроса всех счетчиков
+    каждый кадр. Отмена ленивая - отмененный таймер выбрасывается, когда
+    доходит до вершины кучи.
+    """
+    
+    def __init__(self):
+        self.time = 0
+        self.queue = []         # Куча (срок, номер, обработчик, аргумент)
+        self.sequence = 0       # Номер следующего таймера; при равных сроках срабатывает раньше созданный
+        self.cancelled = set()  # Номера отмененных, но еще лежащих в куче таймеров
+    
+    def __len__(self):
+        return len(self.queue) - len(self.cancelled)
+    
+    def schedule(self, delay, handler, argument=None):
+        """Запустить таймер через delay шагов (не меньше одного); вернуть его номер."""
+        timer = self.sequence
+        self.sequence += 1
+        heapq.heappush(self.queue, (self.time + max(1, delay), timer, handler, argument))
+        return timer
+    
+    def cancel(self, timer):
+        """Отменить таймер по номеру."""
+        self.cancelled.add(timer)
+    
+    def advance(self, steps=1):
+        """Продвинуть время на steps шагов и вызвать наступившие таймеры по порядку.
+
+        На время вызова обработчика time равно сроку его таймера, поэтому
+        таймер, перезапущенный из обработчика, и при большом steps
+        срабатывает с тем же периодом, что и при шагах по одному.
+        """
+        target = self.time + steps
+        queue = self.queue
+        while queue and queue[0][0] <= target:
+            due, timer, handler, argument = heapq.heappop(queue)
+            if timer in self.cancelled:
+                self.cancelled.discard(timer)
+                continue
+            self.time = due
+            handler(argument)
+        self.time = target
+    
+    def pending(self):
+        """Действующие таймеры в порядке срабатывания."""
+        return sorted(entry for entry in self.queue if entry[1] not in self.cancelled)
+    
+    def restore(self, time, sequence, entries):
+        """Заменить очередь таймерами entries."""
+        self.time = time
+        self.sequence = sequence
+        self.queue = list(entries)
+        heapq.heapify(self.queue)
+        self.cancelled = set()
+
 class Mission:
-    """Представляет миссию с целями, ресурсами и случайными событиями."""
+    """Представляет миссию с целями, ресурсами и случайными событиями.
+
+    Раз в event_interval шагов миссия с вероятностью event_chance начинает
+    случайное событие; событие действует EVENT_EFFECTS[событие][0] шагов
+    и меняет параметры игры (см. modifier). Время идет по scheduler.
+    """
     
-    def __init__(self, name, objectives, resources=None):
+    def __init__(self, name, objectives, resources=None, rng=None, event_chance=0.3,
+                 scheduler=None, event_interval=300):
         self.name = name
         self.objectives = objectives
         self.resources = resources if resources else {}
         self.completed_objectives = []
         self.active_events = []
+        self.event_timers = []  # Таймеры окончания активных событий, в том же порядке
+        self.modifiers = {}     # Параметр -> произведение множителей активных событий
         self.mission_time = 0
+        self.rng = rng if rng else random  # Источник случайности (random.Random или модуль random)
+        self.event_chance = event_chance  # Вероятность события при каждой проверке
+        self.event_interval = event_interval
+        self.scheduler = scheduler if scheduler is not None else Scheduler()
+        self.scheduler.schedule(event_interval, self._on_update)
     
     def trigger_random_event(self):
         """Сгенерировать случайное событие миссии."""
-        if random.random() < 0.3:  # 30% шанс
-            event = random.choice(list(MissionEvent))
-            self.active_events.append(event)
+        if self.rng.random() < self.event_chance:
+            event = self.rng.choice(MISSION_EVENTS)
+            self.start_event(event)
             return event
         return None
     
+    def start_event(self, event):
+        """Начать событие и запланировать его окончание."""
+        duration, _ = EVENT_EFFECTS[event]
+        self.active_events.append(event)
+        self.event_timers.append(self.scheduler.schedule(duration, self._on_expire, event))
+        self.update_modifiers()
+    
     def resolve_event(self, event):
         """Удалить событие из активных событий."""
         if event in self.active_events:
-            self.active_events.remove(event)
+            index = self.active_events.index(event)
+            self.scheduler.cancel(self.event_timers[index])
+            del self.active_events[index]
+            del self.event_timers[index]
+            self.update_modifiers()
+    
+    def update_modifiers(self):
+        """Пересчитать множители параметров по активным событиям."""
+        modifiers = {}
+        for event in self.active_events:
+            for name, factor in EVENT_EFFECTS[event][1].items():
+                modifiers[name] = modifiers.get(name, 1.0) * factor
+        self.modifiers = modifiers
+    
+    def modifier(self, name):
+        """Множитель параметра name от активных событий (1.0 - без изменений)."""
+        return self.modifiers.get(name, 1.0)
+    
+    def _on_expire(self, event):
+        # У событий одного вида одинаковая длительность, так что истекает самое раннее из них
+        index = self.active_events.index(event)
+        del self.active_events[index]
+        del self.event_timers[index]
+        self.update_modifiers()
+    
+    def _on_update(self, _):
+        self.update()
+        self.scheduler.schedule(self.event_interval, self._on_update)
     
     def complete_objective(self, objective):
         """Отметить цель как выполненную."""
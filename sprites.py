@@ -0,0 +1,52 @@
+"""Кэш заранее отрисованных спрайтов игровых объектов."""
+from collections import OrderedDict
+
+from lazyimport import lazy_import
+
+pygame = lazy_import("pygame")
+
+COLORKEY = (255, 0, 255)  # Прозрачный цвет фона спрайтов
+
+
+def new_sprite(width, height):
+    """Создать пустую поверхность спрайта с прозрачным фоном."""
+    surface = pygame.Surface((width, height))
+    surface.fill(COLORKEY)
+    surface.set_colorkey(COLORKEY)
+    return surface
+
+
+class SpriteCache:
+    """Спрайты, растеризованные при первом обращении, с вытеснением LRU.
+
+    Объект рисуется примитивами pygame.draw один раз на вариант (размер,
+    здоровье, тип и т.п.), а дальше выводится одним blit.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def get(self, key, render, *args):
+        """Вернуть спрайт по ключу, при промахе отрисовав его через render(*args)."""
+        sprites = self.sprites
+        sprite = sprites.get(key)
+        if sprite is not None:
+            sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+        self.misses += 1
+        sprite = render(*args)
+        sprites[key] = sprite
+        if len(sprites) > self.max_size:
+            sprites.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        """Сбросить все спрайты."""
+        self.sprites.clear()
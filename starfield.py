@@ -0,0 +1,148 @@
+"""Звездный фон из заранее отрисованных слоев с параллаксом."""
+import random
+
+import numpy as np
+
+from lazyimport import lazy_import
+from pixels import disk_offsets
+
+pygame = lazy_import("pygame")
+
+STAR_SPEEDS = (1, 2, 3, 4)  # Скорость каждого слоя, пикселей за шаг симуляции
+STAR_SIZES = (1, 2)
+MAX_DIRTY_STARS = 512  # Больше звезд - обновлять экран целиком
+
+
+class Starfield:
+    """Звездное небо из нескольких слоев, прокручиваемых с разной скоростью.
+
+    Звезды распределяются так же, как у прежних объектов Star
+    (benchmarks/legacy.py): скорость 1-4 выбирает слой, размер 1-2. Каждый слой один раз рисуется на высокую поверхность
+    и дальше выводится двумя blit со смещением, поэтому стоимость кадра не
+    зависит от числа звезд. Дальний слой непрозрачен и заменяет заливку фона.
+    Плитки рисуются при первом выводе: безголовой игре они не нужны.
+    Положения звезд берутся из rng (в игре - генератор Game) один раз: ушедшая
+    за низ экрана звезда возвращается сверху прокруткой плитки по кругу, так
+    что случайных чисел за шаг не нужно и повтор по seed остается точным.
+    """
+
+    def __init__(self, width, height, star_count=100, tile_height=None, color=(255, 255, 255), rng=random):
+        self.width = width
+        self.height = height
+        self.tile_height = tile_height if tile_height else height * 2
+        self.speeds = STAR_SPEEDS
+        self.offsets = [0] * len(STAR_SPEEDS)
+        self.color = color
+        # Звезды каждого слоя в координатах плитки: массивы x, y, size
+        self.stars = []
+        by_layer = [[] for _ in STAR_SPEEDS]
+        for _ in range(star_count):
+            speed = rng.choice(STAR_SPEEDS)
+            by_layer[STAR_SPEEDS.index(speed)].append((
+                rng.randint(0, width),
+                rng.randint(0, self.tile_height - 1),
+                rng.choice(STAR_SIZES),
+            ))
+        for stars in by_layer:
+            self.stars.append(np.array(stars, dtype=np.int64).reshape(-1, 3))
+        self.layers = None       # Плитки слоев, см. draw
+        self.star_pixels = None  # Пиксели звезд для draw_pixels
+
+    def _bake(self, stars, color, opaque):
+        """Нарисовать звезды слоя на плитку, повторив у краев для бесшовности."""
+        tile = pygame.Surface((self.width, self.tile_height))
+        tile.fill((0, 0, 0))
+        for x, y, size in stars.tolist():
+            for copy_y in (y - self.tile_height, y, y + self.tile_height):
+                pygame.draw.circle(tile, color, (x, copy_y), size)
+        if not opaque:
+            tile.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        return tile
+
+    def update(self, frames=1):
+        """Прокрутить все слои на их скорость за frames кадров."""
+        tile_height = self.tile_height
+        self.offsets = [(offset + speed * frames) % tile_height for offset, speed in zip(self.offsets, self.speeds)]
+
+    def draw(self, screen, doreturn=False, lag=0.0):
+        """Вывести слои от дальнего к ближнему, закрасив весь экран.
+
+        lag - на сколько кадров прокрутка слоев отстает от последнего шага.
+        При doreturn=True возвращает список областей со звездами.
+        """
+        if self.layers is None:
+            self.layers = [self._bake(stars, self.color, opaque=index == 0) for index, stars in enumerate(self.stars)]
+        tile_height = self.tile_height
+        offsets = self.offsets
+        if lag:
+            offsets = [int(offset - speed * lag) % tile_height for offset, speed in zip(offsets, self.speeds)]
+        for layer, offset in zip(self.layers, offsets):
+            screen.blit(layer, (0, offset))
+            screen.blit(layer, (0, offset - tile_height))
+        if not doreturn:
+            return []
+        return self.star_rects(offsets)
+
+    def draw_pixels(self, pixels, screen, doreturn=False, lag=0.0):
+        """То же, что draw, но звезды пишутся прямо в пиксели экрана.
+
+        pixels - pygame.surfarray.pixels2d(screen). Пиксели звезд
+        рассчитываются один раз, а за кадр только сдвигаются на прокрутку слоев.
+        """
+        tile_height = self.tile_height
+        offsets = self.offsets
+        if lag:
+            offsets = [int(offset - speed * lag) % tile_height for offset, speed in zip(offsets, self.speeds)]
+        if self.star_pixels is None:
+            self.star_pixels = self._star_pixels()
+        xs, ys, counts = self.star_pixels
+        ys = (ys + np.repeat(offsets, counts)) % tile_height
+        visible = ys < self.height
+        pixels.fill(screen.map_rgb((0, 0, 0)))
+        pixels[xs[visible], ys[visible]] = screen.map_rgb(self.color)
+        if not doreturn:
+            return []
+        return self.star_rects(offsets)
+
+    def _star_pixels(self):
+        """Пиксели звезд всех слоев в координатах плитки и число пикселей каждого слоя.
+
+        Пиксели за правым краем отброшены, а за верхним и нижним перенесены
+        на другой край плитки, как при повторе звезд в _bake.
+        """
+        xs, ys, counts = [], [], []
+        for stars in self.stars:
+            count = 0
+            for size in STAR_SIZES:
+                dx, dy = disk_offsets(size)
+                selected = stars[stars[:, 2] == size]
+                px = (selected[:, 0, None] + dx).ravel()
+                py = (selected[:, 1, None] + dy).ravel() % self.tile_height
+                inside = (px >= 0) & (px < self.width)
+                xs.append(px[inside])
+                ys.append(py[inside])
+                count += np.count_nonzero(inside)
+            counts.append(count)
+        return np.concatenate(xs), np.concatenate(ys), counts
+
+    def star_rects(self, offsets=None):
+        """Области видимых звезд на экране (или весь экран, если звезд много)."""
+        tile_height = self.tile_height
+        rects = []
+        for stars, offset in zip(self.stars, offsets if offsets is not None else self.offsets):
+            if len(stars) == 0:
+                continue
+            ys = (stars[:, 1] + offset) % tile_height
+            # Звезда у нижнего края плитки видна сверху экрана
+            ys = np.where(ys >= tile_height - 2, ys - tile_height, ys)
+            visible = ys < self.height + 2
+            sizes = stars[visible, 2]
+            rects.extend(zip(
+                (stars[visible, 0] - sizes).tolist(),
+                (ys[visible] - sizes).tolist(),
+                (sizes * 2 + 1).tolist(),
+                (sizes * 2 + 1).tolist(),
+            ))
+            if len(rects) > MAX_DIRTY_STARS:
+                return [pygame.Rect(0, 0, self.width, self.height)]
+        return rects
@@ -0,0 +1,271 @@
+"""Телеметрия: покадровые показатели игры в столбцовый файл без задержек игрового цикла.
+
+Каждый шаг симуляции record() дописывает строку (ресурсы корабля, число
+объектов, счет, активные события миссии, время шага и отрисовки) в заранее
+выделенный кольцевой буфер из столбцов NumPy. Фоновый поток забирает
+накопившиеся строки пачками и дописывает их в файл, так что игровой цикл
+никогда не ждет диска. Если поток не успевает и буфер полон, строки
+отбрасываются и учитываются в dropped.
+
+Файл - заголовок со схемой столбцов и последовательность пачек, в каждой
+пачке столбцы лежат подряд как есть. Пачки можно читать, пока файл еще
+пишется (iter_chunks(path, follow=True)), например для выгрузки в CSV:
+    python telemetry.py run.tlm                      # сводка
+    python telemetry.py run.tlm --csv run.csv        # в CSV
+    python telemetry.py run.tlm --csv - --follow     # поток в stdout по мере записи
+"""
+import argparse
+import csv
+import json
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+from spaceship import EVENT_BITS
+
+MAGIC = b'SSTL'
+VERSION = 1
+HEADER = struct.Struct('<4sBI')  # Сигнатура, версия, длина схемы в JSON
+CHUNK = struct.Struct('<I')      # Число строк в пачке
+
+# Столбцы строки телеметрии; events - маска активных событий, бит i - MISSION_EVENTS[i]
+COLUMNS = (
+    ('step', np.int64),
+    ('score', np.int32),
+    ('hull', np.float32),
+    ('fuel', np.float32),
+    ('oxygen', np.float32),
+    ('speed', np.float32),
+    ('ship_x', np.float32),
+    ('ship_y', np.float32),
+    ('meteors', np.int32),
+    ('rockets', np.int32),
+    ('powerups', np.int32),
+    ('particles', np.int32),
+    ('events', np.uint8),
+    ('step_ms', np.float32),
+    ('render_ms', np.float32),
+)
+
+
+class Telemetry:
+    """Кольцевой буфер строк телеметрии и фоновая запись в файл.
+
+    Буфер рассчитан на одного писателя (игровой цикл) и один поток записи:
+    written и taken только растут, строки [taken, written) ждут записи.
+    """
+
+    def __init__(self, path, capacity=8192, batch=1024, interval=0.5):
+        self.path = path
+        self.capacity = capacity
+        self.batch = batch        # Сколько строк будит поток записи
+        self.interval = interval  # Не реже чем раз в interval секунд поток пишет все, что есть
+        self.columns = {name: np.zeros(capacity, dtype) for name, dtype in COLUMNS}
+        self.written = 0  # Строк записано в буфер
+        self.taken = 0    # Строк забрано потоком записи
+        self.dropped = 0  # Строк отброшено из-за полного буфера
+        self.steps = 0
+        self.file = open(path, 'wb')
+        schema = json.dumps([[name, np.dtype(dtype).str] for name, dtype in COLUMNS]).encode()
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(schema)) + schema)
+        self._wake = threading.Event()
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, game, step_time):
+        """Дописать строку о текущем шаге game; step_time - длительность шага, с."""
+        step = self.steps
+        self.steps = step + 1
+        written = self.written
+        if written - self.taken >= self.capacity:
+            self.dropped += 1
+            return
+        i = written % self.capacity
+        columns = self.columns
+        ship = game.ship
+        events = 0
+        for event in game.mission.active_events:
+            events |= EVENT_BITS[event]
+        columns['step'][i] = step
+        columns['score'][i] = game.score
+        columns['hull'][i] = ship.hull_integrity
+        columns['fuel'][i] = ship.fuel
+        columns['oxygen'][i] = ship.oxygen
+        columns['speed'][i] = ship.speed
+        columns['ship_x'][i] = ship.position[0]
+        columns['ship_y'][i] = ship.position[1]
+        columns['meteors'][i] = len(game.meteors)
+        columns['rockets'][i] = len(game.rockets)
+        columns['powerups'][i] = len(game.powerups)
+        columns['particles'][i] = game.particles.count
+        columns['events'][i] = events
+        columns['step_ms'][i] = step_time * 1000
+        columns['render_ms'][i] = game.render_times[-1] * 1000 if game.render_times else 0.0
+        # Строка становится видна потоку записи только после заполнения всех столбцов
+        self.written = written + 1
+        if written + 1 - self.taken == self.batch:
+            self._wake.set()
+
+    def _take(self):
+        """Скопировать ожидающие строки из буфера и освободить место."""
+        taken = self.taken
+        count = self.written - taken
+        if count == 0:
+            return None
+        start = taken % self.capacity
+        end = start + count
+        if end <= self.capacity:
+            chunk = [self.columns[name][start:end].copy() for name, _ in COLUMNS]
+        else:
+            end -= self.capacity
+            chunk = [np.concatenate((self.columns[name][start:], self.columns[name][:end]))
+                     for name, _ in COLUMNS]
+        self.taken = taken + count
+        return chunk
+
+    def _write(self, chunk):
+        self.file.write(CHUNK.pack(len(chunk[0])))
+        for values in chunk:
+            self.file.write(values.tobytes())
+        self.file.flush()
+
+    def _run(self):
+        while not self._closing:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            chunk = self._take()
+            if chunk is not None:
+                self._write(chunk)
+
+    def close(self):
+        """Дописать оставшиеся строки, остановить поток и закрыть файл."""
+        if self.file.closed:
+            return
+        self._closing = True
+        self._wake.set()
+        self._thread.join()
+        chunk = self._take()
+        if chunk is not None:
+            self._write(chunk)
+        self.file.close()
+
+
+def _read_exact(f, size, follow, poll):
+    """Прочитать ровно size байт; при follow ждать дозаписи, иначе None на обрыве."""
+    data = f.read(size)
+    while follow and len(data) < size:
+        time.sleep(poll)
+        data += f.read(size - len(data))
+    return data if len(data) == size else None
+
+
+def iter_chunks(path, follow=False, poll=0.2):
+    """Пачки файла телеметрии по очереди: словари столбец -> массив.
+
+    Оборванная в конце пачка (файл еще пишется или запись прервана)
+    пропускается. При follow=True генератор ждет новых пачек бесконечно.
+    """
+    with open(path, 'rb') as f:
+        header = _read_exact(f, HEADER.size, follow, poll)
+        if header is None:
+            raise ValueError("Файл телеметрии обрезан")
+        magic, version, schema_size = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("Это не файл телеметрии")
+        if version != VERSION:
+            raise ValueError(f"Неподдерживаемая версия телеметрии: {version}")
+        schema = [(name, np.dtype(dtype)) for name, dtype in json.loads(f.read(schema_size))]
+        while True:
+            size = _read_exact(f, CHUNK.size, follow, poll)
+            if size is None:
+                return
+            rows, = CHUNK.unpack(size)
+            chunk = {}
+            for name, dtype in schema:
+                data = _read_exact(f, rows * dtype.itemsize, follow, poll)
+                if data is None:
+                    return
+                chunk[name] = np.frombuffer(data, dtype)
+            yield chunk
+
+
+def load(path):
+    """Весь файл телеметрии: словарь столбец -> массив."""
+    chunks = list(iter_chunks(path))
+    if not chunks:
+        return {name: np.zeros(0, dtype) for name, dtype in COLUMNS}
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in chunks[0]}
+
+
+def event_names(mask):
+    """Названия событий миссии, закодированных в маске events."""
+    return [event.value for event, bit in EVENT_BITS.items() if mask & bit]
+
+
+def summarize(data):
+    """Строки сводки по столбцам телеметрии."""
+    count = len(data['step'])
+    lines = [f"Строк: {count}"]
+    if not count:
+        return lines
+    lines.append(f"{'столбец':<10}{'мин':>10}{'среднее':>10}{'p95':>10}{'макс':>10}")
+    for name in data:
+        if name in ('step', 'events'):
+            continue
+        values = data[name].astype(np.float64)
+        lines.append(f"{name:<10}{values.min():>10.2f}{values.mean():>10.2f}"
+                     f"{np.percentile(values, 95):>10.2f}{values.max():>10.2f}")
+    events = data['events']
+    for event, bit in EVENT_BITS.items():
+        share = np.count_nonzero(events & bit) / count
+        if share:
+            lines.append(f"{event.value}: {share:.1%} шагов")
+    return lines
+
+
+def export_csv(path, out, follow=False):
+    """Выгрузить пачки в CSV по мере чтения; out - файл или '-' для stdout."""
+    f = sys.stdout if out == '-' else open(out, 'w', newline='', encoding='utf-8')
+    try:
+        writer = None
+        for chunk in iter_chunks(path, follow):
+            if writer is None:
+                writer = csv.writer(f)
+                writer.writerow(chunk)
+            # float32 через str, чтобы в CSV не попадали хвосты вроде 0.32449999
+            writer.writerows(zip(*(values.astype(str).tolist() if values.dtype.kind == 'f' else values.tolist()
+                                   for values in chunk.values())))
+            f.flush()
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Чтение файла телеметрии")
+    parser.add_argument("path")
+    parser.add_argument("--csv", metavar="OUT", help="выгрузить в CSV ('-' - в stdout)")
+    parser.add_argument("--follow", action="store_true", help="ждать новых строк, пока файл пишется")
+    args = parser.parse_args()
+    if args.csv:
+        try:
+            export_csv(args.path, args.csv, args.follow)
+        except (KeyboardInterrupt, BrokenPipeError):
+            pass  # Прервано или читатель потока закрылся
+        return 0
+    print("\n".join(summarize(load(args.path))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""Волны: заранее рассчитанное расписание появления метеоритов и бонусов.
+
+Время миссии делится на сегменты по SEGMENT_STEPS шагов. В начале сегмента
+WaveEngine строит его расписание - массивы (время, тип, x, размер, скорость),
+отсортированные по времени, - из авторских волн (например, CAMPAIGN) или
+процедурно (procedural_waves). Сложность растет от сегмента к сегменту и с
+каждой выполненной целью миссии и фиксируется при построении сегмента.
+Авторские волны рассчитаны на свой сегмент без выполненных целей: каждая
+выполненная цель сжимает их интервалы так же, как растет сложность
+процедурных. Активные события миссии меняют плотность
+так же, как таймеры появления (множители meteor_spawn и powerup_spawn из
+EVENT_EFFECTS): при смене событий остаток сегмента перестраивается.
+
+За шаг игра берет наступившие записи через индекс начала каждого шага
+сегмента (starts), поэтому проверка стоит O(1) при любой плотности.
+
+Волна - словарь:
+    start, duration - начало от начала сегмента и длина, шагов;
+    interval - шагов между появлениями; count - метеоритов за раз (по умолчанию 1);
+    pattern - строй: 'random' - случайные x, 'line' - ряд через всю ширину,
+              'sweep' - x идет от левого края к правому за время волны;
+    sizes - возможные размеры; speeds - (наименьшая, наибольшая) скорость.
+"""
+import numpy as np
+
+SEGMENT_STEPS = 1800        # Длина сегмента миссии, шагов (30 с)
+DIFFICULTY_RAMP = 0.25      # Прибавка сложности за каждый пройденный сегмент
+OBJECTIVE_BONUS = 0.5       # Прибавка сложности за каждую выполненную цель
+MIN_INTERVAL = 4            # Процедурные волны не плотнее метеорита раз в столько шагов
+METEOR = 0                  # Тип записи метеорита; бонус i из game.POWERUP_TYPES - тип 1 + i
+PATTERNS = ('random', 'line', 'sweep')
+METEOR_SIZES = (20, 30, 40, 50)
+
+# Авторская кампания: волны по сегментам; после последнего сегмента волны процедурные
+CAMPAIGN = [
+    [
+        {'start': 60, 'duration': 900, 'interval': 50, 'pattern': 'random', 'sizes': (20, 30), 'speeds': (2, 3)},
+        {'start': 1000, 'duration': 700, 'interval': 40, 'pattern': 'random', 'sizes': (20, 30, 40), 'speeds': (2, 4)},
+    ],
+    [
+        {'start': 0, 'duration': 600, 'interval': 45, 'pattern': 'sweep', 'sizes': (30, 40), 'speeds': (3, 4)},
+        {'start': 700, 'duration': 400, 'interval': 120, 'count': 4, 'pattern': 'line', 'sizes': (20,),
+         'speeds': (2, 2)},
+        {'start': 1200, 'duration': 600, 'interval': 35, 'pattern': 'random', 'sizes': METEOR_SIZES, 'speeds': (2, 5)},
+    ],
+    [
+        {'start': 0, 'duration': 900, 'interval': 30, 'pattern': 'random', 'sizes': METEOR_SIZES, 'speeds': (2, 5)},
+        {'start': 300, 'duration': 1200, 'interval': 150, 'count': 5, 'pattern': 'line', 'sizes': (20, 30),
+         'speeds': (3, 3)},
+        {'start': 1000, 'duration': 800, 'interval': 40, 'pattern': 'sweep', 'sizes': (40, 50), 'speeds': (3, 5)},
+    ],
+]
+
+
+def procedural_waves(rng, difficulty):
+    """Волны одного сегмента со сложностью difficulty (1 - как таймеры без волн).
+
+    Волны идут одна за другой с короткими паузами; с ростом сложности
+    метеориты появляются чаще, крупнее и быстрее.
+    """
+    waves = []
+    start = int(rng.integers(0, 120))
+    while start < SEGMENT_STEPS:
+        duration = int(rng.integers(300, 700))
+        pattern = PATTERNS[int(rng.integers(len(PATTERNS)))]
+        count = int(rng.integers(3, 6)) if pattern == 'line' else 1
+        interval = max(MIN_INTERVAL, round(45 * count / difficulty * rng.uniform(0.8, 1.2)))
+        largest = min(len(METEOR_SIZES), 2 + int(difficulty))
+        fastest = min(8, 4 + int(difficulty))
+        waves.append({'start': start, 'duration': duration, 'interval': interval, 'count': count,
+                      'pattern': pattern, 'sizes': METEOR_SIZES[:largest], 'speeds': (2, fastest)})
+        start += duration + int(rng.integers(60, 180))
+    return waves
+
+
+def build_schedule(waves, rng, width, powerup_interval, powerup_types, meteor_factor=1.0, powerup_factor=1.0,
+                   start=0):
+    """Расписание сегмента с шага start от его начала.
+
+    Возвращает кортеж массивов (время от начала сегмента, тип, x, размер,
+    скорость), упорядоченных по времени. meteor_factor и powerup_factor
+    умножают интервалы, как множители событий миссии.
+    """
+    times, kinds, xs, sizes, speeds = [], [], [], [], []
+    for wave in waves:
+        interval = max(1, round(wave['interval'] * meteor_factor))
+        count = wave.get('count', 1)
+        wave_times = np.arange(wave['start'], min(wave['start'] + wave['duration'], SEGMENT_STEPS), interval)
+        wave_times = np.repeat(wave_times[wave_times >= start], count)
+        n = len(wave_times)
+        if n == 0:
+            continue
+        wave_sizes = rng.choice(np.array(wave['sizes']), n)
+        low, high = wave['speeds']
+        room = width - wave_sizes
+        pattern = wave['pattern']
+        if pattern == 'line':
+            # Ряд из count метеоритов через всю ширину со случайным сдвигом ряда
+            slot = np.tile(np.arange(count), n // count)
+            shift = np.repeat(rng.uniform(0, 1, n // count), count)
+            x = (slot + shift) / count * room
+        elif pattern == 'sweep':
+            progress = (wave_times - wave['start']) / wave['duration']
+            x = np.clip(progress * room + rng.normal(0, 20, n), 0, room)
+        else:
+            x = rng.uniform(0, 1, n) * room
+        times.append(wave_times)
+        kinds.append(np.full(n, METEOR))
+        xs.append(np.floor(x))
+        sizes.append(wave_sizes)
+        speeds.append(rng.integers(low, high + 1, n).astype(np.float64))
+
+    # Бонусы - по одному со случайными интервалами, как таймер бонусов
+    low, high = powerup_interval
+    draws = SEGMENT_STEPS // max(1, int(low * powerup_factor)) + 1
+    gaps = np.maximum(1, np.round(rng.integers(low, high + 1, draws) * powerup_factor))
+    powerup_times = start + np.cumsum(gaps)
+    powerup_times = powerup_times[powerup_times < SEGMENT_STEPS]
+    n = len(powerup_times)
+    times.append(powerup_times)
+    kinds.append(1 + rng.integers(0, powerup_types, n))
+    xs.append(rng.integers(20, width - 20 + 1, n).astype(np.float64))
+    sizes.append(np.full(n, 20))
+    speeds.append(np.full(n, 3.0))
+
+    times = np.concatenate(times).astype(np.int64)
+    order = np.argsort(times, kind='stable')
+    return (times[order], np.concatenate(kinds).astype(np.int64)[order], np.concatenate(xs)[order],
+            np.concatenate(sizes).astype(np.int64)[order], np.concatenate(speeds)[order])
+
+
+class WaveEngine:
+    """Расписание появления объектов по сегментам миссии и курсор по нему.
+
+    segments - авторские волны по сегментам (список списков волн) или None;
+    сегменты сверх списка генерируются procedural_waves. rng - генератор
+    игры (random.Random): из него берется seed расписания каждого сегмента,
+    так что при одинаковом seed игры расписание одно и то же.
+    """
+
+    def __init__(self, rng, width, segments=None, powerup_interval=(180, 300), powerup_types=3):
+        self.rng = rng
+        self.width = width
+        self.segments = segments if segments is not None else []
+        self.powerup_interval = powerup_interval
+        self.powerup_types = powerup_types
+        self.segment = -1
+        self.origin = 0      # Время начала текущего сегмента
+        self.cursor = 0      # Первая еще не взятая запись
+        self.time = -1       # До какого времени записи уже взяты
+        self.modifiers = {}  # Множители событий, по которым построен остаток расписания
+        self.schedule = None
+        self.starts = None
+
+    def difficulty(self, mission):
+        """Сложность текущего сегмента: от номера сегмента и выполненных целей миссии."""
+        return 1.0 + DIFFICULTY_RAMP * self.segment + OBJECTIVE_BONUS * len(mission.completed_objectives)
+
+    def waves(self, mission, rng):
+        """Волны текущего сегмента: авторские, если есть, иначе процедурные."""
+        if self.segment < len(self.segments):
+            return self.segments[self.segment]
+        return procedural_waves(rng, self.difficulty(mission))
+
+    def _build(self, mission, start=0):
+        """Построить расписание текущего сегмента с момента start, сохранив уже взятые записи."""
+        rng = np.random.default_rng(self.rng.getrandbits(64))
+        modifiers = mission.modifiers
+        meteor_factor = modifiers.get('meteor_spawn', 1.0)
+        if self.segment < len(self.segments):
+            # Авторские волны уплотняются на прибавку сложности от выполненных целей
+            meteor_factor *= (1.0 + DIFFICULTY_RAMP * self.segment) / self.difficulty(mission)
+        schedule = build_schedule(
+            self.waves(mission, rng), rng, self.width, self.powerup_interval, self.powerup_types,
+            meteor_factor, modifiers.get('powerup_spawn', 1.0), start)
+        schedule = (schedule[0] + self.origin,) + schedule[1:]
+        if start:
+            schedule = tuple(np.concatenate((old[:self.cursor], new)) for old, new in zip(self.schedule, schedule))
+        self.set_schedule(schedule, dict(modifiers))
+
+    def set_schedule(self, schedule, modifiers):
+        """Заменить расписание текущего сегмента и пересчитать индекс шагов."""
+        self.schedule = schedule
+        self.modifiers = modifiers
+        # starts[k] - первая запись со временем не раньше origin + k
+        self.starts = np.searchsorted(schedule[0], self.origin + np.arange(SEGMENT_STEPS + 1))
+
+    def take(self, time, mission):
+        """Наступившие к времени time записи: кортеж массивов как у build_schedule или None.
+
+        Время в записях - время миссии, к которому объект должен появиться.
+        """
+        taken = []
+        while self.segment < 0 or time >= self.origin + SEGMENT_STEPS:
+            if self.segment >= 0:
+                # Хвост сегмента, если шаг перешагнул его конец
+                taken.append(tuple(column[self.cursor:] for column in self.schedule))
+                self.origin += SEGMENT_STEPS
+            self.segment += 1
+            self.cursor = 0
+            self._build(mission)
+        if mission.modifiers != self.modifiers:
+            # Записи после уже взятых строятся заново под новые события
+            self._build(mission, max(0, self.time - self.origin + 1))
+        self.time = time
+        end = self.starts[time - self.origin + 1]
+        if end > self.cursor:
+            taken.append(tuple(column[self.cursor:end] for column in self.schedule))
+            self.cursor = end
+        if not taken:
+            return None
+        if len(taken) == 1:
+            return taken[0]
+        return tuple(np.concatenate(columns) for columns in zip(*taken))